@@ -1,3 +1,4 @@
+import multiprocessing
 import customtkinter as tk
 
 import state
@@ -7,94 +8,103 @@ import layout
 import gui_updates
 import corr_plot
 
-# ------------------
-# APP INITIALIZATION
-# ------------------
 
-tk.set_appearance_mode("Light")
-tk.set_default_color_theme("dark-blue")
+def main():
+    # ------------------
+    # APP INITIALIZATION
+    # ------------------
 
-app = tk.CTk()
-app.title("wx")
-app.withdraw()  # hide until fully built and sized
+    tk.set_appearance_mode("Light")
+    tk.set_default_color_theme("dark-blue")
 
-screen_width  = app.winfo_screenwidth()
-screen_height = app.winfo_screenheight()
-screen_dpi    = app.winfo_fpixels('1i')
+    app = tk.CTk()
+    app.title("wx")
+    app.withdraw()  # hide until fully built and sized
 
-RETINA     = screen_dpi < 75
-app.geometry(f"{screen_width}x{int(screen_height * 0.9)}")
-app.resizable(False, False)
-app.tk.call('tk', 'scaling', 1 if RETINA else 1.5)
+    screen_width  = app.winfo_screenwidth()
+    screen_height = app.winfo_screenheight()
+    screen_dpi    = app.winfo_fpixels('1i')
 
-# --------------------------------
-# STATE — all tk.Vars & containers
-# --------------------------------
+    RETINA     = screen_dpi < 75
+    app.geometry(f"{screen_width}x{int(screen_height * 0.9)}")
+    app.resizable(False, False)
+    app.tk.call('tk', 'scaling', 1 if RETINA else 1.5)
 
-state.init_state(screen_dpi, screen_width, screen_height, RETINA)
+    # --------------------------------
+    # STATE — all tk.Vars & containers
+    # --------------------------------
 
-# --------------------------------
-# VALIDATION & CALLBACKS
-# --------------------------------
+    state.init_state(app, screen_dpi, screen_width, screen_height, RETINA)
 
-validate_numeric_input = validation.make_validator(app)
-callbacks.setup_traces()
+    # --------------------------------
+    # VALIDATION & CALLBACKS
+    # --------------------------------
 
-# --------------------------------
-# BUILD UI
-# --------------------------------
+    validate_numeric_input = validation.make_validator(app)
+    callbacks.setup_traces()
 
-widget_dict = layout.build_layout(app, validate_numeric_input)
+    # --------------------------------
+    # BUILD UI
+    # --------------------------------
 
-# --------------------------------
-# REACTIVE GUI UPDATES
-# --------------------------------
+    widget_dict = layout.build_layout(app, validate_numeric_input)
 
-gui_updates.register_widgets(widget_dict)
-gui_updates.setup_traces()
+    # --------------------------------
+    # REACTIVE GUI UPDATES
+    # --------------------------------
 
-# --------------------------------
-# CORRELATION & PLOTTING ENGINE
-# --------------------------------
+    gui_updates.register_widgets(widget_dict)
+    gui_updates.setup_traces()
 
-corr_plot.setup(widget_dict['group_plot'])
-state.val_UPDATE_COUNT.trace_add('write', corr_plot.UPDATE)
-corr_plot.UPDATE()
+    # --------------------------------
+    # CORRELATION & PLOTTING ENGINE
+    # --------------------------------
 
-# Two update() passes: the first resolves the basic pack layout; the second lets
-# CTkTabview finish its internal geometry so the canvas reports its true final size.
-app.update()
-app.update()
-corr_plot.fit_canvas_to_container()
+    corr_plot.setup(widget_dict['group_plot'])
+    state.val_UPDATE_COUNT.trace_add('write', corr_plot.UPDATE)
+    corr_plot.UPDATE()
 
-# --------------------------------
-# CLEANUP & SHUTDOWN
-# --------------------------------
+    # Two update() passes: the first resolves the basic pack layout; the second lets
+    # CTkTabview finish its internal geometry so the canvas reports its true final size.
+    app.update()
+    app.update()
+    corr_plot.fit_canvas_to_container()
 
-def on_window_closing():
-    for widget_id in app.tk.call('after', 'info'):
+    # --------------------------------
+    # CLEANUP & SHUTDOWN
+    # --------------------------------
+
+    def on_window_closing():
+        for widget_id in app.tk.call('after', 'info'):
+            try:
+                app.after_cancel(widget_id)
+            except Exception:
+                pass
         try:
-            app.after_cancel(widget_id)
+            import matplotlib.pyplot as plt
+            plt.close('all')
         except Exception:
             pass
-    try:
-        import matplotlib.pyplot as plt
-        plt.close('all')
-    except Exception:
-        pass
-    app.destroy()
-
-app.protocol("WM_DELETE_WINDOW", on_window_closing)
-
-# --------------------------------
-# RUN
-# --------------------------------
-
-app.deiconify()
-# On some displays (e.g. large external monitors) the canvas reports 1×1 during the
-# pre-show update passes, so fit_canvas_to_container() above is a no-op. Scheduling
-# a second call at after(0) guarantees the canvas is primed once the event loop has
-# resolved all geometry — this prevents the first real draw (Tab 1 data load) from
-# rendering at 2× zoom due to an uninitialised Tk PhotoImage.
-app.after(0, corr_plot.fit_canvas_to_container)
-app.mainloop()
\ No newline at end of file
+        app.destroy()
+
+    app.protocol("WM_DELETE_WINDOW", on_window_closing)
+
+    # --------------------------------
+    # RUN
+    # --------------------------------
+
+    app.deiconify()
+    # On some displays (e.g. large external monitors) the canvas reports 1×1 during the
+    # pre-show update passes, so fit_canvas_to_container() above is a no-op. Scheduling
+    # a second call at after(0) guarantees the canvas is primed once the event loop has
+    # resolved all geometry — this prevents the first real draw (Tab 1 data load) from
+    # rendering at 2× zoom due to an uninitialised Tk PhotoImage.
+    app.after(0, corr_plot.fit_canvas_to_container)
+    app.mainloop()
+
+
+# the GUI is only built when run as a script: batch worker processes (spawn start method, frozen builds)
+# re-import this module and must not open a window
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
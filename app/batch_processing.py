@@ -1,14 +1,22 @@
 import os
+import json
+import hashlib
 import xlsx
-from signal_processing import preprocess_dyad
-from export import export_sxcorr_data, export_wxcorr_data
-from cross_correlation import windowed_cross_correlation, standard_cross_correlation
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from signal_processing import preprocess_dyad, preprocess_signal, align_signals
+from export import export_sxcorr_data, export_wxcorr_data, export_sweep_data, export_batch_summary_data
+from cross_correlation import WxcorrResult, windowed_cross_correlation, standard_cross_correlation, summarize_wxcorr, stack_signals, windowed_cross_correlation_pair_stats, standard_cross_correlation_pair_stats
 import random
 import numpy as np
 from datetime import datetime
+from itertools import product
+from collections import Counter
 from scipy.stats import ttest_ind
+from significance import permutation_test
+from surrogates import surrogate_test
 from dfa import dfa_wxcorr, dfa
-from plot import plot_windowed_cross_correlation, plot_standard_cross_correlation, save_figure_to_png
+from manifest import BatchManifest, file_record, file_is_unchanged, params_fingerprint, write_json_atomic
 
 def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dyad_dir=''):
     """
@@ -30,6 +38,7 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
             - 'max_lag' (int): Maximum lag for windowed cross-correlation.
             - 'checkbox_absolute_corr' (bool): Indicates if absolute values should be used for correlation.
             - 'checkbox_average_windows' (bool): Indicates if windows should be averaged.
+            - 'use_lag_filter' (bool), 'lag_filter_min' (int), 'lag_filter_max' (int): Optional lag filter of windowed cross-correlation.
             - 'max_lag_sxc' (int): Maximum lag for standard cross-correlation.
             - 'checkbox_absolute_corr_sxc' (bool): Indicates if absolute values should be used for standard cross-correlation.
             - 'checkbox_fr' (bool): Indicates if the signal type is fixed-rate.
@@ -74,17 +83,23 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
             max_lag = params['max_lag']
             absolute_values = params['checkbox_absolute_corr']
             average_windows = params['checkbox_average_windows']
-            corr_data = windowed_cross_correlation(signal_a, signal_b, window_size=window_size, step_size=step_size, max_lag=max_lag, absolute=absolute_values, average_windows=average_windows)
+            corr_data = windowed_cross_correlation(
+                signal_a, signal_b, window_size=window_size, step_size=step_size, max_lag=max_lag,
+                use_lag_filter=params['use_lag_filter'], lag_filter_min=params['lag_filter_min'], lag_filter_max=params['lag_filter_max'],
+                absolute=absolute_values, average_windows=average_windows
+            )
             
-            # dfa per lag (per horizontal line)
-            # dfa_corr_data = None
-            # try:
-            #     dfa_data = dfa_wxcorr(corr_data, max_lag, order=1)
-            #     dfa_alpha_per_lag = [{'lag': o['lag'], 'alpha': o['A'][0]} for o in dfa_data]
-            #     dfa_corr_data = dfa_alpha_per_lag
-            # except ValueError as e:
-            #     dfa_corr_data = None
-            #     print("TODO: handle dfa update error in wxcorr update", e) # TODO
+            # optional within-dyad surrogate test (exported)
+            surrogates = _dyad_surrogate_test(signal_a, signal_b, params, windowed=True) if export else None
+
+            # dfa per lag (per horizontal line), all lags in one batched call; only needed for export
+            dfa_corr_data = None
+            if export:
+                try:
+                    dfa_data = dfa_wxcorr(corr_data, max_lag, order=1)
+                    dfa_corr_data = [{'lag': o['lag'], 'alpha': o['A'][0]} for o in dfa_data]
+                except ValueError as e:
+                    print(f"DFA per lag skipped for {dyad_dir}: {e}")
 
             # export
             export_params = {
@@ -103,27 +118,30 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
                 'signal_a_std': _signal_a_z_scored,
                 'signal_b_std': _signal_b_z_scored,
                 'wxcorr': corr_data,
-                #'dfa_alpha_per_lag_wxcorr': dfa_corr_data,
+                'dfa_alpha_per_lag_wxcorr': dfa_corr_data,
                 'checkbox_lag_filter': params['use_lag_filter'],
                 'lag_filter_min': params['lag_filter_min'],
                 'lag_filter_max': params['lag_filter_max'],
-                'is_standardised': use_standardised_data
+                'is_standardised': use_standardised_data,
+                'surrogates': surrogates,
             }
             
             # export data and plot
+            output_name = _dyad_output_name(dyad_dir, windowed=True)
             if export:
-                output_file_name = f"wx_{os.path.basename(dyad_dir) if dyad_dir else datetime.now().strftime('%Y%m%d%H%M%S')}_wxcorr.xlsx"
-                output_file_path = os.path.join(output_dir, output_file_name)
+                output_file_path = os.path.join(output_dir, f"{output_name}.xlsx")
                 export_wxcorr_data(output_file_path, export_params)
-                
+
+            if export and params.get('export_plots', True):
+                # matplotlib is only imported when plots are rendered (headless / CLI runs without plots)
+                from plot import plot_windowed_cross_correlation, save_figure_to_png
                 fig = plot_windowed_cross_correlation(
                     wxc_data=corr_data, signal_a=signal_a, signal_b=signal_b, 
                     show_sigmoid_correlations=params['sigmoid_correlations'],
                     use_lag_filter=params['use_lag_filter'], lag_filter_min=params['lag_filter_min'], lag_filter_max=params['lag_filter_max'],
                     window_size=params['window_size'], max_lag=params['max_lag'], step_size=params['step_size']
                 )
-                plot_file_name = f"wx_{os.path.basename(dyad_dir) if dyad_dir else datetime.now().strftime('%Y%m%d%H%M%S')}_wxcorr.png"
-                plot_file_path = os.path.join(output_dir, plot_file_name)
+                plot_file_path = os.path.join(output_dir, f"{output_name}.png")
                 save_figure_to_png(fig=fig, filepath=plot_file_path)
 
             # return correlation data    
@@ -139,6 +157,9 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
             A, F = dfa(corr_data['corr'], order=1)
             dfa_alpha = A[0]
 
+            # optional within-dyad surrogate test (exported)
+            surrogates = _dyad_surrogate_test(signal_a, signal_b, params, windowed=False) if export else None
+
             # export
             export_params = {
                 'selected_dyad_dir': dyad_dir,
@@ -154,17 +175,19 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
                 'signal_b_std': _signal_b_z_scored,
                 'sxcorr': corr_data,
                 'is_standardised': use_standardised_data,
-                'dfa_alpha': dfa_alpha
+                'dfa_alpha': dfa_alpha,
+                'surrogates': surrogates,
             }
             
             # export data and plot
+            output_name = _dyad_output_name(dyad_dir, windowed=False)
             if export:
-                output_file_name = f"{os.path.basename(dyad_dir) if dyad_dir else datetime.now().strftime('%Y%m%d%H%M%S')}_sxcorr.xlsx"
-                output_file_path = os.path.join(output_dir, output_file_name)
+                output_file_path = os.path.join(output_dir, f"{output_name}.xlsx")
                 export_sxcorr_data(output_file_path, export_params)
 
-                plot_file_name = f"{os.path.basename(dyad_dir) if dyad_dir else datetime.now().strftime('%Y%m%d%H%M%S')}_sxcorr.png"
-                plot_file_path = os.path.join(output_dir, plot_file_name)
+            if export and params.get('export_plots', True):
+                from plot import plot_standard_cross_correlation, save_figure_to_png
+                plot_file_path = os.path.join(output_dir, f"{output_name}.png")
                 fig = plot_standard_cross_correlation(sxc_data=corr_data, signal_a=signal_a, signal_b=signal_b)
                 save_figure_to_png(fig=fig, filepath=plot_file_path)
 
@@ -173,19 +196,149 @@ def _process_dyad(file_path_a, file_path_b, output_dir, params, export=True, dya
         print(f"! {os.path.basename(file_path_a)}, {os.path.basename(file_path_b)}: {e}")
         raise(e)
 
-def random_pair_analysis(params, input_dir, random_pair_count=100): 
+def _dyad_output_name(dyad_dir, windowed):
+    """
+    File name (without extension) of a dyad's xlsx / png output: named after the dyad folder, or the current time
+    if there is none.
+    """
+    name = os.path.basename(dyad_dir) if dyad_dir else datetime.now().strftime('%Y%m%d%H%M%S')
+    return f"wx_{name}_wxcorr" if windowed else f"{name}_sxcorr"
+
+def _dyad_output_files(dyad_dir, params):
+    """
+    Output files (names in the output folder) of a dyad processed by `batch_process`.
+    """
+    output_name = _dyad_output_name(dyad_dir, windowed=params['checkbox_windowed_xcorr'])
+    extensions = ('.xlsx', '.png') if params.get('export_plots', True) else ('.xlsx',)
+    return [f"{output_name}{extension}" for extension in extensions]
+
+def _dyad_surrogate_test(signal_a, signal_b, params, windowed):
+    """
+    Runs the optional within-dyad surrogate test (see `surrogates.surrogate_test`) with the correlation settings of params.
+    Args:
+        signal_a (array-like): First (preprocessed) signal of the dyad.
+        signal_b (array-like): Second (preprocessed) signal of the dyad, surrogates are made from it.
+        params (dict): A dictionary of parameters, see batch_process function for details.
+        windowed (bool): Windowed or standard cross-correlation.
+    Returns:
+        dict: Surrogate test result, or None if params['surrogate_count'] is not set.
+    """
+    n_surrogates = params.get('surrogate_count', 0)
+    if not n_surrogates:
+        return None
+    method = params.get('surrogate_method', 'circular_shift')
+    if windowed:
+        return surrogate_test(
+            signal_a, signal_b, n_surrogates=n_surrogates, method=method, windowed=True,
+            window_size=params['window_size'], step_size=params['step_size'], max_lag=params['max_lag'],
+            use_lag_filter=params['use_lag_filter'], lag_filter_min=params['lag_filter_min'], lag_filter_max=params['lag_filter_max'],
+            absolute=params['checkbox_absolute_corr'], average_windows=params['checkbox_average_windows'],
+        )
+    return surrogate_test(
+        signal_a, signal_b, n_surrogates=n_surrogates, method=method, windowed=False,
+        max_lag=params['max_lag_sxc'], absolute=params['checkbox_absolute_corr_sxc'],
+    )
+
+def _build_signal_table(file_paths, params, progress_callback=None, cancel_event=None):
+    """
+    Load and preprocess every file once.
+    Each workbook is read once; each (file, column) signal used in pairs (selected_column_a / selected_column_b) is preprocessed once.
+    Args:
+        file_paths (list): Paths of the xlsx files.
+        params (dict): A dictionary of parameters, see batch_process function for details.
+        progress_callback (callable, optional): progress_callback(files loaded, total files), called after each file.
+        cancel_event (threading.Event, optional): Stop loading (the table is incomplete) once it is set.
+    Returns:
+        dict: Preprocessed signals keyed by (file_path, column name). Files that cannot be read or preprocessed are left out (and reported).
+    """
+    signal_type = 'event-based' if params['checkbox_eb'] else 'fixed-rate'
+    column_names = {params['workbook_data']['selected_column_a'], params['workbook_data']['selected_column_b']}
+
+    signal_table = {}
+    for i, file_path in enumerate(file_paths, start=1):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        try:
+            wb = xlsx.read_xlsx(file_path)
+            columns = xlsx.get_columns(wb, params['selected_sheet'], headers=params['workbook_data']['has_headers'])
+            signals = {column: preprocess_signal(columns[column], signal_type) for column in column_names}
+        except Exception as e:
+            print(f"! {os.path.basename(file_path)}: {e}")
+        else:
+            for column, signal in signals.items():
+                signal_table[(file_path, column)] = signal
+        if progress_callback is not None:
+            progress_callback(i, len(file_paths))
+    return signal_table
+
+def _pair_average_correlations(signals_a, signals_b, pair_a, pair_b, params, n_jobs=1):
+    """
+    Average correlation of each pair of preprocessed signals, all pairs computed in one batched call
+    (see `windowed_cross_correlation_pair_stats` / `standard_cross_correlation_pair_stats`).
+    Pairs are only aligned, standardised and stacked chunk by chunk, so memory does not grow with the number of pairs.
+    Args:
+        signals_a (list): Preprocessed signals (see `preprocess_signal`) used as the first signal of pairs.
+        signals_b (list): Preprocessed signals used as the second signal of pairs.
+        pair_a (numpy.ndarray): Index into signals_a of each pair's first signal.
+        pair_b (numpy.ndarray): Index into signals_b of each pair's second signal.
+        params (dict): A dictionary of parameters, see batch_process function for details.
+        n_jobs (int, optional): Number of threads correlating chunks of pairs in parallel (-1: one per CPU core).
+    Returns:
+        numpy.ndarray: Average correlation of each pair (nan if the signals are too short for a window).
+    """
+    if not len(pair_a):
+        return np.empty(0)
+
+    # aligned pair length: the shorter of the two signals
+    lengths = np.minimum(
+        np.array([len(s) for s in signals_a], dtype=int)[pair_a],
+        np.array([len(s) for s in signals_b], dtype=int)[pair_b],
+    )
+    use_standardised_data = params['standardised_signals']
+
+    def load_pairs(pairs, width):
+        # align pairs and select signals based on standardisation flag
+        rows_a, rows_b = [], []
+        for i, j in zip(pair_a[pairs], pair_b[pairs]):
+            _signal_a, _signal_b, _signal_a_z_scored, _signal_b_z_scored = align_signals(signals_a[i], signals_b[j])
+            rows_a.append(_signal_a_z_scored if use_standardised_data else _signal_a)
+            rows_b.append(_signal_b_z_scored if use_standardised_data else _signal_b)
+        return stack_signals(rows_a, width)[0], stack_signals(rows_b, width)[0]
+
+    if params['checkbox_windowed_xcorr']:
+        stats = windowed_cross_correlation_pair_stats(
+            load_pairs, lengths, window_size=params['window_size'], step_size=params['step_size'], max_lag=params['max_lag'],
+            use_lag_filter=params['use_lag_filter'], lag_filter_min=params['lag_filter_min'], lag_filter_max=params['lag_filter_max'],
+            absolute=params['checkbox_absolute_corr'], average_windows=params['checkbox_average_windows'], n_jobs=n_jobs
+        )
+    else:
+        stats = standard_cross_correlation_pair_stats(load_pairs, lengths, max_lag=params['max_lag_sxc'], absolute=params['checkbox_absolute_corr_sxc'], n_jobs=n_jobs)
+    return stats['mean_correlation']
+
+def random_pair_analysis(params, input_dir, random_pair_count=100, exhaustive=False, n_permutations=0, n_jobs=1, progress_callback=None, cancel_event=None):
     """
     Perform analysis on random pairs and real dyad correlations.
+    Every xlsx file in the input tree is loaded and preprocessed once (see `_build_signal_table`), pairs are formed from
+    the preprocessed signals as index arrays (no per-pair objects, also for exhaustive mode) and every distinct pair is
+    correlated once, all in one batched call that stacks pairs chunk by chunk (see `_pair_average_correlations`).
     Args:
         params (dict): A dictionary of parameters, see batch_process function for details.
         input_dir (str): Path to the input directory containing dyad folders with Excel files.
-        random_pair_count (int, optional): Number of random pairs to generate. Defaults to 100.
+        random_pair_count (int, optional): Number of random pairs to generate. Defaults to 100. Ignored if exhaustive.
+        exhaustive (bool, optional): Use all non-dyad pairs (every two files from different dyad folders) instead of
+            random pairs. Defaults to False.
+        n_permutations (int, optional): Number of label permutations of a permutation test (difference of mean
+            correlations, see `significance.permutation_test`) run alongside the t-test. Defaults to 0 (no permutation test).
+        n_jobs (int, optional): Number of threads correlating chunks of pairs in parallel (-1: one per CPU core). Defaults to 1.
+        progress_callback (callable, optional): progress_callback(done, total) with steps = loaded files + correlation + tests.
+        cancel_event (threading.Event, optional): Stop the analysis (between files / steps) once it is set.
     Returns:
-        tuple: A tuple containing:
+        None if cancelled, else a tuple containing:
             - t_stat (float): The t-statistic from Welch's t-test.
             - p_value (float): The p-value from Welch's t-test.
-            - average_correlations_rp (list): List of average correlations for random pairs.
+            - average_correlations_rp (list): List of average correlations for random (or all non-dyad) pairs.
             - average_correlations_real (list): List of average correlations for real dyads.
+            - permutation (dict): Result of the permutation test (None if n_permutations is 0).
     """
 
     # get input data
@@ -194,60 +347,82 @@ def random_pair_analysis(params, input_dir, random_pair_count=100):
                        for dyad_folder in dyad_folders 
                        for f in os.listdir(os.path.join(input_dir, dyad_folder)) 
                        if f.endswith('.xlsx')]
-    # make random_pair_count random pairs of xlsx files
-    random_pairs = []
-    for _ in range(random_pair_count):
-        pair = random.sample(xlsx_file_paths, 2)
-        random_pairs.append(pair)
-
-    # read correlation type
-    is_windowed_corr = params['checkbox_windowed_xcorr']
-
-    # process random pairs
-    all_correlations_rp = []
-    for pair in random_pairs:
-        file_path_a, file_path_b = pair
-        corr_data = _process_dyad(file_path_a, file_path_b, None, params, export=False)
-        if not corr_data: continue
-        if is_windowed_corr:
-            all_correlations_rp.append([val for d in corr_data for val in d['correlations']])
-        else:
-            all_correlations_rp.append(corr_data['corr'])
 
-    # calculate averages of all correlations
-    average_correlations_rp = [np.mean(c) for c in all_correlations_rp]
+    # load and preprocess all files once (one progress step per file, then correlation and tests)
+    n_steps = len(xlsx_file_paths) + 2
+
+    def report_file_progress(files_done, _):
+        if progress_callback is not None:
+            progress_callback(files_done, n_steps)
+
+    signal_table = _build_signal_table(xlsx_file_paths, params, report_file_progress, cancel_event)
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    column_a = params['workbook_data']['selected_column_a']
+    column_b = params['workbook_data']['selected_column_b']
+
+    # index the (readable) files; pairs are index arrays into this table
+    valid_file_paths = [f for f in xlsx_file_paths if (f, column_a) in signal_table]
+    file_index = {file_path: i for i, file_path in enumerate(valid_file_paths)}
+    n_files = len(valid_file_paths)
+
+    # make random_pair_count random pairs of files, or all pairs of files from different dyads
+    if exhaustive:
+        dyad_ids = np.unique([os.path.dirname(f) for f in valid_file_paths], return_inverse=True)[1]
+        random_a, random_b = np.triu_indices(n_files, k=1)
+        is_non_dyad = dyad_ids[random_a] != dyad_ids[random_b]
+        random_a, random_b = random_a[is_non_dyad], random_b[is_non_dyad]
+    else:
+        random_pairs = np.array([random.sample(range(n_files), 2) for _ in range(random_pair_count)], dtype=int).reshape(-1, 2)
+        random_a, random_b = random_pairs[:, 0], random_pairs[:, 1]
 
-    # process all real dyads
-    all_correlations_real = []
+    # collect real dyads
+    real_pairs = []
     for dyad_folder in dyad_folders:
         dyad_path = os.path.join(input_dir, dyad_folder)
         xlsx_files = [f for f in os.listdir(dyad_path) if f.endswith('.xlsx')]
         if len(xlsx_files) >= 2:
             file_path_a = os.path.join(dyad_path, xlsx_files[0])
             file_path_b = os.path.join(dyad_path, xlsx_files[1])
-            corr_data = _process_dyad(
-                file_path_a=file_path_a, 
-                file_path_b=file_path_b, 
-                output_dir=None, 
-                params=params, 
-                export=False
-            )
-            if not corr_data: continue
-            if is_windowed_corr:
-                all_correlations_real.append([val for d in corr_data for val in d['correlations']])
-            else:
-                all_correlations_real.append(corr_data['corr'])
+            if (file_path_a, column_a) in signal_table and (file_path_b, column_b) in signal_table:
+                real_pairs.append((file_index[file_path_a], file_index[file_path_b]))
+    real_pairs = np.array(real_pairs, dtype=int).reshape(-1, 2)
+
+    # correlate every distinct (file a, file b) pair once, all pairs in one batched call
+    pair_codes = np.concatenate((random_a * n_files + random_b, real_pairs[:, 0] * n_files + real_pairs[:, 1]))
+    distinct_codes, pair_to_distinct = np.unique(pair_codes, return_inverse=True)
+    average_correlations = _pair_average_correlations(
+        [signal_table[(file_path, column_a)] for file_path in valid_file_paths],
+        [signal_table[(file_path, column_b)] for file_path in valid_file_paths],
+        distinct_codes // n_files,
+        distinct_codes % n_files,
+        params, n_jobs
+    )[pair_to_distinct]
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    if progress_callback is not None:
+        progress_callback(len(xlsx_file_paths) + 1, n_steps)
 
-    # calculate averages of all real dyad correlations
-    average_correlations_real = [np.mean(c) for c in all_correlations_real]
+    # average correlations of random pairs and real dyads (pairs too short for a window are skipped)
+    average_correlations_rp = average_correlations[:len(random_a)]
+    average_correlations_real = average_correlations[len(random_a):]
+    average_correlations_rp = average_correlations_rp[~np.isnan(average_correlations_rp)].tolist()
+    average_correlations_real = average_correlations_real[~np.isnan(average_correlations_real)].tolist()
 
     # run Welch's t-test
     t_stat, p_value = ttest_ind(average_correlations_rp, average_correlations_real, equal_var=False)
 
-    return t_stat, p_value, average_correlations_rp, average_correlations_real
+    # optionally run a permutation test
+    permutation = None
+    if n_permutations > 0 and average_correlations_rp and average_correlations_real:
+        permutation = permutation_test(average_correlations_rp, average_correlations_real, n_permutations=n_permutations)
+    if progress_callback is not None:
+        progress_callback(n_steps, n_steps)
 
+    return t_stat, p_value, average_correlations_rp, average_correlations_real, permutation
 
-def batch_process(params):
+
+def batch_process(params, progress_callback=None, cancel_event=None):
     """
     Processes a batch of dyad data files, performs cross-correlation analysis, and exports the results.
     Args:
@@ -274,8 +449,35 @@ def batch_process(params):
             - use_lag_filter (bool): Apply lag filter to limit lag range (wxcorr only).
             - lag_filter_min (int): Minimum lag for filter (inclusive) (wxcorr only).
             - lag_filter_max (int): Maximum lag for filter (inclusive) (wxcorr only).
+            - n_workers (int, optional): Number of worker processes for dyads (default 1 := sequential,
+              None or < 1 := one per CPU core). If a worker process dies, the remaining dyads are processed one at a
+              time in a worker process and the dyad it died on is recorded as failed.
+            - surrogate_count (int, optional): Number of within-dyad surrogates of signal b per dyad (default 0 := no
+              surrogate test). Null distributions and p-values are written to the dyad's xlsx file.
+            - surrogate_method (str, optional): 'circular_shift' (default) or 'phase_randomization'.
+            - export_plots (bool, optional): Save a PNG plot per dyad (default True). matplotlib is only imported
+              if plots are saved.
+            - shard (tuple, optional): (i, N) to only process shard i of N (1 ≤ i ≤ N) of the dyad folders, for
+              spreading one study over several machines. Dyads are assigned by a stable hash of the dyad folder name
+              (see `dyad_shard`), so every machine gets the same partition. Default None := all dyads.
+            - resume (bool, optional): Skip dyads whose outputs are up to date (default True). Every processed dyad is
+              recorded in a manifest in the output folder (wx_batch_manifest.jsonl, per shard if sharded): input file
+              sizes / modification times / hashes, the settings fingerprint, output files and the error if it failed.
+              A dyad is up to date if it succeeded with the same settings, its input files are unchanged and its
+              output files exist; failed and changed dyads are processed again.
+        progress_callback (callable, optional): progress_callback(dyads done, total dyads), called after each dyad
+            (up-to-date dyads count as done from the start).
+        cancel_event (threading.Event, optional): Stop after the dyads in progress once it is set. Finished dyads
+            stay in the manifest and summary, so a rerun resumes where the run stopped.
     Returns:
-        None
+        dict: Summary of the run (None if input or output folder is missing), also written to the output folder as
+        JSON (wx_batch_summary.json or wx_batch_summary_shard-<i>-of-<N>.json, see `merge_batch_summaries`):
+            - 'succeeded' (list): Dyad folders that were processed and exported.
+            - 'failed' (list): (dyad folder, error message) tuples of dyads that raised an error.
+            - 'skipped' (list): Dyad folders with fewer than two xlsx files.
+            - 'up_to_date' (list): Succeeded dyad folders that were not processed again (see resume).
+            - 'results' (list of dict): Summary values of each succeeded dyad (see `_result_summary`).
+            - 'cancelled' (bool): True if the run was stopped via cancel_event.
     """
 
     # get directory in which dyad directories are stored
@@ -286,7 +488,138 @@ def batch_process(params):
     output_dir = params['output_dir']
     if not output_dir: return
 
-    # process dyads in folder
+    # collect dyads in folder (dyad folders with fewer than two xlsx files are skipped)
+    jobs, skipped = _collect_dyads(batch_input_folder)
+
+    # only keep the dyads of this machine's shard
+    shard = params.get('shard')
+    if shard is not None:
+        shard_index, n_shards = shard
+        if not 1 <= shard_index <= n_shards:
+            raise ValueError(f"Shard index must be in [1, {n_shards}] (got {shard_index}).")
+        jobs = [job for job in jobs if dyad_shard(job[2], n_shards) == shard_index]
+        skipped = [dyad_path for dyad_path in skipped if dyad_shard(dyad_path, n_shards) == shard_index]
+
+    # manifest of processed dyads; dyads with up-to-date outputs are not processed again
+    manifest = BatchManifest(os.path.join(output_dir, _shard_file_name("wx_batch_manifest", shard, ".jsonl")))
+    settings_fingerprint = params_fingerprint(_summary_params(params))
+    summary = {'succeeded': [], 'failed': [], 'skipped': skipped, 'up_to_date': [], 'results': [], 'cancelled': False}
+    pending = []
+    for job in jobs:
+        entry = manifest.get(os.path.basename(job[2]))
+        if params.get('resume', True) and _is_up_to_date(entry, job, settings_fingerprint, output_dir):
+            summary['up_to_date'].append(job[2])
+            _add_to_summary(summary, {'dyad_dir': job[2], 'error': None, 'values': entry['values']})
+        else:
+            pending.append(job)
+
+    def finish(record):
+        _add_to_summary(summary, record)
+        manifest.record(os.path.basename(record['dyad_dir']), params=settings_fingerprint, **{key: value for key, value in record.items() if key != 'dyad_dir'})
+        if progress_callback is not None:
+            progress_callback(len(summary['succeeded']) + len(summary['failed']), len(jobs))
+
+    def is_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            summary['cancelled'] = True
+        return summary['cancelled']
+
+    if progress_callback is not None:
+        progress_callback(len(summary['succeeded']), len(jobs))
+
+    # process dyads, sequentially or on a process pool; errors are collected per dyad
+    n_workers = _resolve_n_workers(params.get('n_workers', 1), len(pending))
+    if n_workers <= 1:
+        for job in pending:
+            if is_cancelled():
+                break
+            finish(_run_dyad_job(job, output_dir, params))
+    else:
+        worker_params = _picklable_params(params)
+        initializer = _init_batch_worker if params.get('export_plots', True) else None
+        while pending:
+            broken = None
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=initializer) as pool:
+                futures = [pool.submit(_run_dyad_job, job, output_dir, worker_params) for job in pending]
+                for i, future in enumerate(futures):
+                    if is_cancelled():
+                        # dyads not started yet are dropped, dyads in progress are finished (and recorded)
+                        for pending_future in futures:
+                            pending_future.cancel()
+                    if future.cancelled():
+                        continue
+                    try:
+                        finish(future.result())
+                    except BrokenProcessPool as e:
+                        broken = i, e
+                        break
+            if broken is None:
+                break
+
+            # a worker process died (e.g. killed for running out of memory) and took all unfinished dyads of the pool
+            # with it. Dyads that finished before it died are recorded, the rest runs on a fresh pool with one worker,
+            # which runs the dyads in order, so the dyad a worker dies on is known: it is recorded as failed and the
+            # dyads after it go on in another fresh pool.
+            i, e = broken
+            if n_workers == 1:
+                finish({'dyad_dir': pending[i][2], 'error': f"{type(e).__name__}: {e}", 'values': None, 'inputs': [], 'outputs': []})
+                i += 1
+            rerun = []
+            for job, future in zip(pending[i:], futures[i:]):
+                if future.cancelled():
+                    continue
+                if future.exception() is None:
+                    finish(future.result())
+                else:
+                    rerun.append(job)
+            pending = rerun
+            n_workers = 1
+    manifest.compact()
+
+    print(f"Batch processing {'cancelled' if summary['cancelled'] else 'finished'}{f' (shard {shard[0]}/{shard[1]})' if shard else ''}: {len(summary['succeeded'])} succeeded ({len(summary['up_to_date'])} up to date), {len(summary['failed'])} failed, {len(summary['skipped'])} skipped.")
+    for dyad_path, error in summary['failed']:
+        print(f"! {os.path.basename(dyad_path)}: {error}")
+
+    _write_batch_summary(os.path.join(output_dir, _shard_file_name("wx_batch_summary", shard, ".json")), summary, params)
+
+    return summary
+
+def _shard_file_name(name, shard, extension):
+    """
+    File name of a per-run file in the output folder, with the shard (if any): name_shard-<i>-of-<N>.ext.
+    """
+    return f"{name}_shard-{shard[0]}-of-{shard[1]}{extension}" if shard else f"{name}{extension}"
+
+def _is_up_to_date(entry, job, settings_fingerprint, output_dir):
+    """
+    True if a dyad's manifest entry (see `batch_process`, resume) is a success with the current settings, the same
+    (unchanged) input files and existing output files.
+    """
+    if entry is None or entry['error'] is not None or entry['params'] != settings_fingerprint:
+        return False
+    file_path_a, file_path_b, _ = job
+    if [record['path'] for record in entry['inputs']] != [file_path_a, file_path_b]:
+        return False
+    if not all(file_is_unchanged(record) for record in entry['inputs']):
+        return False
+    return all(os.path.exists(os.path.join(output_dir, name)) for name in entry['outputs'])
+
+def dyad_shard(dyad_dir, n_shards):
+    """
+    Shard (1..n_shards) of a dyad folder: stable hash of the folder name (not the full path, so machines with
+    different mount points agree), independent of the Python process (unlike hash()).
+    """
+    name = os.path.basename(os.path.normpath(dyad_dir))
+    digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % n_shards + 1
+
+def _collect_dyads(batch_input_folder):
+    """
+    Dyads of a batch input folder: (file_path_a, file_path_b, dyad_dir) of every dyad folder with at least two xlsx
+    files (the first two are used), and the dyad folders with fewer files.
+    """
+    jobs = []
+    skipped = []
     dyad_folders = [f for f in os.listdir(batch_input_folder) if os.path.isdir(os.path.join(batch_input_folder, f))]
     for dyad_folder in dyad_folders:
         dyad_path = os.path.join(batch_input_folder, dyad_folder)
@@ -294,4 +627,273 @@ def batch_process(params):
         if len(xlsx_files) >= 2:
             file_path_a = os.path.join(dyad_path, xlsx_files[0])
             file_path_b = os.path.join(dyad_path, xlsx_files[1])
-            _process_dyad(file_path_a, file_path_b, output_dir, params, dyad_dir=dyad_path, export=True)
\ No newline at end of file
+            jobs.append((file_path_a, file_path_b, dyad_path))
+        else:
+            skipped.append(dyad_path)
+    return jobs, skipped
+
+def _resolve_n_workers(n_workers, n_jobs):
+    """
+    Number of worker processes for n_jobs dyads (n_workers None or < 1 := one per CPU core).
+    """
+    if n_workers is None or n_workers < 1:
+        n_workers = os.cpu_count() or 1
+    return max(1, min(n_workers, n_jobs))
+
+def _picklable_params(params):
+    """
+    Copy of params that can be sent to worker processes: workbook_data only keeps the plain values
+    _process_dyad reads (the GUI's workbook_data also holds loaded openpyxl workbooks).
+    """
+    workbook_data = params['workbook_data']
+    return {
+        **params,
+        'workbook_data': {
+            'has_headers': workbook_data['has_headers'],
+            'selected_column_a': workbook_data['selected_column_a'],
+            'selected_column_b': workbook_data['selected_column_b'],
+        },
+    }
+
+def _init_batch_worker():
+    """
+    Initializer of batch worker processes: figures are only rendered to files, so use a non-GUI backend.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+def _run_dyad_job(job, output_dir, params):
+    """
+    Process and export one dyad. Returns its record, errors never propagate:
+    'dyad_dir', 'error' (message or None), 'values' (see `_result_summary`, None if failed), 'inputs' (see
+    `manifest.file_record`, taken before processing) and 'outputs' (output file names, [] if failed).
+    """
+    file_path_a, file_path_b, dyad_dir = job
+    try:
+        inputs = [file_record(file_path_a), file_record(file_path_b)]
+        corr_data = _process_dyad(file_path_a, file_path_b, output_dir, params, dyad_dir=dyad_dir, export=True)
+        return {'dyad_dir': dyad_dir, 'error': None, 'values': _result_summary(corr_data), 'inputs': inputs, 'outputs': _dyad_output_files(dyad_dir, params)}
+    except Exception as e:
+        return {'dyad_dir': dyad_dir, 'error': f"{type(e).__name__}: {e}", 'values': None, 'inputs': [], 'outputs': []}
+
+def _result_summary(corr_data):
+    """
+    Summary values of one dyad's correlation result (plain floats / ints, JSON serializable).
+    Windowed: n_windows, mean_correlation, mean_r_max, mean_tau_max (see `summarize_wxcorr`).
+    Standard: mean_correlation, r_max, tau_max.
+    """
+    if isinstance(corr_data, WxcorrResult):
+        summary = summarize_wxcorr(corr_data)
+        return {
+            'n_windows': int(summary['n_windows']),
+            'mean_correlation': float(summary['mean_correlation']),
+            'mean_r_max': float(summary['mean_r_max']),
+            'mean_tau_max': float(summary['mean_tau_max']),
+        }
+    return {
+        'mean_correlation': float(np.mean(corr_data['corr'])),
+        'r_max': float(np.max(corr_data['corr'])),
+        'tau_max': int(corr_data['lags'][np.argmax(corr_data['corr'])]),
+    }
+
+def _add_to_summary(summary, record):
+    dyad_dir = record['dyad_dir']
+    if record['error'] is None:
+        summary['succeeded'].append(dyad_dir)
+        summary['results'].append({'dyad': os.path.basename(dyad_dir), **record['values']})
+    else:
+        summary['failed'].append((dyad_dir, record['error']))
+
+def _summary_params(params):
+    """
+    Analysis settings of a run for its summary file and the resume fingerprint of its dyads: the params
+    `_process_dyad` reads for the selected correlation type (and the selected columns), with the defaults of optional
+    ones filled in. Everything else (folders, workers, shard, random pair settings) is left out, so it never
+    invalidates finished dyads. Shards of one study have identical settings.
+    """
+    keys = ['selected_sheet', 'checkbox_eb', 'checkbox_fr', 'standardised_signals', 'checkbox_windowed_xcorr']
+    if params['checkbox_windowed_xcorr']:
+        keys += ['window_size', 'step_size', 'max_lag', 'checkbox_absolute_corr', 'checkbox_average_windows', 'use_lag_filter', 'lag_filter_min', 'lag_filter_max']
+        # sigmoid scaling only changes the png plot
+        if params.get('export_plots', True):
+            keys.append('sigmoid_correlations')
+    else:
+        keys += ['max_lag_sxc', 'checkbox_absolute_corr_sxc']
+    optional = {'surrogate_count': 0, 'surrogate_method': 'circular_shift', 'export_plots': True}
+    settings = {key: params[key] for key in keys}
+    settings.update({key: params.get(key, default) for key, default in optional.items()})
+    settings['workbook_data'] = _picklable_params(params)['workbook_data']
+    return settings
+
+def _write_batch_summary(file_path, summary, params):
+    """
+    Write a batch summary (see `batch_process`) with the run's settings and shard to a JSON file.
+    """
+    shard = params.get('shard')
+    content = {
+        'shard': list(shard) if shard else None,
+        'params': _summary_params(params),
+        **summary,
+    }
+    write_json_atomic(file_path, content)
+
+def merge_batch_summaries(summary_paths, output_dir):
+    """
+    Combines the per-shard summary files of a sharded batch run (see `batch_process`, params['shard']) into one
+    study-level result: wx_batch_summary.json and wx_batch_summary.xlsx (one row per dyad, see
+    `export.export_batch_summary_data`) in output_dir.
+    Args:
+        summary_paths (list of str): Summary files of the shards.
+        output_dir (str): Directory where the merged files are saved.
+    Returns:
+        dict: Merged summary ('succeeded', 'failed', 'skipped', 'results', 'params', 'shards' and 'missing_shards').
+    Raises:
+        ValueError: If the shards were run with different settings or shard counts, or a shard appears twice.
+    """
+    summaries = []
+    for summary_path in summary_paths:
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            summaries.append(json.load(f))
+    if not summaries:
+        raise ValueError("No summary files to merge.")
+
+    # all shards must come from the same study setup
+    settings = summaries[0]['params']
+    n_shards = summaries[0]['shard'][1] if summaries[0]['shard'] else 1
+    shard_indices = []
+    for summary_path, summary in zip(summary_paths, summaries):
+        if summary['params'] != settings:
+            raise ValueError(f"{os.path.basename(summary_path)} was run with different settings than {os.path.basename(summary_paths[0])}.")
+        shard_index, shard_count = summary['shard'] if summary['shard'] else (1, 1)
+        if shard_count != n_shards:
+            raise ValueError(f"{os.path.basename(summary_path)} is shard {shard_index} of {shard_count}, expected {n_shards} shards.")
+        if shard_index in shard_indices:
+            raise ValueError(f"Shard {shard_index} of {n_shards} appears more than once.")
+        shard_indices.append(shard_index)
+
+    missing_shards = sorted(set(range(1, n_shards + 1)) - set(shard_indices))
+    if missing_shards:
+        print(f"! Missing shards: {', '.join(str(i) for i in missing_shards)} of {n_shards}.")
+
+    merged = {
+        'params': settings,
+        'shards': sorted(shard_indices),
+        'missing_shards': missing_shards,
+        **{key: [entry for summary in summaries for entry in summary[key]] for key in ('succeeded', 'failed', 'skipped')},
+        'results': sorted((row for summary in summaries for row in summary['results']), key=lambda row: row['dyad']),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    write_json_atomic(os.path.join(output_dir, "wx_batch_summary.json"), merged)
+    export_batch_summary_data(os.path.join(output_dir, "wx_batch_summary.xlsx"), merged)
+
+    print(f"Merged {len(summaries)} of {n_shards} shards: {len(merged['succeeded'])} succeeded, {len(merged['failed'])} failed, {len(merged['skipped'])} skipped.")
+    return merged
+
+
+def make_parameter_grid(**values):
+    """
+    All combinations of parameter values, e.g. make_parameter_grid(window_size=[100, 150], max_lag=[20, 30]).
+    Args:
+        **values: Lists of values per parameter (params keys, see batch_process function).
+    Returns:
+        list of dict: One parameter set per combination.
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in product(*(values[name] for name in names))]
+
+def parameter_sweep(params, parameter_sets):
+    """
+    Evaluates a list (or grid, see `make_parameter_grid`) of parameter sets on all dyads of a batch input folder.
+    Each dyad is loaded and preprocessed once, then every parameter set is evaluated on the cached signals. Parameter
+    sets are evaluated grouped by window geometry; geometries shared by several sets are computed with the strided
+    engine, so its cached normalized windows are reused across sets that only differ in lags (see
+    `cross_correlation._normalized_windows`). The cumsum engine, which 'auto' picks for highly overlapping windows,
+    would redo its prefix sums for every set.
+    Results of all dyads and parameter sets are written to one xlsx file in the output folder (see `export.export_sweep_data`).
+    Args:
+        params (dict): A dictionary of parameters, see batch_process function for details. Defaults for all parameter sets.
+        parameter_sets (list of dict): Parameter sets, each overriding some params (e.g. window_size, step_size, max_lag).
+    Returns:
+        list of dict: One row per (dyad, parameter set) with keys 'dyad', 'parameter_set' (index into parameter_sets)
+            and the summary values (see `_sweep_summary`). None if input or output folder is missing.
+    """
+
+    # get input and output directories
+    batch_input_folder = params['batch_input_folder']
+    if not batch_input_folder: return
+    output_dir = params['output_dir']
+    if not output_dir: return
+
+    # full parameters of each set, evaluated grouped by window geometry
+    set_params = [{**params, **parameter_set} for parameter_set in parameter_sets]
+    geometries = [(set_params[i]['window_size'], set_params[i]['step_size']) for i in range(len(set_params))]
+    order = sorted(range(len(set_params)), key=lambda i: geometries[i])
+    geometry_counts = Counter(geometries)
+
+    jobs, _ = _collect_dyads(batch_input_folder)
+    column_a = params['workbook_data']['selected_column_a']
+    column_b = params['workbook_data']['selected_column_b']
+    rows = []
+    for file_path_a, file_path_b, dyad_dir in jobs:
+        # load and preprocess the dyad once
+        signal_table = _build_signal_table([file_path_a, file_path_b], params)
+        if (file_path_a, column_a) not in signal_table or (file_path_b, column_b) not in signal_table:
+            continue
+        signals = align_signals(signal_table[(file_path_a, column_a)], signal_table[(file_path_b, column_b)])
+
+        dyad_rows = {}
+        for i in order:
+            method = 'strided' if geometry_counts[geometries[i]] > 1 else 'auto'
+            try:
+                dyad_rows[i] = {'dyad': os.path.basename(dyad_dir), 'parameter_set': i, **_sweep_summary(*signals, set_params[i], method)}
+            except Exception as e:
+                print(f"! {os.path.basename(dyad_dir)}, parameter set {parameter_sets[i]}: {e}")
+        rows.extend(dyad_rows[i] for i in sorted(dyad_rows))
+
+    output_file_path = os.path.join(output_dir, f"wx_sweep_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx")
+    export_sweep_data(output_file_path, params, parameter_sets, rows)
+    return rows
+
+def _sweep_summary(signal_a, signal_b, signal_a_z_scored, signal_b_z_scored, params, method='auto'):
+    """
+    Summary values of one dyad (aligned signals, see `align_signals`) for one parameter set.
+    Windowed: n_windows, mean_correlation, mean_r_max, mean_tau_max (see `summarize_wxcorr`) and dfa_alpha_window_averages.
+    Standard: mean_correlation, r_max, tau_max and dfa_alpha.
+    method is the windowed cross-correlation engine (see `windowed_cross_correlation`).
+    """
+    if params['standardised_signals']:
+        signal_a, signal_b = signal_a_z_scored, signal_b_z_scored
+
+    if params['checkbox_windowed_xcorr']:
+        corr_data = windowed_cross_correlation(
+            signal_a, signal_b, window_size=params['window_size'], step_size=params['step_size'], max_lag=params['max_lag'],
+            use_lag_filter=params['use_lag_filter'], lag_filter_min=params['lag_filter_min'], lag_filter_max=params['lag_filter_max'],
+            absolute=params['checkbox_absolute_corr'], average_windows=params['checkbox_average_windows'], method=method
+        )
+        summary = summarize_wxcorr(corr_data)
+        try:
+            A, _ = dfa(np.mean(corr_data.correlations, axis=1), order=1)
+            dfa_alpha = A[0]
+        except ValueError:
+            dfa_alpha = None
+        return {
+            'n_windows': summary['n_windows'],
+            'mean_correlation': summary['mean_correlation'],
+            'mean_r_max': summary['mean_r_max'],
+            'mean_tau_max': summary['mean_tau_max'],
+            'dfa_alpha_window_averages': dfa_alpha,
+        }
+
+    corr_data = standard_cross_correlation(signal_a, signal_b, max_lag=params['max_lag_sxc'], absolute=params['checkbox_absolute_corr_sxc'])
+    try:
+        A, _ = dfa(corr_data['corr'], order=1)
+        dfa_alpha = A[0]
+    except ValueError:
+        dfa_alpha = None
+    return {
+        'mean_correlation': np.mean(corr_data['corr']),
+        'r_max': np.max(corr_data['corr']),
+        'tau_max': corr_data['lags'][np.argmax(corr_data['corr'])],
+        'dfa_alpha': dfa_alpha,
+    }
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def fingerprint(*arrays):
+    """
+    Content hash of one or more numpy arrays (dtype, shape and data), used as signal identity in cache keys.
+
+    Parameters:
+        *arrays (array-like): Arrays to hash.
+
+    Returns:
+        str: Hex digest.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.view(np.uint8).ravel())
+    return h.hexdigest()
+
+
+def sizeof(value):
+    """
+    Approximate memory footprint of a cached value in bytes: numpy arrays and objects with an `nbytes` attribute,
+    dicts, lists and tuples of those (recursively). Other values count as 0.
+    """
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(v) for v in value)
+    return 0
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a bounded number of entries and/or a bounded memory budget.
+
+    Parameters:
+        max_bytes (int): Memory budget (see `sizeof`); least recently used entries are evicted beyond it.
+            Values larger than the whole budget are not cached. None: unbounded.
+        max_entries (int): Maximum number of entries. None: unbounded.
+    """
+
+    def __init__(self, max_bytes=None, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        nbytes = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _evict(self):
+        while self._entries and (
+            (self.max_bytes is not None and self.nbytes > self.max_bytes) or
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
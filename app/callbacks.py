@@ -1,4 +1,5 @@
 import os
+import time
 from tkinter import filedialog
 
 import xlsx
@@ -7,6 +8,8 @@ from signal_processing import preprocess_dyad
 from batch_processing import batch_process, random_pair_analysis
 from export import export_sxcorr_data, export_wxcorr_data, export_random_pair_data
 from plot import plot_init
+from tasks import BackgroundTask
+from cache import fingerprint
 
 import state
 import validation
@@ -17,6 +20,8 @@ import validation
 # ---------------------------------------------------------------------------
 _dropdowns = {}   # keys: 'sheet', 'col_a', 'col_b'
 _tabview   = {}   # key: 'tabview'
+_app       = {}   # key: 'app' (schedules background task polling)
+_tasks     = {}   # running background tasks, keys: 'batch', 'random_pair'
 
 
 def register_dropdowns(sheet_dd, col_a_dd, col_b_dd):
@@ -29,6 +34,10 @@ def register_tabview(tabview):
     _tabview['tabview'] = tabview
 
 
+def register_app(app):
+    _app['app'] = app
+
+
 # ---------------------------------------------------------------------------
 # GUI STATE CALLBACKS
 # ---------------------------------------------------------------------------
@@ -36,7 +45,7 @@ def register_tabview(tabview):
 def on_tab_change():
     selected_tab = _tabview['tabview'].get()
     state.val_CURRENT_TAB.set(selected_tab)
-    state.PARAMS_CHANGED()
+    state.PARAMS_CHANGED(immediate=True)
 
 
 # ---------------------------------------------------------------------------
@@ -132,7 +141,8 @@ def on_standardise_change():
 
 
 def on_show_sigmoid_correlations_change():
-    state.PARAMS_CHANGED()
+    # display only, no recompute
+    state.PARAMS_CHANGED(immediate=True)
 
 
 def on_windowed_xcorr_change():
@@ -312,6 +322,9 @@ def preprocess_data():
         d["signal_b"]     = signal_b
         d["signal_a_std"] = signal_a_std
         d["signal_b_std"] = signal_b_std
+        # identity of the signals in the correlation results cache keys, hashed once here instead of on every update
+        d["fingerprint"]     = fingerprint(signal_a, signal_b)
+        d["fingerprint_std"] = fingerprint(signal_a_std, signal_b_std)
         state.val_data_length.set(len(signal_a))
         state.val_INPUT_DATA_VALID.set(True)
 
@@ -323,6 +336,8 @@ def preprocess_data():
         d["signal_b_std"] = []
         d["raw_signal_a"] = []
         d["raw_signal_b"] = []
+        d["fingerprint"]     = None
+        d["fingerprint_std"] = None
         state.dat_plot_data['fig'] = plot_init(
             dpi=state.screen_dpi,
             screen_width=state.screen_width,
@@ -404,6 +419,8 @@ def open_random_pair_output_file_picker():
 # ---------------------------------------------------------------------------
 
 def _export_wxcorr_data(file_path):
+    if not state.dat_correlation_data["wxcorr"]:
+        return
     params = {
         'selected_dyad_dir':              state.val_selected_dyad_dir.get(),
         'input_file_a':                   state.val_selected_file_a.get(),
@@ -484,6 +501,77 @@ def export_plot():
     fig.savefig(file_path, dpi=300, format='png')
 
 
+# ---------------------------------------------------------------------------
+# BACKGROUND RUN PROGRESS
+# Batch and random pair runs execute as BackgroundTasks; their progress is
+# shown in a progress bar + label (with ETA) in the Export & Batch tab.
+# ---------------------------------------------------------------------------
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def _progress_reporter(progress_var, text_var, unit):
+    """
+    on_progress callback of a BackgroundTask: sets progress_var (0..1) and text_var ("done / total unit · ETA").
+    The ETA is extrapolated from the steps done since the first report (steps done at once, e.g. up-to-date
+    dyads, do not distort it).
+    """
+    first_report = {}
+
+    def on_progress(done, total):
+        now = time.monotonic()
+        if not first_report:
+            first_report.update(time=now, done=done)
+        progress_var.set(done / total if total else 1.)
+
+        text = f"{done} / {total} {unit}"
+        steps_timed = done - first_report['done']
+        if steps_timed > 0 and done < total:
+            remaining = (now - first_report['time']) / steps_timed * (total - done)
+            text += f" · ETA {_format_duration(remaining)}"
+        text_var.set(text)
+
+    return on_progress
+
+
+def _start_run(name, work, on_done, running_var, progress_var, text_var, unit, on_finished):
+    """Run work(task) as background task `name`, with progress display; on_finished() is called however it ends."""
+    running_var.set(True)
+    progress_var.set(0.)
+    text_var.set("Starting ...")
+
+    def finished(text):
+        _tasks.pop(name, None)
+        text_var.set(text)
+        running_var.set(False)
+        on_finished()
+
+    def done(result):
+        finished(on_done(result))
+
+    def failed(error):
+        print(f"! {type(error).__name__}: {error}")
+        finished(f"Failed: {error}")
+
+    _tasks[name] = BackgroundTask(
+        _app['app'], work, on_done=done, on_error=failed,
+        on_progress=_progress_reporter(progress_var, text_var, unit),
+        on_cancelled=lambda: finished("Cancelled."),
+    ).start()
+
+
+def _cancel_run(name):
+    """Cancel background run `name`; it stops after its current step. Returns False if it is not running."""
+    task = _tasks.get(name)
+    if task is None:
+        return False
+    task.cancel()
+    return True
+
+
 # ---------------------------------------------------------------------------
 # BATCH PROCESSING
 # ---------------------------------------------------------------------------
@@ -498,11 +586,11 @@ def _batch_processing_is_ready(*args):
         state.val_batch_input_folder.get() != '' and
         state.val_batch_output_folder.get() != ''
     )
-    state.val_batch_processing_is_ready.set(data_is_valid and io_is_ready)
+    state.val_batch_processing_is_ready.set(data_is_valid and io_is_ready and not state.val_batch_is_running.get())
 
 
-def run_batch_process():
-    params = {
+def _batch_params():
+    return {
         'batch_input_folder':         state.val_batch_input_folder.get(),
         'output_dir':                 state.val_batch_output_folder.get(),
         'selected_sheet':             state.val_selected_sheet.get(),
@@ -522,14 +610,39 @@ def run_batch_process():
         'use_lag_filter':             state.val_checkbox_lag_filter.get(),
         'lag_filter_min':             state.val_lag_filter_min.get(),
         'lag_filter_max':             state.val_lag_filter_max.get(),
+        'n_workers':                  state.BATCH_N_WORKERS,
+        'surrogate_count':            state.BATCH_SURROGATE_COUNT,
+        'surrogate_method':           state.BATCH_SURROGATE_METHOD,
     }
-    batch_process(params)
+
+
+def run_batch_process():
+    # settings are read here, on the main loop; the run itself only uses this snapshot
+    params = _batch_params()
+
+    def work(task):
+        return batch_process(params, progress_callback=task.report_progress, cancel_event=task.cancel_event)
+
+    def on_done(summary):
+        if summary is None:
+            return "No input or output folder."
+        return f"Done: {len(summary['succeeded'])} succeeded ({len(summary['up_to_date'])} up to date), {len(summary['failed'])} failed, {len(summary['skipped'])} skipped."
+
+    _start_run(
+        'batch', work, on_done,
+        state.val_batch_is_running, state.val_batch_progress, state.val_batch_progress_text, 'dyads',
+        on_finished=_batch_processing_is_ready,
+    )
 
 
 def handle_run_batch_button():
     state.val_batch_processing_is_ready.set(False)
     run_batch_process()
-    state.val_batch_processing_is_ready.set(True)
+
+
+def handle_cancel_batch_button():
+    if _cancel_run('batch'):
+        state.val_batch_progress_text.set("Cancelling after the dyads in progress ...")
 
 
 # ---------------------------------------------------------------------------
@@ -546,10 +659,11 @@ def _random_pair_is_ready(*args):
         state.val_random_pair_input_folder.get() != '' and
         state.val_random_pair_output_file.get() != ''
     )
-    state.val_random_pair_is_ready.set(data_is_valid and io_is_ready)
+    state.val_random_pair_is_ready.set(data_is_valid and io_is_ready and not state.val_random_pair_is_running.get())
 
 
 def run_random_pair():
+    # settings are read here, on the main loop; the run itself only uses this snapshot
     params = {
         'batch_input_folder':         state.val_batch_input_folder.get(),
         'output_dir':                 state.val_batch_output_folder.get(),
@@ -571,23 +685,53 @@ def run_random_pair():
         'lag_filter_min':             state.val_lag_filter_min.get(),
         'lag_filter_max':             state.val_lag_filter_max.get(),
     }
-    t_stat, p_value, avg_corr_rp, avg_corr_real = random_pair_analysis(
-        params=params,
-        random_pair_count=state.val_rp_n.get(),
-        input_dir=state.val_random_pair_input_folder.get(),
-    )
-    export_random_pair_data(
-        file_path=state.val_random_pair_output_file.get(),
-        params=params,
-        input_dir=state.val_random_pair_input_folder.get(),
-        t_stat=t_stat,
-        p_value=p_value,
-        avg_corr_rp=avg_corr_rp,
-        avg_corr_real=avg_corr_real,
+    random_pair_count = state.val_rp_n.get()
+    input_dir = state.val_random_pair_input_folder.get()
+    output_file = state.val_random_pair_output_file.get()
+    exhaustive = state.val_checkbox_rp_exhaustive.get()
+
+    def work(task):
+        result = random_pair_analysis(
+            params=params,
+            random_pair_count=random_pair_count,
+            input_dir=input_dir,
+            exhaustive=exhaustive,
+            n_permutations=state.RP_N_PERMUTATIONS,
+            n_jobs=state.WXCORR_N_JOBS,
+            progress_callback=task.report_progress,
+            cancel_event=task.cancel_event,
+        )
+        task.check_cancelled()
+        t_stat, p_value, avg_corr_rp, avg_corr_real, permutation = result
+        export_random_pair_data(
+            file_path=output_file,
+            params=params,
+            input_dir=input_dir,
+            t_stat=t_stat,
+            p_value=p_value,
+            avg_corr_rp=avg_corr_rp,
+            avg_corr_real=avg_corr_real,
+            permutation=permutation,
+            exhaustive=exhaustive,
+        )
+        return result
+
+    def on_done(result):
+        t_stat, p_value, avg_corr_rp, avg_corr_real, _ = result
+        return f"Done: {len(avg_corr_rp)} surrogate pairs, {len(avg_corr_real)} dyads, p = {p_value:.4g}."
+
+    _start_run(
+        'random_pair', work, on_done,
+        state.val_random_pair_is_running, state.val_random_pair_progress, state.val_random_pair_progress_text, 'steps',
+        on_finished=_random_pair_is_ready,
     )
 
 
 def handle_run_random_pair_button():
     state.val_random_pair_is_ready.set(False)
     run_random_pair()
-    state.val_random_pair_is_ready.set(True)
+
+
+def handle_cancel_random_pair_button():
+    if _cancel_run('random_pair'):
+        state.val_random_pair_progress_text.set("Cancelling ...")
@@ -0,0 +1,261 @@
+"""
+Headless command-line entry point for batch processing, parameter sweeps and random pair analysis.
+
+Run from the app folder:
+    python -m cli batch params.toml
+    python -m cli batch params.toml --shard 2/4      # shard 2 of 4, e.g. on the second of four machines
+    python -m cli merge results/ shard-outputs/*/wx_batch_summary_shard-*.json
+    python -m cli random-pair params.json
+    python -m cli sweep params.toml
+
+The parameter file (TOML or JSON) holds the same keys as the params dict the GUI passes to
+`batch_processing.batch_process` / `parameter_sweep` / `random_pair_analysis`, e.g.:
+
+    batch_input_folder = "data/dyads"
+    output_dir = "results"
+    selected_sheet = "Sheet1"
+    window_size = 150
+
+    [workbook_data]
+    selected_column_a = "IBI"
+    selected_column_b = "IBI"
+
+A sweep's parameter file additionally lists the parameter sets, either explicitly or as a grid of all combinations
+(see `batch_processing.make_parameter_grid`):
+
+    [[parameter_sets]]
+    window_size = 100
+    max_lag = 20
+
+    [[parameter_sets]]
+    window_size = 150
+    max_lag = 30
+
+    # or
+    [sweep]
+    window_size = [100, 150]
+    max_lag = [20, 30]
+
+Missing keys fall back to DEFAULT_PARAMS. Neither tkinter nor customtkinter is imported, and matplotlib is only
+imported if plots are exported (export_plots, default true).
+"""
+import argparse
+import json
+import os
+import sys
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # python < 3.11
+    import tomli as tomllib
+
+# defaults of all parameters, same as the GUI's initial values (see state.py)
+DEFAULT_PARAMS = {
+    'checkbox_windowed_xcorr':    True,
+    'window_size':                150,
+    'step_size':                  75,
+    'max_lag':                    30,
+    'max_lag_sxc':                150,
+    'standardised_signals':       False,
+    'checkbox_absolute_corr':     False,
+    'checkbox_absolute_corr_sxc': False,
+    'checkbox_average_windows':   False,
+    'sigmoid_correlations':       False,
+    'checkbox_eb':                True,
+    'checkbox_fr':                False,
+    'use_lag_filter':             False,
+    'lag_filter_min':             -30,
+    'lag_filter_max':             30,
+    'n_workers':                  -1,
+    'surrogate_count':            0,
+    'surrogate_method':           'circular_shift',
+    'export_plots':               True,
+    'resume':                     True,
+    # random pair analysis
+    'random_pair_count':          100,
+    'exhaustive':                 False,
+    'n_permutations':             5000,
+    'n_jobs':                     -1,
+}
+
+# parameters without defaults, per command
+REQUIRED_PARAMS = {
+    'batch': ('batch_input_folder', 'output_dir', 'selected_sheet'),
+    'random-pair': ('random_pair_input_folder', 'random_pair_output_file', 'selected_sheet'),
+    'sweep': ('batch_input_folder', 'output_dir', 'selected_sheet'),
+}
+
+def load_params(file_path):
+    """
+    Read a parameter file (.toml or .json) and fill in DEFAULT_PARAMS for missing keys.
+    Args:
+        file_path (str): Path to the parameter file.
+    Returns:
+        dict: Parameters.
+    """
+    if file_path.endswith('.toml'):
+        with open(file_path, 'rb') as f:
+            values = tomllib.load(f)
+    elif file_path.endswith('.json'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            values = json.load(f)
+    else:
+        raise ValueError(f"Unsupported parameter file '{file_path}', must be .toml or .json.")
+
+    workbook_data = values.get('workbook_data', {})
+    params = {**DEFAULT_PARAMS, **values}
+    params['workbook_data'] = {
+        'has_headers': workbook_data.get('has_headers', True),
+        'selected_column_a': workbook_data.get('selected_column_a'),
+        'selected_column_b': workbook_data.get('selected_column_b'),
+    }
+    return params
+
+def check_params(params, command):
+    """
+    Raise a ValueError if a parameter the command needs is missing.
+    """
+    missing = [key for key in REQUIRED_PARAMS[command] if not params.get(key)]
+    missing += [f"workbook_data.{key}" for key in ('selected_column_a', 'selected_column_b') if not params['workbook_data'][key]]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}.")
+    for values in (sweep_parameter_sets(params) if command == 'sweep' else [{}]):
+        values = {**params, **values}
+        if values['checkbox_windowed_xcorr'] and values['max_lag'] >= values['window_size']:
+            raise ValueError(f"max_lag ({values['max_lag']}) must be < window_size ({values['window_size']}).")
+
+def sweep_parameter_sets(params):
+    """
+    The parameter sets of a sweep: params['parameter_sets'] (list of dicts) or all combinations of the value lists in
+    params['sweep'] (see `make_parameter_grid`).
+    """
+    if params.get('parameter_sets'):
+        return list(params['parameter_sets'])
+    if params.get('sweep'):
+        from batch_processing import make_parameter_grid
+        not_lists = [name for name, values in params['sweep'].items() if not isinstance(values, list)]
+        if not_lists:
+            raise ValueError(f"sweep values must be lists: {', '.join(not_lists)}.")
+        return make_parameter_grid(**params['sweep'])
+    raise ValueError("Missing parameters: parameter_sets or sweep.")
+
+def run_batch(params):
+    """
+    Run `batch_process` on params. Returns the exit code (1 if any dyad failed).
+    """
+    from batch_processing import batch_process
+
+    os.makedirs(params['output_dir'], exist_ok=True)
+    summary = batch_process(params)
+    return 1 if summary is None or summary['failed'] else 0
+
+def run_random_pair(params):
+    """
+    Run `random_pair_analysis` on params and export the results. Returns the exit code.
+    """
+    from batch_processing import random_pair_analysis
+    from export import export_random_pair_data
+
+    t_stat, p_value, avg_corr_rp, avg_corr_real, permutation = random_pair_analysis(
+        params=params,
+        input_dir=params['random_pair_input_folder'],
+        random_pair_count=params['random_pair_count'],
+        exhaustive=params['exhaustive'],
+        n_permutations=params['n_permutations'],
+        n_jobs=params['n_jobs'],
+    )
+    export_random_pair_data(
+        file_path=params['random_pair_output_file'],
+        params=params,
+        input_dir=params['random_pair_input_folder'],
+        t_stat=t_stat,
+        p_value=p_value,
+        avg_corr_rp=avg_corr_rp,
+        avg_corr_real=avg_corr_real,
+        permutation=permutation,
+        exhaustive=params['exhaustive'],
+    )
+    print(f"Random pair analysis finished: {len(avg_corr_rp)} surrogate pairs, {len(avg_corr_real)} dyads, t = {t_stat}, p = {p_value}.")
+    return 0
+
+def run_sweep(params):
+    """
+    Run `parameter_sweep` on params and the parameter sets they list. Returns the exit code.
+    """
+    from batch_processing import parameter_sweep
+
+    parameter_sets = sweep_parameter_sets(params)
+    params = {key: value for key, value in params.items() if key not in ('parameter_sets', 'sweep')}
+    os.makedirs(params['output_dir'], exist_ok=True)
+    rows = parameter_sweep(params, parameter_sets)
+    print(f"Parameter sweep finished: {len(parameter_sets)} parameter sets, {len({row['dyad'] for row in rows})} dyads.")
+    return 0
+
+def run_merge(summary_paths, output_dir):
+    """
+    Merge the per-shard summary files of a sharded batch run into one study-level result. Returns the exit code
+    (1 if shards are missing or any dyad failed).
+    """
+    from batch_processing import merge_batch_summaries
+
+    merged = merge_batch_summaries(summary_paths, output_dir)
+    return 1 if merged['missing_shards'] or merged['failed'] else 0
+
+def parse_shard(text):
+    """
+    Parse a shard argument 'i/N' (shard i of N, 1 ≤ i ≤ N) to (i, N).
+    """
+    try:
+        shard_index, n_shards = (int(value) for value in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{text}', expected i/N (e.g. 2/4)")
+    if not 1 <= shard_index <= n_shards:
+        raise argparse.ArgumentTypeError(f"invalid shard '{text}', i must be in [1, N]")
+    return shard_index, n_shards
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cli', description="Run wx batch processing, parameter sweeps or random pair analysis without the GUI.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = commands.add_parser('batch', help="process all dyads of a folder (batch_process)")
+    batch_parser.add_argument('params', help="parameter file (.toml or .json)")
+    batch_parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                              help="only process shard i of N of the dyad folders (stable hash of the folder name)")
+
+    random_pair_parser = commands.add_parser('random-pair', help="surrogate vs. real pair analysis (random_pair_analysis)")
+    random_pair_parser.add_argument('params', help="parameter file (.toml or .json)")
+
+    sweep_parser = commands.add_parser('sweep', help="evaluate a list / grid of parameter sets on all dyads of a folder (parameter_sweep)")
+    sweep_parser.add_argument('params', help="parameter file (.toml or .json) with parameter_sets or a sweep grid")
+
+    merge_parser = commands.add_parser('merge', help="merge the summary files of a sharded batch run")
+    merge_parser.add_argument('output_dir', help="folder for the merged wx_batch_summary.json / .xlsx")
+    merge_parser.add_argument('summaries', nargs='+', help="per-shard summary files (wx_batch_summary_shard-<i>-of-<N>.json)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'merge':
+        try:
+            return run_merge(args.summaries, args.output_dir)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(str(e))
+
+    try:
+        params = load_params(args.params)
+        check_params(params, args.command)
+    except (OSError, ValueError, tomllib.TOMLDecodeError) as e:
+        parser.error(str(e))
+
+    # plots are only rendered to files
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+    if args.command == 'batch':
+        if args.shard is not None:
+            params['shard'] = args.shard
+        return run_batch(params)
+    if args.command == 'sweep':
+        return run_sweep(params)
+    return run_random_pair(params)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,33 @@
 import os
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from plot import plot_init, update_sxcorr_plots, update_wxcorr_plots, update_preproc_plots
+from plot import plot_init, update_sxcorr_plots, update_preproc_plots, WxcorrPlotView
 from cross_correlation import windowed_cross_correlation, standard_cross_correlation
 from dfa import dfa, dfa_wxcorr, dfa_wxcorr_window_averages
+from cache import LRUCache
+from tasks import LatestTaskRunner
 
 import state
 
 canvas = None
+_runner = None   # computes correlation results off the Tk main loop, newest parameters first
+_wxcorr_view = None   # persistent windowed xcorr figure, updated in place (created on first use)
 
 
 def setup(group_plot):
     """Creates and packs the matplotlib canvas inside group_plot."""
-    global canvas
+    global canvas, _runner
     canvas = FigureCanvasTkAgg(state.dat_plot_data["fig"], master=group_plot)
+    _runner = LatestTaskRunner(group_plot)
+    # results computed for the old parameters must not arrive while a parameter change is debounced
+    state.register_params_changed_hook(_runner.cancel)
     widget = canvas.get_tk_widget()
     widget.pack(fill='both', expand=True)
+    # the canvas resizes the figure on <Configure> itself; the windowed xcorr view also needs a new layout for the new size
+    widget.bind('<Configure>', _on_canvas_resize, add='+')
+
+
+def _on_canvas_resize(event):
+    update_canvas()
 
 
 def fit_canvas_to_container():
@@ -34,79 +47,136 @@ def _apply_figure_size(fig, w, h):
     fig.set_size_inches(w / fig.get_dpi(), h / fig.get_dpi())
 
 
+# ---------------------------------------------------------------------------
+# CORRELATION RESULTS CACHE
+# Correlation + DFA results keyed by the full parameter tuple and the identity
+# (fingerprint, computed once by preprocessing) of the preprocessed signals, so
+# returning to a previous setting restores the results instead of recomputing them.
+# ---------------------------------------------------------------------------
+
+_results_cache = LRUCache(max_bytes=state.RESULTS_CACHE_MAX_BYTES, max_entries=state.RESULTS_CACHE_MAX_ENTRIES)
+
+
+def _restore_cached_results(params_key):
+    cached = _results_cache.get(params_key)
+    if cached is None:
+        return False
+    state.dat_correlation_data.update(cached)
+    return True
+
+
 # ---------------------------------------------------------------------------
 # CORRELATION DATA COMPUTATION
+# Settings are read from the tk.Vars on the main loop (_*_job); the returned
+# compute functions only use that snapshot, so they can run on a worker thread
+# (see UPDATE). Results are returned, never written to state directly.
 # ---------------------------------------------------------------------------
 
-def _update_wxcorr_data():
+def _wxcorr_job():
     if not state.val_INPUT_DATA_VALID.get() or not state.val_CORRELATION_SETTINGS_VALID.get():
-        return
+        return None
 
     use_std   = state.val_checkbox_standardise.get()
     signal_a  = state.dat_physiological_data["signal_a_std" if use_std else "signal_a"]
     signal_b  = state.dat_physiological_data["signal_b_std" if use_std else "signal_b"]
 
-    state.dat_correlation_data['wxcorr'] = windowed_cross_correlation(
-        signal_a,
-        signal_b,
-        window_size=state.val_window_size.get(),
-        step_size=state.val_step_size.get(),
-        max_lag=state.val_max_lag.get(),
-        absolute=state.val_checkbox_absolute_corr.get(),
-        average_windows=state.val_checkbox_average_windows.get(),
-        use_lag_filter=state.val_checkbox_lag_filter.get(),
-        lag_filter_min=state.val_lag_filter_min.get(),
-        lag_filter_max=state.val_lag_filter_max.get(),
+    use_lag_filter = state.val_checkbox_lag_filter.get()
+    settings = {
+        'window_size':     state.val_window_size.get(),
+        'step_size':       state.val_step_size.get(),
+        'max_lag':         state.val_max_lag.get(),
+        'absolute':        state.val_checkbox_absolute_corr.get(),
+        'average_windows': state.val_checkbox_average_windows.get(),
+        'use_lag_filter':  use_lag_filter,
+        'lag_filter_min':  state.val_lag_filter_min.get(),
+        'lag_filter_max':  state.val_lag_filter_max.get(),
+    }
+    params_key = (
+        'wxcorr',
+        state.dat_physiological_data["fingerprint_std" if use_std else "fingerprint"],
+        settings['window_size'],
+        settings['step_size'],
+        settings['max_lag'],
+        settings['absolute'],
+        settings['average_windows'],
+        use_lag_filter,
+        settings['lag_filter_min'] if use_lag_filter else None,
+        settings['lag_filter_max'] if use_lag_filter else None,
     )
 
-    try:
-        dfa_data = dfa_wxcorr(state.dat_correlation_data['wxcorr'], state.val_max_lag.get(), order=1)
-        state.dat_correlation_data['dfa_alpha_per_lag_wxcorr'] = [
-            {'lag': o['lag'], 'alpha': o['A'][0]} for o in dfa_data
-        ]
-    except ValueError:
-        state.dat_correlation_data['dfa_alpha_per_lag_wxcorr'] = None
+    def compute(task):
+        results = {}
+        results['wxcorr'] = windowed_cross_correlation(signal_a, signal_b, **settings, n_jobs=state.WXCORR_N_JOBS, cancel_event=task.cancel_event)
+        task.check_cancelled()
+
+        try:
+            dfa_data = dfa_wxcorr(results['wxcorr'], settings['max_lag'], order=1)
+            results['dfa_alpha_per_lag_wxcorr'] = [
+                {'lag': o['lag'], 'alpha': o['A'][0]} for o in dfa_data
+            ]
+        except ValueError:
+            results['dfa_alpha_per_lag_wxcorr'] = None
+        task.check_cancelled()
 
-    try:
-        state.dat_correlation_data['dfa_alpha_window_averages_wxcorr'] = dfa_wxcorr_window_averages(
-            state.dat_correlation_data['wxcorr'], state.val_max_lag.get(), order=1
-        )
-    except ValueError:
-        state.dat_correlation_data['dfa_alpha_window_averages_wxcorr'] = None
+        try:
+            results['dfa_alpha_window_averages_wxcorr'] = dfa_wxcorr_window_averages(
+                results['wxcorr'], settings['max_lag'], order=1
+            )
+        except ValueError:
+            results['dfa_alpha_window_averages_wxcorr'] = None
+        return results
 
+    return params_key, compute
 
-def _update_sxcorr_data():
+
+def _sxcorr_job():
     if not state.val_INPUT_DATA_VALID.get() or not state.val_CORRELATION_SETTINGS_VALID_SXC.get():
-        return
+        return None
 
     use_std  = state.val_checkbox_standardise.get()
     signal_a = state.dat_physiological_data["signal_a_std" if use_std else "signal_a"]
     signal_b = state.dat_physiological_data["signal_b_std" if use_std else "signal_b"]
 
-    state.dat_correlation_data['sxcorr'] = standard_cross_correlation(
-        signal_a, signal_b,
-        max_lag=state.val_max_lag_sxc.get(),
-        absolute=state.val_checkbox_absolute_corr_sxc.get(),
+    max_lag  = state.val_max_lag_sxc.get()
+    absolute = state.val_checkbox_absolute_corr_sxc.get()
+    params_key = (
+        'sxcorr',
+        state.dat_physiological_data["fingerprint_std" if use_std else "fingerprint"],
+        max_lag,
+        absolute,
     )
 
-    try:
-        A, _ = dfa(state.dat_correlation_data['sxcorr']['corr'], order=1)
-        state.dat_correlation_data['dfa_alpha_sxcorr'] = A[0]
-    except ValueError:
-        state.dat_correlation_data['dfa_alpha_sxcorr'] = None
+    def compute(task):
+        results = {}
+        results['sxcorr'] = standard_cross_correlation(signal_a, signal_b, max_lag=max_lag, absolute=absolute)
+        task.check_cancelled()
+
+        try:
+            A, _ = dfa(results['sxcorr']['corr'], order=1)
+            results['dfa_alpha_sxcorr'] = A[0]
+        except ValueError:
+            results['dfa_alpha_sxcorr'] = None
+        return results
 
+    return params_key, compute
 
-def update_corr():
+
+def _correlation_job():
+    """(params_key, compute) for the current settings, or None if there is nothing to compute."""
     if state.val_checkbox_windowed_xcorr.get():
-        _update_wxcorr_data()
-    else:
-        _update_sxcorr_data()
+        return _wxcorr_job()
+    return _sxcorr_job()
 
 
 # ---------------------------------------------------------------------------
 # PLOT UPDATE
 # ---------------------------------------------------------------------------
 
+def _set_figure(fig):
+    """Make fig the displayed figure; figures are not registered with pyplot, so a replaced figure is simply released."""
+    state.dat_plot_data["fig"] = fig
+
+
 def update_plot(*args):
     current_tab = state.val_CURRENT_TAB.get()
 
@@ -120,14 +190,14 @@ def update_plot(*args):
 
 def _update_preprocess_plot():
     if not state.val_INPUT_DATA_VALID.get():
-        state.dat_plot_data["fig"] = plot_init(is_retina=state.RETINA)
+        _set_figure(plot_init(is_retina=state.RETINA))
         return
 
     use_std  = state.val_checkbox_standardise.get()
     signal_a = state.dat_physiological_data["signal_a_std" if use_std else "signal_a"]
     signal_b = state.dat_physiological_data["signal_b_std" if use_std else "signal_b"]
 
-    state.dat_plot_data["fig"] = update_preproc_plots({
+    _set_figure(update_preproc_plots({
         'signal_a':      signal_a,
         'signal_b':      signal_b,
         'dyad_folder':   os.path.basename(state.val_selected_dyad_dir.get()),
@@ -137,29 +207,27 @@ def _update_preprocess_plot():
         'column_a':      state.val_selected_column_a.get(),
         'column_b':      state.val_selected_column_b.get(),
         'is_resampled':  state.val_checkbox_eb.get(),
-    })
+    }))
 
 
 def _update_wxcorr_plot():
+    global _wxcorr_view
     if not state.val_CORRELATION_SETTINGS_VALID.get() or not state.dat_correlation_data['wxcorr']:
         return
 
-    use_std  = state.val_checkbox_standardise.get()
-    signal_a = state.dat_physiological_data["signal_a_std" if use_std else "signal_a"]
-    signal_b = state.dat_physiological_data["signal_b_std" if use_std else "signal_b"]
-
-    state.dat_plot_data["fig"] = update_wxcorr_plots({
-        'signal_a':               signal_a,
-        'signal_b':               signal_b,
-        'window_size':            state.val_window_size.get(),
-        'step_size':              state.val_step_size.get(),
-        'max_lag':                state.val_max_lag.get(),
-        'use_lag_filter':         state.val_checkbox_lag_filter.get(),
-        'lag_filter_min':         state.val_lag_filter_min.get(),
-        'lag_filter_max':         state.val_lag_filter_max.get(),
-        'windowed_xcorr_data':    state.dat_correlation_data["wxcorr"],
-        'show_sigmoid_correlations': state.val_checkbox_show_sigmoid_correlations.get(),
-    })
+    # the layout is built once; new results only swap the data of the existing artists
+    if _wxcorr_view is None:
+        _wxcorr_view = WxcorrPlotView()
+    _wxcorr_view.update(
+        state.dat_correlation_data["wxcorr"],
+        max_lag=state.val_max_lag.get(),
+        step_size=state.val_step_size.get(),
+        show_sigmoid_correlations=state.val_checkbox_show_sigmoid_correlations.get(),
+        use_lag_filter=state.val_checkbox_lag_filter.get(),
+        lag_filter_min=state.val_lag_filter_min.get(),
+        lag_filter_max=state.val_lag_filter_max.get(),
+    )
+    _set_figure(_wxcorr_view.fig)
 
 
 def _update_sxcorr_plot():
@@ -170,11 +238,11 @@ def _update_sxcorr_plot():
     signal_a = state.dat_physiological_data["signal_a_std" if use_std else "signal_a"]
     signal_b = state.dat_physiological_data["signal_b_std" if use_std else "signal_b"]
 
-    state.dat_plot_data["fig"] = update_sxcorr_plots({
+    _set_figure(update_sxcorr_plots({
         'signal_a':   signal_a,
         'signal_b':   signal_b,
         'xcorr_data': state.dat_correlation_data['sxcorr'],
-    })
+    }))
 
 
 # ---------------------------------------------------------------------------
@@ -190,15 +258,43 @@ def update_canvas():
         return  # not yet laid out; fit_canvas_to_container() handles the first draw
     canvas.figure = state.dat_plot_data["fig"]
     _apply_figure_size(canvas.figure, w, h)
-    canvas.draw()
+    if _wxcorr_view is not None and canvas.figure is _wxcorr_view.fig:
+        _wxcorr_view.prepare_layout()
+    canvas.draw_idle()
 
 
 # ---------------------------------------------------------------------------
 # MAIN UPDATE LOOP
-# Called whenever val_UPDATE_COUNT changes.
+# Called whenever val_UPDATE_COUNT changes. Cached results are shown at once;
+# anything else is computed on a worker thread and drawn when it arrives (a
+# newer parameter change cancels the computation in flight).
 # ---------------------------------------------------------------------------
 
-def UPDATE(*args):
-    update_corr()
+def _redraw():
     update_plot()
     update_canvas()
+
+
+def _on_results(params_key, results):
+    _results_cache.put(params_key, results)
+    state.dat_correlation_data.update(results)
+    if state.val_CURRENT_TAB.get() != "Input Data":
+        _redraw()
+
+
+def UPDATE(*args):
+    job = _correlation_job()
+    if job is None or _restore_cached_results(job[0]):
+        _runner.cancel()
+        _redraw()
+        return
+
+    # the preprocessing preview does not depend on correlation results
+    if state.val_CURRENT_TAB.get() == "Input Data":
+        _redraw()
+
+    # the results for these parameters are already being computed (e.g. after a tab change); they are drawn when they arrive
+    params_key, compute = job
+    if _runner.is_running(params_key):
+        return
+    _runner.submit(compute, on_done=lambda results: _on_results(params_key, results), key=params_key)
@@ -1,4 +1,40 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from scipy.fft import rfft, irfft, next_fast_len
+from cache import LRUCache, fingerprint
+from tasks import TaskCancelled
+
+# windowed cross-correlation engines (see `windowed_cross_correlation`)
+WXCORR_METHODS = ('auto', 'strided', 'cumsum')
+
+# 'auto' uses the running-sum engine when windows overlap by more than this factor (window_size / step_size)
+CUMSUM_MIN_OVERLAP = 8
+
+# approximate number of samples after which the running sums of the cumsum engine are re-anchored
+CUMSUM_ANCHOR_INTERVAL = 4096
+
+# memory budget of the normalized-window cache of the strided engine (LRU eviction)
+WINDOW_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# blocks of windows per worker thread when computing in parallel (n_jobs / executor), for load balancing
+PARALLEL_BLOCKS_PER_WORKER = 4
+
+# approximate number of samples read per chunk by `iter_windowed_cross_correlation`
+STREAM_CHUNK_SIZE = 1 << 16
+
+# memory budget of the intermediate arrays of one chunk of pairs in the batched multi-pair kernels
+BATCH_MAX_BYTES = 64 * 1024 ** 2
+
+# windows whose variance is at most this fraction of mean² + E[x²] (round-off of a constant window) have zero
+# variance; their correlations are nan in every engine
+ZERO_VARIANCE_RTOL = 64 * np.finfo(float).eps
+
+# standard cross-correlation engines (see `standard_cross_correlation`)
+SXCORR_METHODS = ('auto', 'direct', 'fft')
+
+# 'auto' uses the FFT engine for max_lag above this value
+FFT_MIN_LAG = 32
 
 def scale_sigmoid(x: np.array):
     '''
@@ -9,10 +45,410 @@ def scale_sigmoid(x: np.array):
     return 2 * (1 / (1 + np.exp(-4*x))) - 1
 
 
-def windowed_cross_correlation(x, y, window_size, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False):
+class WxcorrResult:
+    """
+    Columnar result of `windowed_cross_correlation`: one row per window, one column per lag.
+
+    Only the raw per-lag correlation matrix and the window positions are stored. Everything else is derived from
+    the raw matrix on first access and cached, so e.g. the sigmoid-scaled values are never computed unless shown.
+
+    Attributes:
+        lags (np.ndarray): Lag of each column, shape (n_lags,).
+        start_idx (np.ndarray): Start index of each window in the time series, shape (n_windows,).
+        center_idx (np.ndarray): Index of each window center in the time series, shape (n_windows,).
+        raw_correlations (np.ndarray): Per-lag cross-correlation values (before any window averaging),
+            shape (n_windows, n_lags).
+        average_windows (bool): Correlation values are averaged across lags within each window.
+
+    Derived (lazy) attributes:
+        correlations (np.ndarray): Cross-correlation values, shape (n_windows, n_lags). If average_windows is set,
+            a read-only view repeating the per-window average for every lag.
+        correlations_sigmoid (np.ndarray): Sigmoid-scaled cross-correlation values, shape (n_windows, n_lags).
+        r_max, tau_max (np.ndarray): Peak correlation per window and its lag, shape (n_windows,).
+        r_max_sigmoid, tau_max_sigmoid (np.ndarray): Same for the sigmoid-scaled values, shape (n_windows,).
+        avg_z_transformed_corr, var_z_transformed_corr (np.ndarray): Mean and variance of the Fisher z-transformed
+            per-lag correlations of each window (computed before any window averaging), shape (n_windows,).
+
+    Iterating (or indexing) yields the per-window dicts of earlier versions, with the keys named like the attributes.
+    """
+    __slots__ = (
+        'lags', 'start_idx', 'center_idx', 'raw_correlations', 'average_windows',
+        '_correlations', '_correlations_sigmoid',
+        '_r_max', '_tau_max', '_r_max_sigmoid', '_tau_max_sigmoid',
+        '_avg_z_transformed_corr', '_var_z_transformed_corr',
+    )
+
+    # per-window fields, in the key order of the compatibility dicts
+    WINDOW_FIELDS = (
+        'start_idx', 'center_idx', 'correlations', 'r_max', 'tau_max',
+        'correlations_sigmoid', 'r_max_sigmoid', 'tau_max_sigmoid',
+        'avg_z_transformed_corr', 'var_z_transformed_corr',
+    )
+
+    def __init__(self, lags, start_idx, center_idx, raw_correlations, average_windows=False):
+        self.lags = lags
+        self.start_idx = start_idx
+        self.center_idx = center_idx
+        self.raw_correlations = raw_correlations
+        self.average_windows = average_windows
+        self._correlations = None
+        self._correlations_sigmoid = None
+        self._r_max = None
+        self._tau_max = None
+        self._r_max_sigmoid = None
+        self._tau_max_sigmoid = None
+        self._avg_z_transformed_corr = None
+        self._var_z_transformed_corr = None
+
+    @classmethod
+    def empty(cls, lags, average_windows=False):
+        """Result without any windows (signal shorter than one window)."""
+        return cls(
+            lags=lags, start_idx=np.empty(0, dtype=int), center_idx=np.empty(0, dtype=int),
+            raw_correlations=np.empty((0, len(lags))), average_windows=average_windows,
+        )
+
+    def __len__(self):
+        return len(self.start_idx)
+
+    def __getitem__(self, index):
+        return {field: getattr(self, field)[index] for field in self.WINDOW_FIELDS}
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self):
+        """Total size of the stored and cached arrays in bytes (broadcast views are not counted)."""
+        arrays = [getattr(self, field) for field in self.__slots__ if field != 'average_windows']
+        return sum(a.nbytes for a in arrays if a is not None and a.base is None)
+
+    def _peak(self, values):
+        """Peak value per window and its lag (0 for averaged windows)."""
+        if self.average_windows:
+            return values[:, 0].copy(), np.zeros(len(values), dtype=int)
+        return np.max(values, axis=1), np.argmax(values, axis=1) + self.lags[0]
+
+    @property
+    def correlations(self):
+        if self._correlations is None:
+            if self.average_windows:
+                averages = np.mean(self.raw_correlations, axis=1, keepdims=True)
+                self._correlations = np.broadcast_to(averages, self.raw_correlations.shape)
+            else:
+                self._correlations = self.raw_correlations
+        return self._correlations
+
+    @property
+    def correlations_sigmoid(self):
+        if self._correlations_sigmoid is None:
+            correlations_sigmoid = scale_sigmoid(self.raw_correlations)
+            if self.average_windows:
+                averages = np.mean(correlations_sigmoid, axis=1, keepdims=True)
+                correlations_sigmoid = np.broadcast_to(averages, correlations_sigmoid.shape)
+            self._correlations_sigmoid = correlations_sigmoid
+        return self._correlations_sigmoid
+
+    @property
+    def r_max(self):
+        if self._r_max is None:
+            self._r_max, self._tau_max = self._peak(self.correlations)
+        return self._r_max
+
+    @property
+    def tau_max(self):
+        if self._tau_max is None:
+            self._r_max, self._tau_max = self._peak(self.correlations)
+        return self._tau_max
+
+    @property
+    def r_max_sigmoid(self):
+        if self._r_max_sigmoid is None:
+            self._r_max_sigmoid, self._tau_max_sigmoid = self._peak(self.correlations_sigmoid)
+        return self._r_max_sigmoid
+
+    @property
+    def tau_max_sigmoid(self):
+        if self._tau_max_sigmoid is None:
+            self._r_max_sigmoid, self._tau_max_sigmoid = self._peak(self.correlations_sigmoid)
+        return self._tau_max_sigmoid
+
+    @property
+    def avg_z_transformed_corr(self):
+        if self._avg_z_transformed_corr is None:
+            self._avg_z_transformed_corr, self._var_z_transformed_corr = _fisher_z_stats(self.raw_correlations)
+        return self._avg_z_transformed_corr
+
+    @property
+    def var_z_transformed_corr(self):
+        if self._var_z_transformed_corr is None:
+            self._avg_z_transformed_corr, self._var_z_transformed_corr = _fisher_z_stats(self.raw_correlations)
+        return self._var_z_transformed_corr
+
+
+_window_cache = LRUCache(max_bytes=WINDOW_CACHE_MAX_BYTES)
+
+
+def _lag_bounds(max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None):
+    """
+    Returns the (inclusive) lag range of a windowed cross-correlation: [-max_lag, max_lag] or the lag filter range.
+    """
+    if use_lag_filter and not (lag_filter_min is None or lag_filter_max is None):
+        return min(lag_filter_min, lag_filter_max), max(lag_filter_min, lag_filter_max)
+    return -max_lag, max_lag
+
+
+def _normalize_windows(windows):
+    """
+    Normalizes windows (last axis) to zero mean and unit variance. Windows with zero variance (see
+    ZERO_VARIANCE_RTOL) are nan.
+    """
+    mean = np.mean(windows, axis=-1, keepdims=True)
+    centered = windows - mean
+    var = np.mean(centered * centered, axis=-1, keepdims=True)
+    std = np.where(var > ZERO_VARIANCE_RTOL * (2 * mean ** 2 + var), np.sqrt(var), np.nan)
+    return centered / std
+
+
+def _normalized_windows(signal, window_size, step_size, use_cache=True):
+    """
+    Cuts a signal into windows (strided view, no copy) and normalizes each window to zero mean and unit variance.
+    Returns a read-only array of shape (n_windows, window_size).
+
+    Results are kept in an LRU cache with a memory budget of WINDOW_CACHE_MAX_BYTES, keyed by
+    (signal fingerprint, window_size, step_size).
+    """
+    if use_cache:
+        key = (fingerprint(signal), window_size, step_size)
+        windows = _window_cache.get(key)
+        if windows is not None:
+            return windows
+
+    windows = _normalize_windows(np.lib.stride_tricks.sliding_window_view(signal, window_size)[::step_size])
+    windows.flags.writeable = False
+
+    if use_cache:
+        _window_cache.put(key, windows)
+    return windows
+
+
+def clear_window_cache():
+    """Drops all cached normalized windows."""
+    _window_cache.clear()
+
+
+def _lagged_correlations(x_windows, y_windows, min_lag, max_lag):
+    """
+    Computes Rxy(lag) = mean( x_window[t] * y_window[t + lag] ) for all windows and all lags in [min_lag, max_lag]
+    in one batched operation.
+
+    y_windows is zero-padded on both sides, so that a strided view of shape (n_windows, n_lags, window_size) holds
+    the lagged copy of every window for every lag. Products outside the overlap of x and the lagged y are zero,
+    the sums are divided by the overlap length (window_size - |lag|).
+
+    Returns an array of shape (n_windows, n_lags).
+    """
+    window_size = x_windows.shape[-1]
+    pad_left = max(0, -min_lag)
+    pad_right = max(0, max_lag)
+    y_padded = np.pad(y_windows, [(0, 0)] * (y_windows.ndim - 1) + [(pad_left, pad_right)])
+    y_lagged = np.lib.stride_tricks.sliding_window_view(y_padded, window_size, axis=-1)
+    y_lagged = y_lagged[..., min_lag + pad_left:max_lag + pad_left + 1, :]
+
+    lags = np.arange(min_lag, max_lag + 1)
+    return np.einsum('...t,...kt->...k', x_windows, y_lagged) / (window_size - np.abs(lags))
+
+
+def _anchor_block_windows(window_size, step_size, anchor_interval=None):
+    """Number of windows per re-anchored block of the cumsum engine (blocks span about anchor_interval samples)."""
+    if anchor_interval is None:
+        anchor_interval = CUMSUM_ANCHOR_INTERVAL
+    return max(1, (anchor_interval - window_size) // step_size + 1)
+
+
+def _segment_prefix_sums(xs, ys, min_lag, max_lag):
+    """
+    Re-anchored prefix sums of a segment for the cumsum engine: the segment is centered on its mean, then the
+    prefix sums of x, y, x², y² and of the lagged products x[t]·y[t + lag] (one row per lag) are taken, each with
+    a leading zero, so that sum(v[a:b]) = P[b] - P[a]. They do not depend on the window size, so windows of any
+    size within the segment can be read from them (see `_prefix_sum_correlations`).
+    """
+    xs = xs - np.mean(xs)
+    ys = ys - np.mean(ys)
+
+    px = np.concatenate(([0.], np.cumsum(xs)))
+    py = np.concatenate(([0.], np.cumsum(ys)))
+    pxx = np.concatenate(([0.], np.cumsum(xs * xs)))
+    pyy = np.concatenate(([0.], np.cumsum(ys * ys)))
+
+    pad_left = max(0, -min_lag)
+    pad_right = max(0, max_lag)
+    ys_padded = np.pad(ys, (pad_left, pad_right))
+    ys_lagged = np.lib.stride_tricks.sliding_window_view(ys_padded, len(ys))[min_lag + pad_left:max_lag + pad_left + 1]
+    pxy = np.zeros((max_lag - min_lag + 1, len(xs) + 1))
+    np.cumsum(xs * ys_lagged, axis=1, out=pxy[:, 1:])
+
+    return px, py, pxx, pyy, pxy
+
+
+def _prefix_sum_correlations(prefix_sums, offsets, window_size, min_lag, max_lag):
+    """
+    (len(offsets), n_lags) correlations of the windows starting at `offsets` (relative to the segment) of a segment's
+    prefix sums (see `_segment_prefix_sums`). Windows with zero variance are nan.
+    """
+    px, py, pxx, pyy, pxy = prefix_sums
+
+    lags = np.arange(min_lag, max_lag + 1)
+    counts = window_size - np.abs(lags)
+    lag_start = np.maximum(0, -lags)                  # first in-window index t of each lag
+    lag_stop = window_size - np.maximum(0, lags)      # end (exclusive) of in-window indices t of each lag
+
+    # window moments
+    mean_x = (px[offsets + window_size] - px[offsets]) / window_size
+    mean_y = (py[offsets + window_size] - py[offsets]) / window_size
+    square_x = (pxx[offsets + window_size] - pxx[offsets]) / window_size
+    square_y = (pyy[offsets + window_size] - pyy[offsets]) / window_size
+    var_x = square_x - mean_x ** 2
+    var_y = square_y - mean_y ** 2
+
+    # E[x²] - mean² leaves round-off for constant windows, relative to the window's moments and to the prefix sums
+    # the window is read from; variances within that round-off count as zero
+    noise_x = ZERO_VARIANCE_RTOL * (mean_x ** 2 + square_x + pxx[offsets + window_size] / window_size)
+    noise_y = ZERO_VARIANCE_RTOL * (mean_y ** 2 + square_y + pyy[offsets + window_size] / window_size)
+    std_x = np.where(var_x > noise_x, np.sqrt(np.maximum(var_x, 0)), 0)
+    std_y = np.where(var_y > noise_y, np.sqrt(np.maximum(var_y, 0)), 0)
+
+    # per-lag sums over the overlap of x and lagged y within each window
+    a = offsets[:, None] + lag_start
+    b = offsets[:, None] + lag_stop
+    sum_xy = np.take_along_axis(pxy.T, b, axis=0) - np.take_along_axis(pxy.T, a, axis=0)
+    sum_x = px[b] - px[a]
+    sum_y = py[b + lags] - py[a + lags]
+
+    # sum of normalized products: sum((x - mx) * (y - my)) / (sx * sy)
+    mx = mean_x[:, None]
+    my = mean_y[:, None]
+    centered = sum_xy - my * sum_x - mx * sum_y + counts * mx * my
+    scale = (std_x * std_y)[:, None] * counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(scale > 0, centered / scale, np.nan)
+
+
+def _cumsum_correlations(x, y, window_size, step_size, min_lag, max_lag, anchor_interval=None):
+    """
+    Computes the same (n_windows, n_lags) matrix as `_lagged_correlations` on normalized windows, but from
+    running sums of x, x², y, y² and the lagged products x[t]·y[t + lag]. Every window/lag cell costs O(1),
+    independent of window_size.
+
+    Numerical stability: prefix sums are re-anchored for every block of windows spanning roughly
+    `anchor_interval` samples, i.e. each block works on its own segment, centered on the segment mean, with
+    cumulative sums restarting at zero. This keeps the magnitude of the running sums (and the cancellation error
+    of their differences) bounded by the block length instead of growing with the recording length.
+    """
+    n_windows = (len(x) - window_size) // step_size + 1
+    windows_per_block = _anchor_block_windows(window_size, step_size, anchor_interval)
+
+    correlations = np.empty((n_windows, max_lag - min_lag + 1))
+    for first_window in range(0, n_windows, windows_per_block):
+        last_window = min(first_window + windows_per_block, n_windows)
+        segment_start = first_window * step_size
+        segment_stop = (last_window - 1) * step_size + window_size
+
+        # re-anchor: segment-local, mean-centered prefix sums
+        prefix_sums = _segment_prefix_sums(x[segment_start:segment_stop], y[segment_start:segment_stop], min_lag, max_lag)
+
+        offsets = np.arange(last_window - first_window) * step_size
+        correlations[first_window:last_window] = _prefix_sum_correlations(prefix_sums, offsets, window_size, min_lag, max_lag)
+
+    return correlations
+
+
+def _correlation_matrix(x, y, window_size, step_size, min_lag, max_lag, method, n_jobs=1, executor=None, use_cache=True, cancel_event=None):
+    """
+    (n_windows, n_lags) matrix of windowed cross-correlations, computed with the 'strided' or 'cumsum' engine.
+
+    With n_jobs != 1 or an executor, blocks of windows are computed on a thread pool (NumPy releases the GIL for the
+    heavy array work). Blocks consist of whole re-anchoring blocks of the cumsum engine and are stitched in window
+    order, so the result is identical to the single-threaded computation.
+
+    The normalized windows of the strided engine are cached per signal and window geometry (see
+    `_normalized_windows`), so lag-only parameter changes skip the normalization pass.
+
+    With a cancel_event, blocks are computed in steps of one re-anchoring block of windows, and TaskCancelled is
+    raised at the first step after the event is set.
+    """
+    n_windows = (len(x) - window_size) // step_size + 1
+    windows_per_anchor_block = _anchor_block_windows(window_size, step_size)
+
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise TaskCancelled()
+
+    check_cancelled()
+
+    if method == 'strided':
+        # extract and normalize all windows (zero mean, unit variance)
+        x_windows = _normalized_windows(x, window_size, step_size, use_cache)
+        y_windows = _normalized_windows(y, window_size, step_size, use_cache)
+
+    def compute_windows(first_window, last_window):
+        if method == 'strided':
+            return _lagged_correlations(x_windows[first_window:last_window], y_windows[first_window:last_window], min_lag, max_lag)
+        segment_start = first_window * step_size
+        segment_stop = (last_window - 1) * step_size + window_size
+        return _cumsum_correlations(x[segment_start:segment_stop], y[segment_start:segment_stop], window_size, step_size, min_lag, max_lag)
+
+    def compute_block(first_window, last_window):
+        if cancel_event is None:
+            return compute_windows(first_window, last_window)
+        # blocks start on re-anchoring blocks, so the steps match the cumsum engine's own blocks
+        steps = []
+        for first_step in range(first_window, last_window, windows_per_anchor_block):
+            check_cancelled()
+            steps.append(compute_windows(first_step, min(first_step + windows_per_anchor_block, last_window)))
+        return np.vstack(steps)
+
+    if n_jobs == 1 and executor is None:
+        return compute_block(0, n_windows)
+
+    n_workers = os.cpu_count() if n_jobs == -1 else max(1, n_jobs)
+    windows_per_block = -(-n_windows // (n_workers * PARALLEL_BLOCKS_PER_WORKER))
+    windows_per_block = -(-windows_per_block // windows_per_anchor_block) * windows_per_anchor_block
+    first_windows = list(range(0, n_windows, windows_per_block))
+    last_windows = [min(first_window + windows_per_block, n_windows) for first_window in first_windows]
+
+    if executor is not None:
+        blocks = list(executor.map(compute_block, first_windows, last_windows))
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            blocks = list(pool.map(compute_block, first_windows, last_windows))
+    return np.vstack(blocks)
+
+
+def _fisher_z_stats(correlations):
+    """
+    Mean and variance of the Fisher z-transformed correlations of each window (row). Infinite and undefined
+    z-values (r=±1, nan) are set to zero.
+    """
+    # Suppress the expected RuntimeWarning for r=±1 (arctanh(±1)=±inf); those
+    # entries are zeroed out immediately below.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlations_z_transformed = .5 * np.log((1 + correlations) / (1 - correlations))
+    correlations_z_transformed[~np.isfinite(correlations_z_transformed)] = 0
+    return np.mean(correlations_z_transformed, axis=-1), np.var(correlations_z_transformed, axis=-1)
+
+
+def windowed_cross_correlation(x, y, window_size, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False, method='auto', n_jobs=1, executor=None, use_cache=True, cancel_event=None):
     """
     Compute windowed cross-correlation between two time series.
 
+    Two engines compute all windows and lags in batched array operations:
+        - 'strided': lagged products of normalized strided window views (see `_lagged_correlations`).
+          Cost grows with windows x lags x window_size.
+        - 'cumsum': running sums of x, x², y, y² and lagged x·y (see `_cumsum_correlations`).
+          Cost per window/lag is independent of window_size, best for dense stepping (small step_size).
+
     Lag convention:
         Rxy(lag) = mean( x_window[t] * y_window[t + lag] )
         - lag > 0: x leads y (x's pattern occurs lag steps before y's)
@@ -32,105 +468,240 @@ def windowed_cross_correlation(x, y, window_size, step_size, max_lag, use_lag_fi
         use_lag_filter (bool): Apply lag filter to limit lag range.
         lag_filter_min (int): Minimum lag for filter (inclusive).
         lag_filter_max (int): Maximum lag for filter (inclusive).
+        method (str): 'strided', 'cumsum' or 'auto' (cumsum if window_size > CUMSUM_MIN_OVERLAP * step_size).
+        n_jobs (int): Number of threads computing blocks of windows in parallel (-1: one per CPU core).
+            Results are identical to the single-threaded computation.
+        executor (concurrent.futures.Executor): Optional executor to compute the blocks on (overrides n_jobs).
+        use_cache (bool): Reuse / cache the normalized windows of the strided engine (see `_normalized_windows`).
+        cancel_event (threading.Event): Optional. Once set, the computation stops within one re-anchoring block of
+            windows and raises tasks.TaskCancelled (e.g. BackgroundTask.cancel_event).
 
     Returns:
-        results (list of dict): A list containing the results for each window.
-            Each result is a dictionary with keys:
-                - 'start_idx': Start index of the window in the time series.
-                - 'center_idx': Index of window center in time series (allows aligning correlation result with input time series).
-                - 'r_max': Peak cross-correlation value in the window.
-                - 'tau_max': Lag at which the peak correlation occurs (see lag convention above).
-                - 'correlations': Array of cross-correlation values for all lags.
-                - 'correlations_sigmoid': Array of sigmoid-scaled cross-correlation values for all lags.
-                - 'avg_z_transformed_corr': mean of Fisher z-transformed per-lag correlations (computed before any window averaging)
-                - 'var_z_transformed_corr': variance of Fisher z-transformed per-lag correlations (computed before any window averaging)
+        WxcorrResult: Columnar results of all windows (see `WxcorrResult`):
+            - 'start_idx': Start index of the window in the time series.
+            - 'center_idx': Index of window center in time series (allows aligning correlation result with input time series).
+            - 'r_max': Peak cross-correlation value in the window.
+            - 'tau_max': Lag at which the peak correlation occurs (see lag convention above).
+            - 'correlations': Cross-correlation values for all lags.
+            - 'correlations_sigmoid': Sigmoid-scaled cross-correlation values for all lags.
+            - 'avg_z_transformed_corr': mean of Fisher z-transformed per-lag correlations (computed before any window averaging)
+            - 'var_z_transformed_corr': variance of Fisher z-transformed per-lag correlations (computed before any window averaging)
     """
-    n = len(x)
-    results = []
-
     # Ensure inputs are numpy arrays
-    x = np.asarray(x)
-    y = np.asarray(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    n = len(x)
 
     # set lag range: filtered or unfiltered
-    _min_lag = -max_lag
-    _max_lag = max_lag
-    lag_range = range(_min_lag, _max_lag + 1)
-    if use_lag_filter and not (lag_filter_min is None or lag_filter_max is None):
-        _min_lag = min(lag_filter_min, lag_filter_max)
-        _max_lag = max(lag_filter_min, lag_filter_max)
-        lag_range = range(_min_lag, _max_lag + 1)
-
-    # loop over windows
-    for start in range(0, n - window_size + 1, step_size):
-        # Extract the windowed segments
-        x_window = x[start:start + window_size]
-        y_window = y[start:start + window_size]
-
-        # Normalize the segments (zero mean, unit variance)
-        x_window = (x_window - np.mean(x_window)) / np.std(x_window)
-        y_window = (y_window - np.mean(y_window)) / np.std(y_window)
-
-        # Compute cross-correlation for lags in the range [-max_lag, max_lag]
-        # Convention: Rxy(lag) = mean(x[t] * y[t+lag]), so lag > 0 means x leads y.
-        correlations = []
-        for lag in lag_range:
-            if lag < 0:
-                corr = np.mean(x_window[-lag:] * y_window[:lag])
-            elif lag > 0:
-                corr = np.mean(x_window[:-lag] * y_window[lag:])
-            else:
-                corr = np.mean(x_window * y_window)
-            if absolute:
-                corr = np.abs(corr)
-            correlations.append(corr)
+    _min_lag, _max_lag = _lag_bounds(max_lag, use_lag_filter, lag_filter_min, lag_filter_max)
+    lags = np.arange(_min_lag, _max_lag + 1)
 
-        # apply sigmoid scaling to correlation values
-        correlations_sigmoid = scale_sigmoid(np.array(correlations))
+    if n < window_size:
+        return WxcorrResult.empty(lags, average_windows)
 
-        # Fisher z-transform per-lag correlations
-        # Suppress the expected RuntimeWarning for r=±1 (arctanh(±1)=±inf); those
-        # entries are zeroed out immediately below.
-        with np.errstate(invalid='ignore', divide='ignore'):
-            # correlations_z_transformed = np.arctanh(np.array(correlations))
-            correlations_z_transformed = np.array([ .5 * np.log((1 + r) / (1 - r)) for r in correlations ])
-        correlations_z_transformed[np.isinf(correlations_z_transformed)] = 0
-        correlations_z_transformed[np.isnan(correlations_z_transformed)] = 0
-        avg_z_transformed_corr = np.mean(correlations_z_transformed)
-        var_z_transformed_corr = np.var(correlations_z_transformed)
-
-        # optionally average correlation values across lags within the window
-        if average_windows:
-            avg = np.mean(np.array(correlations))
-            correlations = [avg for _ in correlations]
-            avg_sigmoid = np.mean(np.array(correlations_sigmoid))
-            correlations_sigmoid = [avg_sigmoid for _ in correlations_sigmoid]
-
-        # Find the peak correlation and its corresponding lag
-        r_max = np.max(correlations)
-        tau_max = np.argmax(correlations) + _min_lag if not average_windows else 0
-        r_max_sigmoid = np.max(correlations_sigmoid)
-        tau_max_sigmoid = np.argmax(correlations_sigmoid) + _min_lag if not average_windows else 0
-
-        result = {
-            'start_idx': start,
-            'center_idx': start + window_size // 2,
-            'correlations': correlations,
-            'r_max': r_max,
-            'tau_max': tau_max,
-            'correlations_sigmoid': correlations_sigmoid,
-            'r_max_sigmoid': r_max_sigmoid,
-            'tau_max_sigmoid': tau_max_sigmoid,
-            'avg_z_transformed_corr': avg_z_transformed_corr,
-            'var_z_transformed_corr': var_z_transformed_corr
-        }
+    if method not in WXCORR_METHODS:
+        raise ValueError(f"Unknown method '{method}', must be one of {WXCORR_METHODS}.")
+    if method == 'auto':
+        method = 'cumsum' if window_size > CUMSUM_MIN_OVERLAP * step_size else 'strided'
+
+    # Compute cross-correlation of all windows for lags in the range [_min_lag, _max_lag]
+    # Convention: Rxy(lag) = mean(x[t] * y[t+lag]), so lag > 0 means x leads y.
+    correlations = _correlation_matrix(x, y, window_size, step_size, _min_lag, _max_lag, method, n_jobs, executor, use_cache, cancel_event)
+    if absolute:
+        correlations = np.abs(correlations)
 
-        # Append the result to the list
-        results.append(result)
+    # sigmoid scaling, Fisher z statistics, window averages and peaks are derived lazily by WxcorrResult
+    start_idx = np.arange(0, n - window_size + 1, step_size)
+    return WxcorrResult(
+        lags=lags,
+        start_idx=start_idx,
+        center_idx=start_idx + window_size // 2,
+        raw_correlations=correlations,
+        average_windows=average_windows,
+    )
 
-    return results
+def iter_windowed_cross_correlation(x, y, window_size, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False, method='auto', chunk_size=None, cancel_event=None):
+    """
+    Generator variant of `windowed_cross_correlation` for recordings that do not fit comfortably in memory.
+
+    The signals are read in chunks of about `chunk_size` samples (slices of x and y, so np.memmap inputs are only
+    read chunk by chunk). Consecutive chunks overlap by window_size - step_size samples: lagged products are taken
+    within each window, so a window never needs samples beyond its own extent. Each chunk yields a WxcorrResult
+    block with absolute start_idx/center_idx; blocks are yielded in window order and together hold exactly the
+    windows (and values) of `windowed_cross_correlation`.
+
+    Parameters:
+        x, y, window_size, step_size, max_lag, use_lag_filter, lag_filter_min, lag_filter_max, absolute,
+        average_windows, method, cancel_event: see `windowed_cross_correlation`.
+        chunk_size (int): Approximate number of samples read per chunk (default: STREAM_CHUNK_SIZE). Rounded up to
+            whole re-anchoring blocks of the cumsum engine (see `_cumsum_correlations`).
 
-def standard_cross_correlation(x, y, max_lag, absolute=False):
+    Yields:
+        WxcorrResult: Results of consecutive runs of windows.
+    """
+    if chunk_size is None:
+        chunk_size = STREAM_CHUNK_SIZE
+
+    n = len(x)
+    if n < window_size:
+        return
+    n_windows = (n - window_size) // step_size + 1
+    # chunks hold whole re-anchored blocks of the cumsum engine, so results are identical to the non-streaming call
+    windows_per_block = _anchor_block_windows(window_size, step_size)
+    windows_per_chunk = max(1, (chunk_size - window_size) // step_size + 1)
+    windows_per_chunk = -(-windows_per_chunk // windows_per_block) * windows_per_block
+
+    for first_window in range(0, n_windows, windows_per_chunk):
+        last_window = min(first_window + windows_per_chunk, n_windows)
+        segment_start = first_window * step_size
+        segment_stop = (last_window - 1) * step_size + window_size
+
+        block = windowed_cross_correlation(
+            x[segment_start:segment_stop], y[segment_start:segment_stop],
+            window_size=window_size, step_size=step_size, max_lag=max_lag,
+            use_lag_filter=use_lag_filter, lag_filter_min=lag_filter_min, lag_filter_max=lag_filter_max,
+            absolute=absolute, average_windows=average_windows, method=method, use_cache=False, cancel_event=cancel_event,
+        )
+        block.start_idx += segment_start
+        block.center_idx += segment_start
+        yield block
+
+
+def summarize_wxcorr(wxcorr_data):
+    """
+    Summary statistics of windowed cross-correlation results, aggregated block by block.
+
+    Parameters:
+        wxcorr_data (WxcorrResult or iterable of WxcorrResult): A result or result blocks, e.g. from
+            `iter_windowed_cross_correlation`. Blocks are consumed one at a time and not kept.
+
+    Returns:
+        dict: A dictionary containing:
+            - 'n_windows' (int): Number of windows.
+            - 'mean_correlation' (float): Mean of all correlation values (all windows and lags).
+            - 'mean_r_max' (float): Mean peak correlation per window.
+            - 'mean_tau_max' (float): Mean lag of the peak correlation per window.
+            - 'r_max' (np.ndarray): Peak correlation per window.
+            - 'tau_max' (np.ndarray): Lag of the peak correlation per window.
+    """
+    blocks = [wxcorr_data] if isinstance(wxcorr_data, WxcorrResult) else wxcorr_data
+
+    n_windows = 0
+    n_values = 0
+    correlation_sum = 0.
+    r_max = []
+    tau_max = []
+    for block in blocks:
+        n_windows += len(block)
+        n_values += block.correlations.size
+        correlation_sum += np.sum(block.correlations)
+        r_max.append(block.r_max)
+        tau_max.append(block.tau_max)
+
+    r_max = np.concatenate(r_max) if r_max else np.empty(0)
+    tau_max = np.concatenate(tau_max) if tau_max else np.empty(0, dtype=int)
+    return {
+        'n_windows': n_windows,
+        'mean_correlation': correlation_sum / n_values if n_values else np.nan,
+        'mean_r_max': np.mean(r_max) if n_windows else np.nan,
+        'mean_tau_max': np.mean(tau_max) if n_windows else np.nan,
+        'r_max': r_max,
+        'tau_max': tau_max,
+    }
+
+
+def multiscale_windowed_cross_correlation(x, y, window_sizes, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, method='auto', n_jobs=1):
+    """
+    Windowed cross-correlation for a whole ladder of window sizes (a WCC "scalogram").
+
+    Each window size is computed with `windowed_cross_correlation`, so the values are those of a single-size run.
+    Windows of all sizes are centered on a common grid of window centers (every step_size samples), so the rows of
+    the result line up in time; cells whose window does not fit into the signal are nan.
+
+    Parameters:
+        x (np.ndarray): First time series.
+        y (np.ndarray): Second time series.
+        window_sizes (array-like): Window sizes (in samples) of the ladder, each > the largest absolute lag.
+        step_size (int): Distance of the window centers.
+        max_lag (int): Maximum lag to compute cross-correlation.
+        use_lag_filter (bool): Apply lag filter to limit lag range.
+        lag_filter_min (int): Minimum lag for filter (inclusive).
+        lag_filter_max (int): Maximum lag for filter (inclusive).
+        absolute (bool): Calculate abs of correlation values.
+        method (str): Engine of each window size, see `windowed_cross_correlation`.
+        n_jobs (int): Number of threads per window size, see `windowed_cross_correlation`.
+
+    Returns:
+        dict: A dictionary containing:
+            - 'window_sizes' (np.ndarray): Window sizes, shape (n_sizes,).
+            - 'center_idx' (np.ndarray): Window centers in the time series, shape (n_centers,).
+            - 'lags' (np.ndarray): Lags of the correlation values, shape (n_lags,).
+            - 'correlations' (np.ndarray): Correlation values, shape (n_sizes, n_centers, n_lags).
+            - 'r_max' (np.ndarray): Peak correlation per window size and center, shape (n_sizes, n_centers).
+            - 'tau_max' (np.ndarray): Lag of the peak correlation per window size and center, shape (n_sizes, n_centers).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length.")
+    n = len(x)
+
+    window_sizes = np.asarray(window_sizes, dtype=int)
+    if window_sizes.ndim != 1 or len(window_sizes) == 0:
+        raise ValueError("window_sizes must be a non-empty 1D array of window sizes.")
+
+    _min_lag, _max_lag = _lag_bounds(max_lag, use_lag_filter, lag_filter_min, lag_filter_max)
+    lags = np.arange(_min_lag, _max_lag + 1)
+    if np.min(window_sizes) <= max(abs(_min_lag), abs(_max_lag)):
+        raise ValueError(f"All window sizes must be > the largest absolute lag ({max(abs(_min_lag), abs(_max_lag))}).")
+
+    # window of size w centered on c: [c - w // 2, c - w // 2 + w)
+    center_idx = np.arange(0, n, step_size)
+    starts = center_idx - window_sizes[:, np.newaxis] // 2
+    is_valid = (starts >= 0) & (starts + window_sizes[:, np.newaxis] <= n)
+
+    correlations = np.full((len(window_sizes), len(center_idx), len(lags)), np.nan)
+    r_max = np.full(is_valid.shape, np.nan)
+    tau_max = np.full(is_valid.shape, np.nan)
+    for i, window_size in enumerate(window_sizes):
+        valid = np.flatnonzero(is_valid[i])
+        if not len(valid):
+            continue
+        # the windows of a run starting at the first valid window are the valid windows of the grid
+        first_start = starts[i, valid[0]]
+        wxcorr = windowed_cross_correlation(
+            x[first_start:], y[first_start:], int(window_size), step_size, max_lag,
+            use_lag_filter=use_lag_filter, lag_filter_min=lag_filter_min, lag_filter_max=lag_filter_max,
+            absolute=absolute, method=method, n_jobs=n_jobs
+        )
+        correlations[i, valid] = wxcorr.correlations
+        r_max[i, valid] = wxcorr.r_max
+        tau_max[i, valid] = wxcorr.tau_max
+
+    return {
+        'window_sizes': window_sizes,
+        'center_idx': center_idx,
+        'lags': lags,
+        'correlations': correlations,
+        'r_max': r_max,
+        'tau_max': tau_max,
+    }
+
+
+def _fft_lagged_sums(x, y, max_lag):
+    """
+    Computes sum( x[t] * y[t + lag] ) for all lags in [-max_lag, max_lag] via zero-padded rfft/irfft.
+    Zero padding to at least len(x) + max_lag samples prevents circular wrap-around for the requested lags.
+    """
+    n = x.shape[-1]
+    n_fft = next_fast_len(n + max_lag, real=True)
+    circular = irfft(np.conj(rfft(x, n_fft)) * rfft(y, n_fft), n_fft)
+    # negative lags wrap around to the end of the circular correlation
+    return np.concatenate((circular[..., n_fft - max_lag:], circular[..., :max_lag + 1]), axis=-1)
+
+
+def standard_cross_correlation(x, y, max_lag, absolute=False, method='auto'):
     """
     Compute standard (1D) cross-correlation between two time series.
 
@@ -145,6 +716,8 @@ def standard_cross_correlation(x, y, max_lag, absolute=False):
         y (np.ndarray): Second time series.
         max_lag (int): Maximum lag to compute cross-correlation.
         absolute (bool): Calculate abs of correlation values.
+        method (str): 'direct' (one mean per lag, O(n·max_lag)), 'fft' (zero-padded rfft/irfft, O(n·log n))
+            or 'auto' (fft if max_lag > FFT_MIN_LAG).
 
     Returns:
         dict: A dictionary containing:
@@ -161,11 +734,26 @@ def standard_cross_correlation(x, y, max_lag, absolute=False):
     x = (x - np.mean(x)) / np.std(x)
     y = (y - np.mean(y)) / np.std(y)
 
+    if method not in SXCORR_METHODS:
+        raise ValueError(f"Unknown method '{method}', must be one of {SXCORR_METHODS}.")
+    if method == 'auto':
+        method = 'fft' if max_lag > FFT_MIN_LAG else 'direct'
+
+    lags = np.arange(-max_lag, max_lag + 1)
+
     # Compute cross-correlation for lags in the range [-max_lag, max_lag]
     # Convention: Rxy(lag) = mean(x[t] * y[t+lag]), so lag > 0 means x leads y.
+    if method == 'fft':
+        correlations = _fft_lagged_sums(x, y, max_lag) / (n - np.abs(lags))
+        if absolute:
+            correlations = np.abs(correlations)
+        return {
+            'corr': correlations,
+            'lags': lags
+        }
+
     correlations = []
-    lags = []
-    for lag in range(-max_lag, max_lag + 1):
+    for lag in lags:
         if lag < 0:
             corr = np.mean(x[-lag:] * y[:lag])
         elif lag > 0:
@@ -175,9 +763,257 @@ def standard_cross_correlation(x, y, max_lag, absolute=False):
         if absolute:
             corr = np.abs(corr)
         correlations.append(corr)
-        lags.append(lag)
 
     return {
         'corr': np.array(correlations),
-        'lags': np.array(lags)
+        'lags': lags
+    }
+
+
+def stack_signals(signals, width=None):
+    """
+    Stacks signals of different lengths into a zero-padded matrix for the batched multi-pair kernels.
+
+    Parameters:
+        signals (list of array-like): Signals, one per pair.
+        width (int): Number of columns (default: the longest signal); longer signals are truncated.
+
+    Returns:
+        tuple: (matrix of shape (n_signals, width), lengths of shape (n_signals,)); lengths are those of the
+            signals, before truncation.
+    """
+    lengths = np.array([len(s) for s in signals], dtype=int)
+    if width is None:
+        width = lengths.max() if len(signals) else 0
+    stacked = np.zeros((len(signals), width))
+    for i, s in enumerate(signals):
+        n = min(lengths[i], width)
+        stacked[i, :n] = s[:n]
+    return stacked, lengths
+
+
+def _map_pair_chunks(compute_chunk, n_pairs, bytes_per_pair, n_jobs=1):
+    """
+    Calls compute_chunk(pairs) for slices of pairs whose intermediate arrays (bytes_per_pair each) fit in
+    BATCH_MAX_BYTES. With n_jobs != 1 the chunks are computed on a thread pool (-1: one thread per CPU core),
+    split into at least PARALLEL_BLOCKS_PER_WORKER chunks per thread.
+    """
+    n_workers = 1 if n_jobs == 1 else os.cpu_count() if n_jobs == -1 else max(1, n_jobs)
+    pairs_per_chunk = max(1, BATCH_MAX_BYTES // max(1, bytes_per_pair))
+    if n_workers > 1:
+        pairs_per_chunk = min(pairs_per_chunk, max(1, -(-n_pairs // (n_workers * PARALLEL_BLOCKS_PER_WORKER))))
+    chunks = [slice(first, first + pairs_per_chunk) for first in range(0, n_pairs, pairs_per_chunk)]
+
+    if n_workers == 1 or len(chunks) <= 1:
+        for pairs in chunks:
+            compute_chunk(pairs)
+        return
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        list(pool.map(compute_chunk, chunks))
+
+
+def _stacked_pairs(x, y, lengths):
+    """
+    Validates stacked pair matrices of the batched kernels. Returns x, y (float, 2D) and the per-pair lengths.
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    if x.ndim != 2 or x.shape != y.shape:
+        raise ValueError(f"x and y must be matrices of the same shape (n_pairs, n_samples), got {x.shape} and {y.shape}.")
+    if lengths is None:
+        lengths = np.full(x.shape[0], x.shape[1])
+    lengths = np.asarray(lengths, dtype=int)
+    if lengths.shape != (x.shape[0],) or np.any(lengths > x.shape[1]):
+        raise ValueError("lengths must hold one length <= n_samples per pair.")
+    return x, y, lengths
+
+
+def _matrix_pair_loader(x, y):
+    """load_pairs function (see `windowed_cross_correlation_pair_stats`) of pairs that are already stacked."""
+    return lambda pairs, width: (x[pairs, :width], y[pairs, :width])
+
+
+def windowed_cross_correlation_stats(x, y, window_size, step_size, max_lag, lengths=None, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False, n_jobs=1):
+    """
+    Batched windowed cross-correlation of many pairs of signals, reduced to per-pair summary statistics.
+
+    All pairs are computed together with the strided engine (see `_lagged_correlations`), in chunks of pairs that
+    fit in BATCH_MAX_BYTES (computed on a thread pool with n_jobs != 1). Per-window results are reduced right away,
+    no WxcorrResult is built. The statistics equal those of
+    `summarize_wxcorr(windowed_cross_correlation(x[i, :lengths[i]], y[i, :lengths[i]], ...))`.
+
+    Parameters:
+        x (np.ndarray): First signal of each pair, shape (n_pairs, n_samples).
+        y (np.ndarray): Second signal of each pair, shape (n_pairs, n_samples).
+        window_size, step_size, max_lag, use_lag_filter, lag_filter_min, lag_filter_max, absolute, average_windows:
+            see `windowed_cross_correlation`.
+        lengths (array-like): Number of valid samples of each pair, shape (n_pairs,) (default: n_samples for all).
+            Samples beyond a pair's length are ignored (see `stack_signals`).
+        n_jobs (int): Number of threads computing chunks of pairs in parallel (-1: one per CPU core).
+
+    Returns:
+        dict: See `windowed_cross_correlation_pair_stats`.
+    """
+    x, y, lengths = _stacked_pairs(x, y, lengths)
+    return windowed_cross_correlation_pair_stats(
+        _matrix_pair_loader(x, y), lengths, window_size, step_size, max_lag, use_lag_filter=use_lag_filter,
+        lag_filter_min=lag_filter_min, lag_filter_max=lag_filter_max, absolute=absolute,
+        average_windows=average_windows, n_jobs=n_jobs
+    )
+
+
+def windowed_cross_correlation_pair_stats(load_pairs, lengths, window_size, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False, n_jobs=1):
+    """
+    `windowed_cross_correlation_stats` for pairs that are loaded chunk by chunk: only the pairs of the chunk being
+    computed are stacked, so memory is bounded by BATCH_MAX_BYTES however many pairs there are.
+
+    Parameters:
+        load_pairs (callable): load_pairs(pairs, width) -> (x, y), the signals of the pairs selected by the slice
+            `pairs`, stacked to `width` samples (see `stack_signals`). Called from the worker threads with n_jobs != 1.
+        lengths (array-like): Number of valid samples of each pair, shape (n_pairs,).
+        window_size, step_size, max_lag, use_lag_filter, lag_filter_min, lag_filter_max, absolute, average_windows:
+            see `windowed_cross_correlation`.
+        n_jobs (int): Number of threads computing chunks of pairs in parallel (-1: one per CPU core).
+
+    Returns:
+        dict: A dictionary containing:
+            - 'n_windows' (np.ndarray): Number of windows per pair, shape (n_pairs,).
+            - 'mean_correlation' (np.ndarray): Mean of all correlation values per pair (nan without windows).
+            - 'mean_r_max' (np.ndarray): Mean peak correlation per pair (nan without windows).
+            - 'mean_tau_max' (np.ndarray): Mean lag of the peak correlation per pair (nan without windows).
+            - 'r_max' (np.ndarray): Peak correlation per window, shape (n_pairs, max n_windows), nan-padded.
+            - 'tau_max' (np.ndarray): Lag of the peak correlation per window, shape (n_pairs, max n_windows), nan-padded.
+    """
+    lengths = np.asarray(lengths, dtype=int)
+    n_pairs = len(lengths)
+
+    _min_lag, _max_lag = _lag_bounds(max_lag, use_lag_filter, lag_filter_min, lag_filter_max)
+    n_lags = _max_lag - _min_lag + 1
+
+    n_windows = np.maximum(0, (lengths - window_size) // step_size + 1)
+    max_windows = int(n_windows.max()) if n_pairs else 0
+    r_max = np.full((n_pairs, max_windows), np.nan)
+    tau_max = np.full((n_pairs, max_windows), np.nan)
+    correlation_sums = np.zeros(n_pairs)
+
+    # windows of all pairs up to the last window of the longest pair; windows beyond a pair's length are masked
+    span = (max_windows - 1) * step_size + window_size
+    is_valid = np.arange(max_windows) < n_windows[:, np.newaxis]
+    bytes_per_pair = 8 * (max_windows * (4 * window_size + 2 * n_lags) + 2 * span)
+
+    def compute_chunk(pairs):
+        x, y = load_pairs(pairs, span)
+        # padded windows may have zero variance, their (nan) values are masked below
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_windows = _normalize_windows(np.lib.stride_tricks.sliding_window_view(x, window_size, axis=-1)[:, ::step_size])
+            y_windows = _normalize_windows(np.lib.stride_tricks.sliding_window_view(y, window_size, axis=-1)[:, ::step_size])
+        correlations = _lagged_correlations(x_windows, y_windows, _min_lag, _max_lag)
+        if absolute:
+            correlations = np.abs(correlations)
+
+        valid = is_valid[pairs]
+        correlation_sums[pairs] = np.sum(correlations, axis=(1, 2), where=valid[..., np.newaxis])
+        if average_windows:
+            peaks = np.mean(correlations, axis=-1)
+            peak_lags = np.zeros(peaks.shape)
+        else:
+            peaks = np.max(correlations, axis=-1)
+            peak_lags = np.argmax(correlations, axis=-1) + _min_lag
+        r_max[pairs] = np.where(valid, peaks, np.nan)
+        tau_max[pairs] = np.where(valid, peak_lags, np.nan)
+
+    if max_windows:
+        _map_pair_chunks(compute_chunk, n_pairs, bytes_per_pair, n_jobs)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'n_windows': n_windows,
+            'mean_correlation': correlation_sums / (n_windows * n_lags),
+            'mean_r_max': np.sum(r_max, axis=1, where=is_valid) / n_windows,
+            'mean_tau_max': np.sum(tau_max, axis=1, where=is_valid) / n_windows,
+            'r_max': r_max,
+            'tau_max': tau_max,
+        }
+
+
+def standard_cross_correlation_stats(x, y, max_lag, lengths=None, absolute=False, n_jobs=1):
+    """
+    Batched standard cross-correlation of many pairs of signals, reduced to per-pair summary statistics.
+
+    Each pair is normalized over its own length, all pairs are correlated with one batched rfft/irfft
+    (see `_fft_lagged_sums`), in chunks of pairs that fit in BATCH_MAX_BYTES (computed on a thread pool with
+    n_jobs != 1). Values equal those of
+    `standard_cross_correlation(x[i, :lengths[i]], y[i, :lengths[i]], max_lag, absolute)`.
+
+    Parameters:
+        x (np.ndarray): First signal of each pair, shape (n_pairs, n_samples).
+        y (np.ndarray): Second signal of each pair, shape (n_pairs, n_samples).
+        max_lag (int): Maximum lag to compute cross-correlation (must be smaller than every pair's length).
+        lengths (array-like): Number of valid samples of each pair, shape (n_pairs,) (default: n_samples for all).
+            Samples beyond a pair's length are ignored (see `stack_signals`).
+        absolute (bool): Calculate abs of correlation values.
+        n_jobs (int): Number of threads computing chunks of pairs in parallel (-1: one per CPU core).
+
+    Returns:
+        dict: See `standard_cross_correlation_pair_stats`.
+    """
+    x, y, lengths = _stacked_pairs(x, y, lengths)
+    return standard_cross_correlation_pair_stats(_matrix_pair_loader(x, y), lengths, max_lag, absolute=absolute, n_jobs=n_jobs)
+
+
+def standard_cross_correlation_pair_stats(load_pairs, lengths, max_lag, absolute=False, n_jobs=1):
+    """
+    `standard_cross_correlation_stats` for pairs that are loaded chunk by chunk: only the pairs of the chunk being
+    computed are stacked, so memory is bounded by BATCH_MAX_BYTES however many pairs there are.
+
+    Parameters:
+        load_pairs (callable): load_pairs(pairs, width) -> (x, y), see `windowed_cross_correlation_pair_stats`.
+        lengths (array-like): Number of valid samples of each pair, shape (n_pairs,).
+        max_lag (int): Maximum lag to compute cross-correlation (must be smaller than every pair's length).
+        absolute (bool): Calculate abs of correlation values.
+        n_jobs (int): Number of threads computing chunks of pairs in parallel (-1: one per CPU core).
+
+    Returns:
+        dict: A dictionary containing:
+            - 'mean_correlation' (np.ndarray): Mean correlation over all lags per pair, shape (n_pairs,).
+            - 'r_max' (np.ndarray): Peak correlation per pair, shape (n_pairs,).
+            - 'tau_max' (np.ndarray): Lag of the peak correlation per pair, shape (n_pairs,).
+    """
+    lengths = np.asarray(lengths, dtype=int)
+    n_pairs = len(lengths)
+    n = int(lengths.max()) if n_pairs else 0
+    if n_pairs and max_lag >= lengths.min():
+        raise ValueError(f"max_lag ({max_lag}) must be smaller than the length of every pair (min {lengths.min()}).")
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    mean_correlation = np.empty(n_pairs)
+    r_max = np.empty(n_pairs)
+    tau_max = np.empty(n_pairs, dtype=int)
+
+    bytes_per_pair = 8 * (8 * next_fast_len(n + max_lag, real=True) + 2 * n)
+
+    def compute_chunk(pairs):
+        # normalize each pair over its valid samples (zero mean, unit variance), zero padding after that
+        pair_lengths = lengths[pairs, np.newaxis]
+        valid = np.arange(n) < pair_lengths
+        normalized = []
+        for signal in load_pairs(pairs, n):
+            mean = np.sum(signal, axis=-1, where=valid, keepdims=True) / pair_lengths
+            std = np.sqrt(np.sum((signal - mean) ** 2, axis=-1, where=valid, keepdims=True) / pair_lengths)
+            normalized.append(np.where(valid, (signal - mean) / std, 0))
+
+        correlations = _fft_lagged_sums(normalized[0], normalized[1], max_lag) / (pair_lengths - np.abs(lags))
+        if absolute:
+            correlations = np.abs(correlations)
+
+        mean_correlation[pairs] = np.mean(correlations, axis=-1)
+        r_max[pairs] = np.max(correlations, axis=-1)
+        tau_max[pairs] = np.argmax(correlations, axis=-1) - max_lag
+
+    _map_pair_chunks(compute_chunk, n_pairs, bytes_per_pair, n_jobs)
+
+    return {
+        'mean_correlation': mean_correlation,
+        'r_max': r_max,
+        'tau_max': tau_max,
     }
@@ -1,5 +1,20 @@
+from functools import lru_cache
 import numpy as np
 
+@lru_cache(maxsize=256)
+def _detrending_basis(w, order):
+    """
+    Orthonormal basis (w x order+1) of the polynomials of degree <= order on a segment of w samples.
+
+    Least-squares detrending of a segment y (polyfit + polyval) equals y - Q @ (Q.T @ y), so one basis per
+    (w, order) detrends every segment with two matrix products. The basis is the QR factor of the Vandermonde
+    matrix of the segment positions (scaled to [-1, 1] for numerical conditioning; the spanned space is the same).
+    """
+    t = np.linspace(-1, 1, w) if w > 1 else np.zeros(1)
+    Q, _ = np.linalg.qr(np.vander(t, order + 1))
+    Q.flags.writeable = False
+    return Q
+
 def _detrended_fluctuation_analysis(data, window_sizes, order=1):
     """
     Perform Detrended Fluctuation Analysis (DFA) on a time series to estimate 
@@ -41,54 +56,124 @@ def _detrended_fluctuation_analysis(data, window_sizes, order=1):
     if data.ndim != 1:
         raise ValueError("Data must be a 1D time series.")
 
-    window_sizes = np.asarray(window_sizes, dtype=int)
-    if window_sizes.ndim != 1:
-        raise ValueError("window_sizes must be a 1D array of window sizes.")
+    return DFAPlan(len(data), order, window_sizes).apply(data)
+
+class DFAPlan:
+    """
+    Precomputed DFA setup for time series of one length: window sizes, segment geometry per window size,
+    detrending bases and the pseudo-inverse of the log-log fit. A plan is built once and can then be applied
+    to any number of series of that length (see `apply`); use `get_dfa_plan` for plans with automatic window sizes,
+    which are cached by (length, order).
+
+    Parameters:
+    -----------
+    length : int
+        Length (N) of the time series the plan is applied to.
+    order : int, optional (default=1)
+        Order of the polynomial used for detrending.
+    window_sizes : array_like, optional
+        Window sizes (in samples) at which to compute fluctuations. Determined from the length if None
+        (see `_make_window_sizes`). See `_detrended_fluctuation_analysis` for the requirements.
+    """
+
+    __slots__ = ('length', 'order', 'window_sizes', '_segments', '_ramp', '_fit_pinv')
+
+    def __init__(self, length, order=1, window_sizes=None):
+        length = int(length)
+        if window_sizes is None:
+            window_sizes = _window_sizes_for_length(length, order)
+
+        # --- Input validation ---
+        window_sizes = np.asarray(window_sizes, dtype=int)
+        if window_sizes.ndim != 1:
+            raise ValueError("window_sizes must be a 1D array of window sizes.")
 
-    if len(data) < max(window_sizes):
-        raise ValueError(f"Signal length ({len(data)}) < max window size ({max(window_sizes)}).")
+        if length < max(window_sizes):
+            raise ValueError(f"Signal length ({length}) < max window size ({max(window_sizes)}).")
 
-    if order < 0:
-        raise ValueError("Order must be ≥ 0 (0: no detrending, 1: linear, etc.).")
+        if order < 0:
+            raise ValueError("Order must be ≥ 0 (0: no detrending, 1: linear, etc.).")
 
-    if min(window_sizes) <= order + 1:
-        raise ValueError(
-            f"All window sizes must be > order + 1 ({order + 1}). "
-            f"Found min(window_sizes) = {min(window_sizes)}."
+        if min(window_sizes) <= order + 1:
+            raise ValueError(
+                f"All window sizes must be > order + 1 ({order + 1}). "
+                f"Found min(window_sizes) = {min(window_sizes)}."
+            )
+
+        self.length = length
+        self.order = order
+        self.window_sizes = window_sizes
+        self.window_sizes.flags.writeable = False
+
+        # per window size: (w, number of segments, samples covered by the segments, detrending basis)
+        self._segments = tuple(
+            (int(w), length // int(w), (length // int(w)) * int(w), _detrending_basis(int(w), order))
+            for w in window_sizes
         )
+        self._ramp = np.arange(1, length + 1)
 
-    # --- DFA [based on DFA_fun.m by Alon] ---
-    n_window_sizes = len(window_sizes)
-    F = np.zeros(n_window_sizes)
-    N = len(data)
-
-    for h in range(n_window_sizes):
-        w = window_sizes[h]
-        n = int(np.floor(N / w))
-        Nfloor = n * w
-        D = data[:Nfloor]
-        
-        # Integrated series
-        y = np.cumsum(D - np.mean(D))
-        
-        # Prepare segments
-        bin_edges = np.arange(0, Nfloor, w)
-        vec = np.arange(1, w + 1)
-        
-        # Calculate local trends and detrend
-        y_hat = np.zeros_like(y)
-        for j in range(n):
-            segment = y[bin_edges[j]:bin_edges[j]+w]
-            coeff = np.polyfit(vec, segment, order)
-            y_hat[bin_edges[j]:bin_edges[j]+w] = np.polyval(coeff, vec)
-        
-        # Calculate fluctuation for this window size
-        F[h] = np.sqrt(np.mean((y - y_hat) ** 2))
-    
-    # Calculate scaling coefficient
-    A = np.polyfit(np.log(window_sizes), np.log(F), 1)
-    
-    return A, F
+        # least-squares fit of log(F) = alpha * log(window size) + intercept, as one matrix product
+        # (columns scaled and rcond chosen as in np.polyfit, so rank-deficient fits give the same solution)
+        lhs = np.vander(np.log(window_sizes), 2)
+        scale = np.sqrt(np.sum(lhs ** 2, axis=0))
+        self._fit_pinv = np.linalg.pinv(lhs / scale, rcond=len(window_sizes) * np.finfo(float).eps) / scale[:, np.newaxis]
+
+    def apply(self, series):
+        """
+        Run DFA on one or many time series of the plan's length.
+
+        Parameters:
+        -----------
+        series : array_like
+            1D time series of length N, or 2D array of shape (n_series, N) with one time series per row.
+
+        Returns:
+        --------
+        A : ndarray
+            [alpha, intercept], or shape (n_series, 2) for 2D input. Series with undefined fluctuations
+            (e.g. from nan input) get nan.
+        F : ndarray
+            Fluctuation function values for each window size, or shape (n_series, len(window_sizes)) for 2D input.
+        """
+        series = np.asarray(series, dtype=float)
+        is_single = series.ndim == 1
+        if is_single:
+            series = series[np.newaxis, :]
+        if series.ndim != 2 or series.shape[1] != self.length:
+            raise ValueError(f"Series must have length {self.length} (got shape {series.shape}).")
+
+        # --- DFA [based on DFA_fun.m by Alon] ---
+        n_series = series.shape[0]
+        F = np.zeros((n_series, len(self._segments)))
+        cumulative = np.cumsum(series, axis=1)
+
+        for h, (w, n, Nfloor, Q) in enumerate(self._segments):
+            # Integrated series of the first Nfloor samples (cumsum of D - mean(D)), shape (n_series, n_segments, w)
+            mean = cumulative[:, Nfloor - 1:Nfloor] / Nfloor
+            y = (cumulative[:, :Nfloor] - self._ramp[:Nfloor] * mean).reshape(n_series, n, w)
+
+            # Remove local trends of all segments of all series at once:
+            # residual = y - projection of y onto the polynomial basis
+            residual = y - (y @ Q) @ Q.T
+
+            # Calculate fluctuation for this window size
+            F[:, h] = np.sqrt(np.mean(residual ** 2, axis=(1, 2)))
+
+        # Calculate scaling coefficients
+        A = np.full((n_series, 2), np.nan)
+        valid = np.all(np.isfinite(F) & (F > 0), axis=1)
+        A[valid] = np.log(F[valid]) @ self._fit_pinv.T
+
+        if is_single:
+            return A[0], F[0]
+        return A, F
+
+@lru_cache(maxsize=64)
+def get_dfa_plan(length, order=1):
+    """
+    Return the (cached) DFAPlan with automatic window sizes for series of the given length and order.
+    """
+    return DFAPlan(length, order)
 
 def _make_window_sizes(data, order=1):
     """
@@ -114,8 +199,12 @@ def _make_window_sizes(data, order=1):
         If the data length is too short for the specified polynomial order.
     
     """
-    N = len(data)
-    
+    return _window_sizes_for_length(len(data), order)
+
+def _window_sizes_for_length(N, order=1):
+    """
+    Window sizes for DFA of a series of N samples (see `_make_window_sizes`).
+    """
     if N < 100:
         raise ValueError(f"Data length must be at least 100 samples for reliable DFA (got {N}).")
 
@@ -150,55 +239,76 @@ def dfa(data, order=1):
         Fluctuation function values for each window in `window_sizes`.    
     """
 
-    window_sizes = _make_window_sizes(data, order)
-    return _detrended_fluctuation_analysis(data, window_sizes, order)
+    data = np.asarray(data)
+    if data.ndim > 1:
+        if data.shape[0] == 1:
+            data = data.T
+        else:
+            raise ValueError("Data must be 1D. Use data.ravel() if needed.")
+    data = data.squeeze()
+    if data.ndim != 1:
+        raise ValueError("Data must be a 1D time series.")
+
+    return get_dfa_plan(len(data), order).apply(data)
 
 def dfa_wxcorr_window_averages(wxcorr_data, max_lag, order=1):
     if not wxcorr_data:
         return np.array([-1]), np.array([-1])
     
     # calculate correlation averages per window
-    per_window_averages = []
-    for window in wxcorr_data:
-        avg_corr = np.mean(window['correlations'])
-        per_window_averages.append(avg_corr)
+    per_window_averages = np.mean(wxcorr_data.correlations, axis=1)
 
     A, F = dfa(per_window_averages,  order)
 
     return A[0]
 
+def dfa_batch(series, order=1):
+    """
+    Performs Detrended Fluctuation Analysis (DFA) on many time series of identical length in one call.
+    Uses the cached DFAPlan for the series length, so window sizes and detrending bases are shared by all series
+    (and by all later calls with the same length and order). See `dfa` for details.
+
+    Parameters:
+    -----------
+    series : array_like
+        2D array of shape (n_series, N), one time series per row.
+    order : int, optional (default=1)
+        Order of the polynomial used for detrending.
+
+    Returns:
+    --------
+    A : ndarray
+        Shape (n_series, 2), [alpha, intercept] of each series.
+    F : ndarray
+        Shape (n_series, n_window_sizes), fluctuation function values of each series.
+    """
+    series = np.asarray(series)
+    if series.ndim != 2:
+        raise ValueError("Series must be a 2D array (one time series per row).")
+    return get_dfa_plan(series.shape[1], order).apply(series)
+
 def dfa_wxcorr(wxcorr_data, max_lag, order=1):
     """
     Performs Detrended Fluctuation Analysis (DFA) on cross-correlation data for each lag.
+    All lag lines (columns of the correlation matrix) are analysed in one batched call (see `dfa_batch`).
     Args:
-        wxcorr_data (list of dict): List of dictionaries, each representing a window of cross-correlation data.
-            Each dictionary should have the keys:
-                - 'lags': list or array of lag values.
-                - 'correlations': list or array of correlation values corresponding to each lag.
+        wxcorr_data (WxcorrResult): Output from `windowed_cross_correlation`, one row of correlations per window
+            and one column per lag (`wxcorr_data.lags`).
         max_lag (int): The maximum lag value of wxcorr windows (lags in windows go from -max_lag to +max_lag).
+            The lag of each column is read from `wxcorr_data.lags`, which also covers lag-filtered results.
         order (int, optional): The order of the polynomial for detrending in DFA. Default is 1 (linear detrending).
     Returns:
         list of dict: A list where each element is a dictionary with keys:
             - 'lag': The lag value.
             - 'A': ndarray [alpha, intercept] where `alpha` is the scaling exponent for this lag.
             - 'F': ndarray of Fluctuation function values for each window in `window_sizes` for this lag.
-        If `wxcorr_data` is empty or None, returns (np.array([-1]), np.array([-1])).
+        If `wxcorr_data` is empty or None, returns [].
     """
     
     if not wxcorr_data:
         return []
 
-    # extract horizontal lines of wxcorr plot (lists of correlation values per in-window lag)
-    lags = range(-max_lag, max_lag + 1)
-    correlations_per_lag = {lag: [] for lag in lags}
-    for window in wxcorr_data:
-        for i, correlation in enumerate(window['correlations']):
-            correlations_per_lag[i-max_lag].append(correlation)
-    
-    # for each correlation line, perform DFA
-    dfa_per_lag = []
-    for lag, correlations in correlations_per_lag.items():
-        A, F = dfa(correlations, order)
-        dfa_per_lag.append({'lag': lag, 'A': A, 'F': F})
+    # DFA of all horizontal lines of the wxcorr plot (correlation values per in-window lag) at once
+    A, F = dfa_batch(wxcorr_data.correlations.T, order)
 
-    return dfa_per_lag
\ No newline at end of file
+    return [{'lag': lag, 'A': A[i], 'F': F[i]} for i, lag in enumerate(wxcorr_data.lags)]
@@ -1,7 +1,33 @@
 import os
+import numpy as np
 import xlsx
+from cross_correlation import WxcorrResult
+
+def _surrogate_metadata(surrogates):
+    """
+    Single values of a within-dyad surrogate test (see `surrogates.surrogate_test`), or {} if no test was run.
+    """
+    if surrogates is None:
+        return {}
+    return {
+        'Surrogate method': surrogates['method'],
+        'Surrogates': surrogates['n_surrogates'],
+        'Surrogate null mean correlation (mean)': np.mean(surrogates['null_mean_correlation']),
+        'Surrogate null r_max (mean)': np.mean(surrogates['null_r_max']),
+        'Surrogate p-value (mean correlation)': surrogates['p_value_mean_correlation'],
+        'Surrogate p-value (r_max)': surrogates['p_value_r_max'],
+    }
 
 def export_wxcorr_data(file_path, params):
+    """
+    Write windowed cross-correlation results to an XLSX file.
+    params['wxcorr'] is a WxcorrResult or an iterable of WxcorrResult blocks (e.g. from `iter_windowed_cross_correlation`).
+    Blocks are collected before anything is written: every window is a column and worksheets are written row by row,
+    so the first row already needs the title of the last window. The export therefore holds all windows' correlation
+    values in memory (as arrays, not worksheet cells), like a single WxcorrResult.
+    """
+    wxcorr = params['wxcorr']
+    blocks = [wxcorr] if isinstance(wxcorr, WxcorrResult) else wxcorr
     metadata = {
         'xcorr type': "windowed cross-correlation",
         'Input dyad directory': f"{os.path.basename(params['selected_dyad_dir'])}",
@@ -17,28 +43,51 @@ def export_wxcorr_data(file_path, params):
         'Lag filter used': params['checkbox_lag_filter'],
         'Lag filter minimum': params['lag_filter_min'] if params['checkbox_lag_filter'] else '-',
         'Lag filter maximum': params['lag_filter_max'] if params['checkbox_lag_filter'] else '-',
+        **_surrogate_metadata(params.get('surrogates')),
     }
-    vectors = {
+    # column layout: signals, per-window summary vectors, two columns per window, DFA per lag
+    signal_vectors = {
         'signal_a': params['signal_a_std'] if params['is_standardised'] else params['signal_a'],
         'signal_b': params['signal_b_std'] if params['is_standardised'] else params['signal_b'],
-        'window start index': [o['start_idx'] for o in params['wxcorr']],
-        'max correlation (r_max)': [o['r_max'] for o in params['wxcorr']],
-        'lag of max correlation (tau_max)': [o['tau_max'] for o in params['wxcorr']],
     }
-    vectors['avg_z_transformed_corr'] = [o['avg_z_transformed_corr'] for o in params['wxcorr']]
-    vectors['var_z_transformed_corr'] = [o['var_z_transformed_corr'] for o in params['wxcorr']]
-    for window_index, window in enumerate(params['wxcorr']):
-        vectors[f"w_{window_index}_correlations"] = window['correlations']
-        vectors[f"w_{window_index}_meta"] = [ f"start_idx={window['start_idx']}", f"center_idx={window['center_idx']}", f"r_max={window['r_max']}", f"tau_max={window['tau_max']}" ]
+    summary_vectors = {
+        'window start index': [],
+        'max correlation (r_max)': [],
+        'lag of max correlation (tau_max)': [],
+        'avg_z_transformed_corr': [],
+        'var_z_transformed_corr': [],
+    }
+    summary_fields = ['start_idx', 'r_max', 'tau_max', 'avg_z_transformed_corr', 'var_z_transformed_corr']
+
+    # the per-window columns are rows of the blocks' correlation arrays (8 bytes per value, not worksheet cells); all
+    # blocks are collected, then the sheet is written row by row through a write-only workbook
+    window_vectors = []
+    for block in blocks:
+        for i in range(len(block)):
+            window_index = len(window_vectors) // 2
+            window_vectors.append((f"w_{window_index}_correlations", block.correlations[i]))
+            window_vectors.append((f"w_{window_index}_meta", [ f"start_idx={block.start_idx[i]}", f"center_idx={block.center_idx[i]}", f"r_max={block.r_max[i]}", f"tau_max={block.tau_max[i]}" ]))
+        for name, field in zip(summary_vectors, summary_fields):
+            summary_vectors[name].append(getattr(block, field))
+
     # DFA per lag
     if params.get('dfa_alpha_per_lag_wxcorr') is not None:
-        vectors['dfa_lags'] = [d['lag'] for d in params['dfa_alpha_per_lag_wxcorr']]
-        vectors['dfa_alpha'] = [d['alpha'] for d in params['dfa_alpha_per_lag_wxcorr']]
+        dfa_vectors = {
+            'dfa_lags': [d['lag'] for d in params['dfa_alpha_per_lag_wxcorr']],
+            'dfa_alpha': [d['alpha'] for d in params['dfa_alpha_per_lag_wxcorr']],
+        }
     else:
-        vectors['dfa_lags'] = ['-']
-        vectors['dfa_alpha'] = ['-']
+        dfa_vectors = {'dfa_lags': ['-'], 'dfa_alpha': ['-']}
 
-    xlsx.write_xlsx(vectors=vectors, single_values=metadata, output_path=file_path)
+    vectors = [
+        *signal_vectors.items(),
+        *((name, np.concatenate(values) if values else []) for name, values in summary_vectors.items()),
+        *window_vectors,
+        *dfa_vectors.items(),
+    ]
+    wb, sheet = xlsx.create_sheet()
+    xlsx.write_rows(sheet, metadata, vectors)
+    wb.save(file_path)
 
 def export_sxcorr_data(file_path, params):
     metadata = {
@@ -50,7 +99,8 @@ def export_sxcorr_data(file_path, params):
         'Standardised (z-score)': params['is_standardised'],
         'Max lag': params['max_lag'],
         'Absolute correlation values': params['checkbox_absolute_corr'],
-        'Alpha (DFA scaling exponent)': params['dfa_alpha'] if params['dfa_alpha'] is not None else '-'
+        'Alpha (DFA scaling exponent)': params['dfa_alpha'] if params['dfa_alpha'] is not None else '-',
+        **_surrogate_metadata(params.get('surrogates')),
     }
     vectors = {
         'signal_a': params['signal_a_std'] if params['is_standardised'] else params['signal_a'],
@@ -60,7 +110,11 @@ def export_sxcorr_data(file_path, params):
     }
     xlsx.write_xlsx(vectors=vectors, single_values=metadata, output_path=file_path)
 
-def export_random_pair_data(file_path, params, input_dir, t_stat, p_value, avg_corr_rp, avg_corr_real):
+def export_random_pair_data(file_path, params, input_dir, t_stat, p_value, avg_corr_rp, avg_corr_real, permutation=None, exhaustive=False):
+    """
+    Write random pair analysis results (see `batch_processing.random_pair_analysis`) to an XLSX file.
+    permutation is the optional permutation test result, exhaustive marks runs over all non-dyad pairs.
+    """
     # collect metadata
     is_windowed_xcorr = params['checkbox_windowed_xcorr']
     metadata = {
@@ -82,13 +136,20 @@ def export_random_pair_data(file_path, params, input_dir, t_stat, p_value, avg_c
         'Absolute correlation values': params['checkbox_absolute_corr'],
     }
     metadata['Input dyad directory'] = f"{input_dir}"
+    metadata['Surrogate pairs'] = 'all non-dyad pairs' if exhaustive else 'random pairs'
 
     # collect single-value data
     single_values = {
         't-statistic': t_stat,
         'p-value': p_value,
-        **metadata
     }
+    if permutation is not None:
+        single_values.update({
+            'permutation test: mean difference': permutation['mean_difference'],
+            'permutation test: p-value': permutation['p_value'],
+            'permutation test: permutations': permutation['n_permutations'],
+        })
+    single_values.update(metadata)
 
     # collect vector data
     vectors = {
@@ -97,4 +158,68 @@ def export_random_pair_data(file_path, params, input_dir, t_stat, p_value, avg_c
     }
 
     # write to xlsx
-    xlsx.write_xlsx(vectors=vectors, single_values=single_values, output_path=file_path, sheet_title="Random Pair Analysis")
\ No newline at end of file
+    xlsx.write_xlsx(vectors=vectors, single_values=single_values, output_path=file_path, sheet_title="Random Pair Analysis")
+
+def export_sweep_data(file_path, params, parameter_sets, rows):
+    """
+    Write the results of a parameter sweep (see `batch_processing.parameter_sweep`) to one XLSX file.
+    One row per (dyad, parameter set): the dyad, the parameter set index, the swept parameter values and the summary values.
+    """
+    is_windowed_xcorr = params['checkbox_windowed_xcorr']
+    metadata = {
+        'xcorr type': "windowed cross-correlation" if is_windowed_xcorr else "(standard) cross-correlation",
+        'Mode': 'parameter sweep',
+        'Input dyad directory': f"{params['batch_input_folder']}",
+        'Data type': 'fixed-rate' if params['checkbox_fr'] else 'event-based (resampled to 5hz)',
+        'Parameter sets': len(parameter_sets),
+        'Dyads': len({row['dyad'] for row in rows}),
+    }
+
+    # swept parameters (in order of first appearance) and summary values, one column each
+    swept_names = list(dict.fromkeys(name for parameter_set in parameter_sets for name in parameter_set))
+    value_names = list(dict.fromkeys(name for row in rows for name in row if name not in ('dyad', 'parameter_set')))
+    vectors = {
+        'dyad': [row['dyad'] for row in rows],
+        'parameter set': [row['parameter_set'] for row in rows],
+        **{name: [parameter_sets[row['parameter_set']].get(name, params.get(name)) for row in rows] for name in swept_names},
+        **{name: [row[name] if row[name] is not None else '-' for row in rows] for name in value_names},
+    }
+
+    xlsx.write_xlsx(vectors=vectors, single_values=metadata, output_path=file_path, sheet_title="Parameter Sweep")
+
+def export_batch_summary_data(file_path, summary):
+    """
+    Write the study-level result of a (merged, see `batch_processing.merge_batch_summaries`) batch run to one XLSX file.
+    One row per succeeded dyad with its summary values; failed dyads are listed with their error.
+    """
+    settings = summary['params']
+    is_windowed_xcorr = settings['checkbox_windowed_xcorr']
+    metadata = {
+        'xcorr type': "windowed cross-correlation" if is_windowed_xcorr else "(standard) cross-correlation",
+        'Mode': 'batch summary',
+        'Data type': 'fixed-rate' if settings['checkbox_fr'] else 'event-based (resampled to 5hz)',
+        **({
+            'Window size': settings['window_size'],
+            'Step size': settings['step_size'],
+            'Max lag': settings['max_lag'],
+        } if is_windowed_xcorr else {
+            'Max lag': settings['max_lag_sxc'],
+        }),
+        'Shards': len(summary['shards']) + len(summary['missing_shards']),
+        'Missing shards': ', '.join(str(i) for i in summary['missing_shards']) or '-',
+        'Dyads succeeded': len(summary['succeeded']),
+        'Dyads failed': len(summary['failed']),
+        'Dyads skipped': len(summary['skipped']),
+    }
+
+    rows = summary['results']
+    value_names = list(dict.fromkeys(name for row in rows for name in row if name != 'dyad'))
+    vectors = {
+        'dyad': [row['dyad'] for row in rows],
+        **{name: [row.get(name, '-') for row in rows] for name in value_names},
+    }
+    if summary['failed']:
+        vectors['failed dyad'] = [os.path.basename(dyad_dir) for dyad_dir, _ in summary['failed']]
+        vectors['error'] = [error for _, error in summary['failed']]
+
+    xlsx.write_xlsx(vectors=vectors, single_values=metadata, output_path=file_path, sheet_title="Batch Summary")
@@ -82,6 +82,9 @@ def setup_traces():
     )
     state.val_random_pair_is_ready.trace_add('write', update_active_state_random_pair_button)
 
+    state.val_batch_is_running.trace_add('write', update_batch_progress_visibility)
+    state.val_random_pair_is_running.trace_add('write', update_random_pair_progress_visibility)
+
 
 # ---------------------------------------------------------------------------
 # UPDATE FUNCTIONS — input data section
@@ -242,3 +245,21 @@ def update_active_state_random_pair_button(*args):
     _w['button_random_pair'].configure(
         state="normal" if state.val_random_pair_is_ready.get() else "disabled"
     )
+
+
+def update_batch_progress_visibility(*args):
+    if state.val_batch_is_running.get():
+        _w['button_batch_cancel'].grid(row=8, column=1, padx=10, pady=10, sticky='w')
+        _w['progressbar_batch'].grid(row=9, column=0, padx=10, pady=5, sticky='ew', columnspan=2)
+    else:
+        _w['button_batch_cancel'].grid_forget()
+        _w['progressbar_batch'].grid_forget()
+
+
+def update_random_pair_progress_visibility(*args):
+    if state.val_random_pair_is_running.get():
+        _w['button_random_pair_cancel'].grid(row=8, column=1, padx=10, pady=10, sticky='w')
+        _w['progressbar_random_pair'].grid(row=9, column=0, padx=10, pady=5, sticky='ew', columnspan=2)
+    else:
+        _w['button_random_pair_cancel'].grid_forget()
+        _w['progressbar_random_pair'].grid_forget()
@@ -362,6 +362,17 @@ def build_layout(app, validate_numeric_input):
     )
     button_batch.grid(row=8, column=0, padx=10, pady=10, sticky='w')
 
+    button_batch_cancel = tk.CTkButton(
+        subgroup_batch, text='Cancel', command=cb.handle_cancel_batch_button
+    )
+    # initially hidden — shown while a batch runs
+
+    progressbar_batch = tk.CTkProgressBar(subgroup_batch, variable=state.val_batch_progress)
+    # initially hidden — shown while a batch runs
+
+    label_batch_progress = tk.CTkLabel(subgroup_batch, textvariable=state.val_batch_progress_text)
+    label_batch_progress.grid(row=10, column=0, padx=10, sticky='w', columnspan=2)
+
     # Random pair analysis subgroup
     subgroup_random_pair = tk.CTkFrame(tab_export_batch)
     subgroup_random_pair.grid(row=2, column=0, sticky='ew', columnspan=2, padx=0, pady=0)
@@ -397,17 +408,35 @@ def build_layout(app, validate_numeric_input):
     )
     entry_rp_n.grid(row=4, column=1, sticky="w", padx=10, pady=5)
 
+    checkbox_rp_exhaustive = tk.CTkCheckBox(
+        subgroup_random_pair, text='all non-dyad pairs (ignores N)',
+        variable=state.val_checkbox_rp_exhaustive
+    )
+    checkbox_rp_exhaustive.grid(row=5, column=0, sticky="w", padx=10, pady=5, columnspan=2)
+
     button_random_pair = tk.CTkButton(
         subgroup_random_pair, text='Run rp analysis',
         command=cb.handle_run_random_pair_button, state="disabled"
     )
     button_random_pair.grid(row=8, column=0, padx=10, pady=10, sticky='w')
 
+    button_random_pair_cancel = tk.CTkButton(
+        subgroup_random_pair, text='Cancel', command=cb.handle_cancel_random_pair_button
+    )
+    # initially hidden — shown while an analysis runs
+
+    progressbar_random_pair = tk.CTkProgressBar(subgroup_random_pair, variable=state.val_random_pair_progress)
+    # initially hidden — shown while an analysis runs
+
+    label_random_pair_progress = tk.CTkLabel(subgroup_random_pair, textvariable=state.val_random_pair_progress_text)
+    label_random_pair_progress.grid(row=10, column=0, padx=10, sticky='w', columnspan=2)
+
     # -----------------------------------------------------------------
     # Inject widget references that callbacks need for dropdown updates
     # -----------------------------------------------------------------
     cb.register_dropdowns(dropdown_select_sheet, dropdown_select_column_a, dropdown_select_column_b)
     cb.register_tabview(group_params_tabview)
+    cb.register_app(app)
 
     # -----------------------------------------------------------------
     # Return all widgets needed by app_gui_updates and app_corr_plot
@@ -439,7 +468,11 @@ def build_layout(app, validate_numeric_input):
         'label_output_dir':                    label_output_dir,
         'label_batch_input_num_subdirs':       label_batch_input_num_subdirs,
         'button_batch':                        button_batch,
+        'button_batch_cancel':                 button_batch_cancel,
+        'progressbar_batch':                   progressbar_batch,
         'label_random_pair_input_folder':      label_random_pair_input_folder,
         'label_random_pair_output_file':       label_random_pair_output_file,
         'button_random_pair':                  button_random_pair,
+        'button_random_pair_cancel':           button_random_pair_cancel,
+        'progressbar_random_pair':             progressbar_random_pair,
     }
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+
+# version of manifest entries; entries of other versions are ignored (their dyads are processed again)
+MANIFEST_VERSION = 1
+
+# bytes read at a time when hashing input files
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """
+    Content hash (hex) of a file, read in chunks.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_record(path):
+    """
+    Identity of an input file for the manifest: path, size, modification time (ns) and content hash.
+    """
+    stat = os.stat(path)
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': file_digest(path),
+    }
+
+
+def file_is_unchanged(record):
+    """
+    True if the file of a `file_record` still has the recorded content. Size and modification time are checked
+    first; the file is only hashed if it was touched (same size, new modification time).
+    """
+    try:
+        stat = os.stat(record['path'])
+    except OSError:
+        return False
+    if stat.st_size != record['size']:
+        return False
+    if stat.st_mtime_ns == record['mtime_ns']:
+        return True
+    return file_digest(record['path']) == record['hash']
+
+
+def params_fingerprint(settings):
+    """
+    Hash (hex) of JSON serializable analysis settings, independent of key order.
+    """
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def write_json_atomic(path, content):
+    """
+    Write content as JSON to path atomically: a crash while writing leaves the previous file intact.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(content, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class BatchManifest:
+    """
+    Journal of processed dyads of a batch run, stored as JSON lines in the output folder (one entry per line, the
+    last entry of a dyad wins). Entries are appended and flushed as soon as a dyad is done, so a run that dies
+    half-way keeps the record of every finished dyad; `compact` rewrites the file (atomically) with one entry per dyad.
+
+    Parameters:
+        path (str): Path of the manifest file. An existing manifest is loaded, unreadable lines (e.g. the
+            last line of an interrupted run) are ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        # a run that died while appending can leave a partial last line; the next entry must start on a new line
+        self._needs_newline = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._needs_newline = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict) and entry.get('version') == MANIFEST_VERSION and 'dyad' in entry:
+                        self._entries[entry['dyad']] = entry
+
+    def get(self, dyad):
+        """Latest entry of a dyad, or None."""
+        return self._entries.get(dyad)
+
+    def record(self, dyad, **values):
+        """Add (append and flush) the entry of a dyad."""
+        entry = {'version': MANIFEST_VERSION, 'dyad': dyad, **values}
+        self._entries[dyad] = entry
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(('\n' if self._needs_newline else '') + json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._needs_newline = False
+
+    def compact(self):
+        """Rewrite the manifest with one entry per dyad."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._needs_newline = False
@@ -1,5 +1,7 @@
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.gridspec as gridspec
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 
 
@@ -8,12 +10,15 @@ SCALING_PARAMS = {
     'DPI': 100,
 }
 
+# figures are plain Figure objects, never registered with pyplot: they are drawn by the canvas they are embedded in
+# (GUI) or rendered with Agg (`save_figure_to_png`), so they can be built on any thread (e.g. batch runs on a
+# background thread next to the Tk main loop)
 
 
 def plot_init(is_retina):
     # rcParams — font/line sizes depend on display type, not on window size
     if is_retina:
-        plt.rcParams.update({
+        matplotlib.rcParams.update({
             'font.size': 6,
             'axes.titlesize': 4,
             'axes.labelsize': 4,
@@ -22,7 +27,7 @@ def plot_init(is_retina):
             'lines.linewidth': 1,
         })
     else:
-        plt.rcParams.update({
+        matplotlib.rcParams.update({
             'font.size': 12,
             'axes.titlesize': 8,
             'axes.labelsize': 8,
@@ -31,15 +36,149 @@ def plot_init(is_retina):
             'lines.linewidth': 2,
         })
     # Default figsize — the canvas resize handler will set the real size at draw time
-    fig = plt.figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'])
+    fig = Figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'])
     return fig
 
+class WxcorrPlotView:
+    """
+    Persistent windowed cross-correlation figure: heatmap with colorbar, r_max and tau_max per window, and their
+    histograms. The layout is built once; `update` swaps the data of the existing artists (image data / extent,
+    line data, histogram heights), so redrawing for new parameters does not rebuild the figure.
+
+    Parameters:
+        fig (matplotlib.figure.Figure): Figure to draw into (default: a new figure).
+    """
+
+    def __init__(self, fig=None):
+        self.fig = fig if fig is not None else Figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
+        gs = gridspec.GridSpec(3, 1, height_ratios=[3, 1, 1], figure=self.fig)
+
+        # heatmap of correlations
+        self.ax_heatmap = self.fig.add_subplot(gs[0])
+        self.im = self.ax_heatmap.imshow(
+            np.zeros((1, 1)),
+            aspect='auto',
+            cmap='magma', # options: viridis, plasma, magma...
+            origin='lower',
+            vmin=-1,
+            vmax=1
+        )
+        self.fig.colorbar(self.im, ax=self.ax_heatmap, label='Correlation')
+        self.ax_heatmap.axhline(y=0, color='black', linestyle='dotted', linewidth=0.2)
+        self.ax_heatmap.set_xlabel('Window Start Index')
+        self.ax_heatmap.set_ylabel('Lag')
+
+        # peak correlation values over time and as histogram
+        ax1_gs_inner = gridspec.GridSpecFromSubplotSpec(1, 2, subplot_spec=gs[1], width_ratios=[6, 1], wspace=.1)
+        self.ax_r_max = self.fig.add_subplot(ax1_gs_inner[0])
+        self.line_r_max, = self.ax_r_max.plot([], [], marker='o', markersize=.8, color='black', label='peak correlation')
+        self.ax_r_max.set_ylabel('r_max')
+        self.ax_r_max.set_title('Peak (positive) correlation per window')
+        self.ax_r_max.grid()
+        self.ax_r_max_hist = self.fig.add_subplot(ax1_gs_inner[1])
+        self.hist_r_max = self.ax_r_max_hist.stairs([0], [-1, 1], fill=True, color='black')
+        self.ax_r_max_hist.set_xlim(-1, 1)
+
+        # corresponding lags over time
+        ax2_gs_inner = gridspec.GridSpecFromSubplotSpec(1, 2, subplot_spec=gs[2], width_ratios=[6, 1], wspace=.1)
+        self.ax_tau_max = self.fig.add_subplot(ax2_gs_inner[0])
+        self.line_tau_max, = self.ax_tau_max.plot([], [], marker='o', markersize=.8, color='black', label='Lag of peak')
+        self.ax_tau_max.set_ylabel('tau_max')
+        self.ax_tau_max.set_title('Lag of peak (positive) correlation per window')
+        self.ax_tau_max.grid()
+        self.ax_tau_max_hist = self.fig.add_subplot(ax2_gs_inner[1])
+        self.hist_tau_max = self.ax_tau_max_hist.stairs([0], [-1, 1], fill=True, color='black')
+
+        # text around the axes + figure size of the last constrained layout (see prepare_layout)
+        self._layout_signature = None
+
+    def update(self, wxc_data, max_lag, step_size, show_sigmoid_correlations=False, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None):
+        """
+        Show new windowed cross-correlation data. Does not draw; call prepare_layout() and draw_idle() on the canvas afterwards.
+
+        Args:
+            wxc_data (WxcorrResult): Output from `windowed_cross_correlation`.
+            max_lag (int): Maximum lag used in the computation.
+            step_size (int): Step size for the sliding window.
+            show_sigmoid_correlations (bool): Show sigmoid scaled correlation values.
+            use_lag_filter (bool): Whether the lag filter was applied (limits the heatmap's lag axis).
+            lag_filter_min (int): Minimum lag of the filter.
+            lag_filter_max (int): Maximum lag of the filter.
+        """
+        window_start_indices = wxc_data.start_idx
+        r_max_values = wxc_data.r_max_sigmoid if show_sigmoid_correlations else wxc_data.r_max
+        tau_max_values = wxc_data.tau_max_sigmoid if show_sigmoid_correlations else wxc_data.tau_max
+        correlation_values = wxc_data.correlations_sigmoid if show_sigmoid_correlations else wxc_data.correlations
+
+        # get lag range (filtered or unfiltered) for y-axis
+        _min_lag = -max_lag
+        _max_lag = max_lag
+        if use_lag_filter and not (lag_filter_min is None or lag_filter_max is None):
+            _min_lag = min(lag_filter_min, lag_filter_max)
+            _max_lag = max(lag_filter_min, lag_filter_max)
+
+        # heatmap
+        extent = [0, len(wxc_data) * step_size, _min_lag, _max_lag]
+        self.im.set_data(correlation_values.T)
+        self.im.set_extent(extent)
+        self.ax_heatmap.set_xlim(extent[0], extent[1])
+        self.ax_heatmap.set_ylim(extent[2], extent[3])
+        self.ax_heatmap.set_title(f"Correlation Heatmap{' (sigmoid-scaled)' if show_sigmoid_correlations else ''}")
+
+        # peak values / lags over time
+        for ax, line, values in (
+            (self.ax_r_max, self.line_r_max, r_max_values),
+            (self.ax_tau_max, self.line_tau_max, tau_max_values),
+        ):
+            line.set_data(window_start_indices, values)
+            ax.relim()
+            ax.autoscale_view()
+
+        # histograms
+        self._update_histogram(self.ax_r_max_hist, self.hist_r_max, r_max_values, min(len(r_max_values)//3, 40))
+        self._update_histogram(self.ax_tau_max_hist, self.hist_tau_max, tau_max_values, min(len(tau_max_values)//4, max_lag))
+        self.ax_tau_max_hist.set_xlim(-max_lag, max_lag)
+
+    def prepare_layout(self):
+        """
+        Call before drawing. Constrained layout is the bulk of a redraw, and its result only depends on the figure
+        size and the extent of the text around the axes (tick labels, axis labels, titles). The layout is computed
+        here, only if these changed since the last layout, and the draw itself keeps the axes' positions. Embedding
+        canvases call it again when they are resized (see `corr_plot.setup`).
+        """
+        if self._text_signature() == self._layout_signature:
+            return
+        self.fig.set_layout_engine('constrained')
+        self.fig.get_layout_engine().execute(self.fig)
+        self.fig.set_layout_engine('none')
+        # tick locations depend on the axes' sizes, so record the text as laid out
+        self._layout_signature = self._text_signature()
+
+    def _text_signature(self):
+        signature = [tuple(self.fig.get_size_inches())]
+        for ax in self.fig.axes:
+            signature.append(ax.get_title())
+            for axis in (ax.xaxis, ax.yaxis):
+                signature.append(axis.get_label_text())
+                # the widest tick label sets the margin (character count, digits are equally wide)
+                labels = axis.major.formatter.format_ticks(axis.get_majorticklocs())
+                signature.append(max(map(len, labels), default=0))
+        return signature
+
+    @staticmethod
+    def _update_histogram(ax, hist, values, num_bins):
+        values = np.asarray(values, dtype=float)
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=max(num_bins, 1))
+        hist.set_data(counts, edges)
+        ax.set_ylim(0, max(counts.max(), 1) * 1.05)
+
 def plot_windowed_cross_correlation(wxc_data, window_size, max_lag, step_size, signal_a, signal_b, show_sigmoid_correlations=False, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None):
     """
     Create and return a figure plotting the wxc_data of the windowed cross-correlation.
+    Use `WxcorrPlotView` to redraw the same figure for changing data.
 
     Args:
-        wxc_data (list of dict): Output from `windowed_cross_correlation`.
+        wxc_data (WxcorrResult): Output from `windowed_cross_correlation`.
         max_lag (int): Maximum lag used in the computation.
         step_size (int): Step size for the sliding window.
         signal_a (array-like): First input signal.
@@ -48,67 +187,9 @@ def plot_windowed_cross_correlation(wxc_data, window_size, max_lag, step_size, s
     Returns:
         matplotlib.figure.Figure: The figure containing the plots.
     """
-    # Extract values for plotting
-    window_start_indices = [res['start_idx'] for res in wxc_data]
-    r_max_values = [res['r_max_sigmoid' if show_sigmoid_correlations else 'r_max'] for res in wxc_data]
-    tau_max_values = [res['tau_max_sigmoid' if show_sigmoid_correlations else 'tau_max'] for res in wxc_data]
-    correlation_values = [res['correlations_sigmoid' if show_sigmoid_correlations else 'correlations'] for res in wxc_data]
-
-    # Initialize plot layout
-    fig = plt.figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
-    gs = gridspec.GridSpec(3, 1, height_ratios=[3, 1, 1], figure=fig)
-
-    # get lag range (filtered or unfiltered) for y-axis
-    _min_lag = -max_lag
-    _max_lag = max_lag
-    if use_lag_filter and not (lag_filter_min is None or lag_filter_max is None):
-        _min_lag = min(lag_filter_min, lag_filter_max)
-        _max_lag = max(lag_filter_min, lag_filter_max)
-
-    # Create a heatmap of correlations
-    ax0 = fig.add_subplot(gs[0])
-    heatmap_data = np.array(correlation_values)
-    im = ax0.imshow(
-        heatmap_data.T,
-        aspect='auto',
-        cmap='magma', # options: viridis, plasma, magma...
-        extent=[0, len(wxc_data) * step_size, _min_lag, _max_lag],
-        origin='lower',
-        vmin=-1,
-        vmax=1
-    )
-    fig.colorbar(im, ax=ax0, label='Correlation')
-    ax0.axhline(y=0, color='black', linestyle='dotted', linewidth=0.2)
-    ax0.set_xlabel('Window Start Index')
-    ax0.set_ylabel('Lag')
-    ax0.set_title(f"Correlation Heatmap{' (sigmoid-scaled)' if show_sigmoid_correlations else ''}")
-    
-    # Plot peak correlation values over time and as histogram
-    ax1_gs_inner = gridspec.GridSpecFromSubplotSpec(1, 2, subplot_spec=gs[1], width_ratios=[6, 1], wspace=.1)
-    ax1 = fig.add_subplot(ax1_gs_inner[0])
-    ax1.plot(window_start_indices, r_max_values, marker='o', markersize=.8, color='black', label='peak correlation')
-    ax1.set_ylabel('r_max')
-    ax1.set_title('Peak (positive) correlation per window')
-    ax1.grid()
-    num_bins_r_max = min(len(r_max_values)//3, 40)
-    ax1_hist = fig.add_subplot(ax1_gs_inner[1])
-    ax1_hist.hist(r_max_values, bins=num_bins_r_max, orientation='vertical', color='black', alpha=1)
-    ax1_hist.set_xlim(-1, 1)
-
-    # Plot corresponding lags over time
-    ax2_gs_inner = gridspec.GridSpecFromSubplotSpec(1, 2, subplot_spec=gs[2], width_ratios=[6, 1], wspace=.1)
-    ax2 = fig.add_subplot(ax2_gs_inner[0])
-    ax2.plot(window_start_indices, tau_max_values, marker='o', markersize=.8, color='black', label='Lag of peak')
-    ax2.set_ylabel('tau_max')
-    ax2.set_title('Lag of peak (positive) correlation per window')
-    ax2.grid()
-    num_bins_tau_max = min(len(tau_max_values)//4, max_lag)
-    ax2_hist = fig.add_subplot(ax2_gs_inner[1])
-    ax2_hist.hist(tau_max_values, bins=num_bins_tau_max, orientation='vertical', color='black', alpha=1)
-    ax2_hist.set_xlim(-max_lag, max_lag)
-
-    # Return the figure
-    return fig
+    view = WxcorrPlotView()
+    view.update(wxc_data, max_lag, step_size, show_sigmoid_correlations=show_sigmoid_correlations, use_lag_filter=use_lag_filter, lag_filter_min=lag_filter_min, lag_filter_max=lag_filter_max)
+    return view.fig
 
 def plot_standard_cross_correlation(sxc_data, signal_a, signal_b):
     """
@@ -126,7 +207,7 @@ def plot_standard_cross_correlation(sxc_data, signal_a, signal_b):
     lags = sxc_data['lags']
 
     # Initialize plot layout
-    fig = plt.figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
+    fig = Figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
     gs = gridspec.GridSpec(3, 1, height_ratios=[3, 1, 1], figure=fig)
 
     # Plot cross-correlation
@@ -154,6 +235,42 @@ def plot_standard_cross_correlation(sxc_data, signal_a, signal_b):
     # Return figure object
     return fig
 
+def plot_multiscale_cross_correlation(scalogram, max_lag):
+    """
+    Create and return an overview figure of a multi-scale windowed cross-correlation: peak correlation and its lag
+    per window size (y-axis) and window center (x-axis).
+
+    Args:
+        scalogram (dict): Output from `multiscale_windowed_cross_correlation`.
+        max_lag (int): Maximum lag used in the computation (color range of the lag map).
+    Returns:
+        matplotlib.figure.Figure: The figure containing the plots.
+    """
+    center_idx = scalogram['center_idx']
+    window_sizes = scalogram['window_sizes']
+
+    # Initialize plot layout
+    fig = Figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
+    gs = gridspec.GridSpec(2, 1, figure=fig)
+
+    # Peak correlation per window size and center (window sizes may be unevenly spaced, hence pcolormesh)
+    ax0 = fig.add_subplot(gs[0])
+    mesh = ax0.pcolormesh(center_idx, window_sizes, scalogram['r_max'], shading='nearest', cmap='magma', vmin=-1, vmax=1)
+    fig.colorbar(mesh, ax=ax0, label='r_max')
+    ax0.set_ylabel('Window Size')
+    ax0.set_title('Peak correlation per window size')
+
+    # Lag of the peak correlation per window size and center
+    ax1 = fig.add_subplot(gs[1], sharex=ax0)
+    mesh = ax1.pcolormesh(center_idx, window_sizes, scalogram['tau_max'], shading='nearest', cmap='coolwarm', vmin=-max_lag, vmax=max_lag)
+    fig.colorbar(mesh, ax=ax1, label='tau_max')
+    ax1.set_xlabel('Window Center Index')
+    ax1.set_ylabel('Window Size')
+    ax1.set_title('Lag of peak correlation per window size')
+
+    # Return the figure
+    return fig
+
 def make_plot_titles_preproc(dyad_folder, selected_sheet, filename_a, filename_b, column_a, column_b, is_resampled):
     """
     Generate plot titles for preprocessed signal visualization.
@@ -185,7 +302,7 @@ def plot_preprocessed_signals(signal_a, signal_b, plot_titles):
         matplotlib.figure.Figure: The figure containing the plot.
     """
     # Initialize plot layout
-    fig = plt.figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
+    fig = Figure(figsize=SCALING_PARAMS['FIGSIZE'], dpi=SCALING_PARAMS['DPI'], layout='constrained')
     gs = gridspec.GridSpec(2, 1, figure=fig)
     
     # Plot signal_a
@@ -217,7 +334,7 @@ def update_wxcorr_plots(params):
             - "window_size" (int): The size of the window for cross-correlation.
             - "step_size" (int): The step size for moving the window.
             - "max_lag" (int): The maximum lag to consider in the cross-correlation.
-            - "windowed_xcorr_data" (array-like): The precomputed windowed cross-correlation data.
+            - "windowed_xcorr_data" (WxcorrResult): The precomputed windowed cross-correlation data.
             - "use_lag_filter" (bool): Apply lag filter to limit lag range.
             - "lag_filter_min" (int): Minimum lag for filter (inclusive).
             - "lag_filter_max" (int): Maximum lag for filter (inclusive).
@@ -288,11 +405,11 @@ def update_preproc_plots(params):
 
 def save_figure_to_png(fig, filepath):
     """
-    Save a matplotlib figure to a PNG file.
+    Save a matplotlib figure to a PNG file (rendered with Agg, no pyplot involved).
     
     Args:
         fig (matplotlib.figure.Figure): The figure object to save.
         filepath (str): The full path where the PNG file should be saved.
     """
-    fig.savefig(filepath, dpi=300, bbox_inches='tight')
-    #plt.close(fig)
\ No newline at end of file
+    FigureCanvasAgg(fig)
+    fig.savefig(filepath, dpi=300, bbox_inches='tight')
\ No newline at end of file
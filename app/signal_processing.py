@@ -63,18 +63,16 @@ def resample_ibi(ibi_ms, t_offset_ms=0, target_sampling_rate_hz=5, scale_output=
 
 
 
-def preprocess_dyad(signal_a, signal_b, signal_type, remove_invalid_samples=False):
+def preprocess_signal(signal, signal_type, remove_invalid_samples=False):
     """
-    Preprocesses two signals (dyad) by filtering invalid values, resampling, and aligning their lengths.
+    Preprocesses a single signal by filtering invalid values and resampling (event-based signals).
+    This is the per-signal part of `preprocess_dyad`; its output only depends on the signal, so it can be reused for every pair the signal is part of.
     Parameters:
-        signal_a (list or array-like): The first signal to preprocess.
-        signal_b (list or array-like): The second signal to preprocess.
-        signal_type (str): The type of the signals, must be either 'event-based' or 'fixed-rate'.
-        t_offset_ms_a (int, optional): The time offset in milliseconds for signal_a. Defaults to 0.
-        t_offset_ms_b (int, optional): The time offset in milliseconds for signal_b. Defaults to 0.
-        remove_invalid_samples (bool, optional): If True, invalid samples will be removed from the signals. Defaults to False.
+        signal (list or array-like): The signal to preprocess.
+        signal_type (str): The type of the signal, must be either 'event-based' or 'fixed-rate'.
+        remove_invalid_samples (bool, optional): If True, invalid samples will be removed from the signal. Defaults to False.
     Returns:
-        tuple: A tuple containing the preprocessed signal_a and signal_b.
+        list or numpy.ndarray: The preprocessed signal.
     Raises:
         Exception: If the signal_type is not 'event-based' or 'fixed-rate'.
     """
@@ -83,16 +81,24 @@ def preprocess_dyad(signal_a, signal_b, signal_type, remove_invalid_samples=Fals
 
     # optionally remove invalid values
     if remove_invalid_samples:
-        signal_a = _remove_invalid_IBI(signal_a) if signal_type == 'event-based' else _remove_invalid_EDA(signal_a)
-        signal_b = _remove_invalid_IBI(signal_b) if signal_type == 'event-based' else _remove_invalid_EDA(signal_b)
+        signal = _remove_invalid_IBI(signal) if signal_type == 'event-based' else _remove_invalid_EDA(signal)
 
     # resample IBI (exclude first and last sample, shift by first sample)
     if signal_type == 'event-based':
-        t_offset_ms_a = signal_a[0]
-        t_offset_ms_b = signal_b[0]
-        signal_a = resample_ibi(signal_a[1:-1], t_offset_ms=t_offset_ms_a, target_sampling_rate_hz=5)
-        signal_b = resample_ibi(signal_b[1:-1], t_offset_ms=t_offset_ms_b, target_sampling_rate_hz=5)
+        t_offset_ms = signal[0]
+        signal = resample_ibi(signal[1:-1], t_offset_ms=t_offset_ms, target_sampling_rate_hz=5)
 
+    return signal
+
+def align_signals(signal_a, signal_b):
+    """
+    Truncates two preprocessed signals to a common length and z-scores them (the pairwise part of `preprocess_dyad`).
+    Parameters:
+        signal_a (list or array-like): The first preprocessed signal.
+        signal_b (list or array-like): The second preprocessed signal.
+    Returns:
+        tuple: A tuple containing signal_a, signal_b, signal_a_z_scored, signal_b_z_scored.
+    """
     # fix lengths
     min_length = min(len(signal_a), len(signal_b))
     signal_a = signal_a[:min_length]
@@ -102,4 +108,21 @@ def preprocess_dyad(signal_a, signal_b, signal_type, remove_invalid_samples=Fals
     signal_a_z_scored = standardize(signal_a)
     signal_b_z_scored = standardize(signal_b)
 
-    return signal_a, signal_b, signal_a_z_scored, signal_b_z_scored 
\ No newline at end of file
+    return signal_a, signal_b, signal_a_z_scored, signal_b_z_scored
+
+def preprocess_dyad(signal_a, signal_b, signal_type, remove_invalid_samples=False):
+    """
+    Preprocesses two signals (dyad) by filtering invalid values, resampling, and aligning their lengths.
+    Parameters:
+        signal_a (list or array-like): The first signal to preprocess.
+        signal_b (list or array-like): The second signal to preprocess.
+        signal_type (str): The type of the signals, must be either 'event-based' or 'fixed-rate'.
+        remove_invalid_samples (bool, optional): If True, invalid samples will be removed from the signals. Defaults to False.
+    Returns:
+        tuple: A tuple containing the preprocessed signal_a and signal_b and their z-scored versions.
+    Raises:
+        Exception: If the signal_type is not 'event-based' or 'fixed-rate'.
+    """
+    signal_a = preprocess_signal(signal_a, signal_type, remove_invalid_samples)
+    signal_b = preprocess_signal(signal_b, signal_type, remove_invalid_samples)
+    return align_signals(signal_a, signal_b)
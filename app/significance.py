@@ -0,0 +1,55 @@
+import numpy as np
+
+# memory budget of one batch of permuted samples in `permutation_test`
+PERMUTATION_BATCH_MAX_BYTES = 64 * 1024 ** 2
+
+def permutation_test(sample_a, sample_b, n_permutations=5000, seed=None):
+    """
+    Two-sided permutation test for the difference of the means of two samples (e.g. average correlations of
+    surrogate pairs vs. real dyads).
+
+    The group labels are permuted n_permutations times. Permutations are drawn as batches of shuffled rows
+    (one row per permutation) that fit in PERMUTATION_BATCH_MAX_BYTES, so thousands of permutations take a few
+    array operations.
+
+    Parameters:
+        sample_a (array-like): First sample.
+        sample_b (array-like): Second sample.
+        n_permutations (int): Number of label permutations.
+        seed (int or np.random.Generator): Seed or generator for reproducible permutations.
+
+    Returns:
+        dict: A dictionary containing:
+            - 'mean_difference' (float): Observed mean(sample_a) - mean(sample_b).
+            - 'p_value' (float): Share of permutations with an absolute mean difference at least as large as the
+              observed one, (count + 1) / (n_permutations + 1).
+            - 'n_permutations' (int): Number of permutations.
+    """
+    sample_a = np.asarray(sample_a, dtype=float)
+    sample_b = np.asarray(sample_b, dtype=float)
+    n_a, n_b = len(sample_a), len(sample_b)
+    if n_a == 0 or n_b == 0:
+        raise ValueError("Both samples must contain at least one value.")
+    if n_permutations < 1:
+        raise ValueError("n_permutations must be ≥ 1.")
+
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate((sample_a, sample_b))
+    total = np.sum(pooled)
+    observed = np.mean(sample_a) - np.mean(sample_b)
+
+    # mean difference of a permutation from the sum of its first n_a values: sum_a / n_a - (total - sum_a) / n_b
+    batch_size = max(1, PERMUTATION_BATCH_MAX_BYTES // (8 * len(pooled)))
+    n_extreme = 0
+    for first in range(0, n_permutations, batch_size):
+        permuted = rng.permuted(np.broadcast_to(pooled, (min(batch_size, n_permutations - first), len(pooled))), axis=1)
+        sums_a = np.sum(permuted[:, :n_a], axis=1)
+        differences = sums_a / n_a - (total - sums_a) / n_b
+        # tolerance keeps permutations equal to the observed split from being missed due to rounding
+        n_extreme += np.count_nonzero(np.abs(differences) >= np.abs(observed) - 1e-12)
+
+    return {
+        'mean_difference': float(observed),
+        'p_value': float((n_extreme + 1) / (n_permutations + 1)),
+        'n_permutations': n_permutations,
+    }
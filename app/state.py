@@ -12,6 +12,18 @@ INIT_MAX_LAG     = 30    # 30 := 6s
 INIT_STEP_SIZE   = 75    # 75 := 15s
 INIT_MAX_LAG_SXC = 150
 
+WXCORR_N_JOBS = -1       # threads for windowed xcorr in the GUI (-1 := one per CPU core)
+BATCH_N_WORKERS = -1     # worker processes for batch processing (-1 := one per CPU core, 1 := sequential)
+RP_N_PERMUTATIONS = 5000 # label permutations of the random pair permutation test
+
+BATCH_SURROGATE_COUNT  = 0                 # within-dyad surrogates per dyad in batch processing (0 := no surrogate test)
+BATCH_SURROGATE_METHOD = 'circular_shift'  # 'circular_shift' or 'phase_randomization'
+
+RESULTS_CACHE_MAX_ENTRIES = 32                 # correlation results kept for instant parameter toggling
+RESULTS_CACHE_MAX_BYTES   = 512 * 1024 ** 2    # memory cap of the results cache (LRU eviction)
+
+PARAMS_DEBOUNCE_MS = 250  # idle time after the last parameter change before the correlation is recomputed
+
 # ---------------------
 # SCREEN METRICS
 # (populated by init_state before any tk.Vars are used)
@@ -21,6 +33,13 @@ screen_width  = None
 screen_height = None
 RETINA        = None
 
+# root window, schedules debounced updates (set by init_state)
+_root           = None
+_pending_update = None
+
+# called as soon as a debounced update is requested (see PARAMS_CHANGED)
+_params_changed_hooks = []
+
 # ---------------------
 # GLOBAL STATE & EVENTS
 # ---------------------
@@ -77,6 +96,13 @@ val_rp_n                             = None
 val_random_pair_input_folder         = None
 val_random_pair_output_file          = None
 val_random_pair_is_ready             = None
+val_checkbox_rp_exhaustive           = None
+val_batch_is_running                 = None
+val_batch_progress                   = None
+val_batch_progress_text              = None
+val_random_pair_is_running           = None
+val_random_pair_progress             = None
+val_random_pair_progress_text        = None
 
 # data containers
 dat_plot_data         = {}
@@ -85,15 +111,44 @@ dat_physiological_data = {}
 dat_correlation_data  = {}
 
 
-def PARAMS_CHANGED():
+def PARAMS_CHANGED(immediate=False):
+    """
+    Request a correlation / plot update. Updates are debounced: the update runs PARAMS_DEBOUNCE_MS after the
+    last request, so a burst of changes (e.g. typing "120" into an entry, one validation per keystroke)
+    coalesces into one recompute with the latest parameters. immediate=True runs a pending update right away
+    (e.g. on tab changes or display-only settings, which need no recompute).
+
+    The hooks registered with register_params_changed_hook run right away on a debounced request, so work for the
+    old parameters (e.g. a computation in flight) is dropped before it can deliver results during the delay.
+    """
+    global _pending_update
+    if _pending_update is not None:
+        _root.after_cancel(_pending_update)
+        _pending_update = None
+    if immediate:
+        _trigger_update()
+        return
+    for hook in _params_changed_hooks:
+        hook()
+    _pending_update = _root.after(PARAMS_DEBOUNCE_MS, _trigger_update)
+
+
+def register_params_changed_hook(hook):
+    _params_changed_hooks.append(hook)
+
+
+def _trigger_update():
+    global _pending_update
+    _pending_update = None
     val_UPDATE_COUNT.set(val_UPDATE_COUNT.get() + 1)
 
 
-def init_state(dpi, sw, sh, retina):
+def init_state(root, dpi, sw, sh, retina):
     """
     Must be called once after tk.CTk() is created but before any widgets are built.
     Initialises all module-level tk.Vars and data containers.
     """
+    global _root
     global screen_dpi, screen_width, screen_height, RETINA
     global val_CORRELATION_SETTINGS_VALID, val_CORRELATION_SETTINGS_VALID_SXC
     global val_WINDOW_SIZE_VALID, val_STEP_SIZE_VALID, val_MAX_LAG_VALID
@@ -112,8 +167,12 @@ def init_state(dpi, sw, sh, retina):
     global val_checkbox_data_has_headers, val_batch_input_folder, val_batch_output_folder
     global val_batch_processing_is_ready, val_rp_n_input, val_rp_n
     global val_random_pair_input_folder, val_random_pair_output_file, val_random_pair_is_ready
+    global val_checkbox_rp_exhaustive
+    global val_batch_is_running, val_batch_progress, val_batch_progress_text
+    global val_random_pair_is_running, val_random_pair_progress, val_random_pair_progress_text
     global dat_plot_data, dat_workbook_data, dat_physiological_data, dat_correlation_data
 
+    _root         = root
     screen_dpi    = dpi
     screen_width  = sw
     screen_height = sh
@@ -171,6 +230,13 @@ def init_state(dpi, sw, sh, retina):
     val_random_pair_input_folder           = tk.StringVar(value='')
     val_random_pair_output_file            = tk.StringVar(value='')
     val_random_pair_is_ready               = tk.BooleanVar(value=False)
+    val_checkbox_rp_exhaustive             = tk.BooleanVar(value=False)
+    val_batch_is_running                   = tk.BooleanVar(value=False)
+    val_batch_progress                     = tk.DoubleVar(value=0.)
+    val_batch_progress_text                = tk.StringVar(value='')
+    val_random_pair_is_running             = tk.BooleanVar(value=False)
+    val_random_pair_progress               = tk.DoubleVar(value=0.)
+    val_random_pair_progress_text          = tk.StringVar(value='')
 
     # data containers
     dat_plot_data['fig'] = plot_init(is_retina=retina)
@@ -194,7 +260,9 @@ def init_state(dpi, sw, sh, retina):
         'signal_a_std': [],
         'signal_b_std': [],
         'raw_signal_a': [],
-        'raw_signal_b': []
+        'raw_signal_b': [],
+        'fingerprint': None,       # cache.fingerprint of (signal_a, signal_b), set by preprocessing
+        'fingerprint_std': None,   # cache.fingerprint of (signal_a_std, signal_b_std)
     })
 
     dat_correlation_data.update({
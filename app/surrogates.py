@@ -0,0 +1,142 @@
+import numpy as np
+from scipy.fft import rfft, irfft
+from cross_correlation import BATCH_MAX_BYTES, windowed_cross_correlation_stats, standard_cross_correlation_stats
+
+# surrogate generators (see `make_surrogates`)
+SURROGATE_METHODS = ('circular_shift', 'phase_randomization')
+
+def circular_shift_surrogates(signal, n_surrogates, min_shift=None, seed=None):
+    """
+    Circularly shifted copies of a signal, one per row. Shifts are drawn uniformly from [min_shift, N - min_shift],
+    so no surrogate stays close to the original alignment.
+
+    Parameters:
+        signal (array-like): 1D signal of N samples.
+        n_surrogates (int): Number of surrogates.
+        min_shift (int): Minimum shift in samples (default: N // 10).
+        seed (int or np.random.Generator): Seed or generator for reproducible surrogates.
+
+    Returns:
+        np.ndarray: Surrogates, shape (n_surrogates, N).
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = len(signal)
+    if min_shift is None:
+        min_shift = n // 10
+    min_shift = max(1, min_shift)
+    if n - 2 * min_shift < 0:
+        raise ValueError(f"min_shift ({min_shift}) is too large for a signal of {n} samples.")
+
+    rng = np.random.default_rng(seed)
+    shifts = rng.integers(min_shift, n - min_shift, size=n_surrogates, endpoint=True)
+    # all shifts as one gather: surrogate[i, t] = signal[(t - shift_i) mod N]
+    return signal[(np.arange(n) - shifts[:, np.newaxis]) % n]
+
+def phase_randomized_surrogates(signal, n_surrogates, seed=None):
+    """
+    Phase-randomized copies of a signal, one per row: same amplitude spectrum (and hence autocorrelation) as the
+    signal, random Fourier phases. All surrogates are generated with one batched irfft.
+
+    Parameters:
+        signal (array-like): 1D signal of N samples.
+        n_surrogates (int): Number of surrogates.
+        seed (int or np.random.Generator): Seed or generator for reproducible surrogates.
+
+    Returns:
+        np.ndarray: Surrogates, shape (n_surrogates, N).
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = len(signal)
+
+    rng = np.random.default_rng(seed)
+    spectrum = rfft(signal)
+    phases = rng.uniform(0, 2 * np.pi, size=(n_surrogates, len(spectrum)))
+    surrogate_spectra = np.abs(spectrum) * np.exp(1j * phases)
+    # the mean (and the Nyquist component for even N) must stay real, they are kept as they are
+    surrogate_spectra[:, 0] = spectrum[0]
+    if n % 2 == 0:
+        surrogate_spectra[:, -1] = spectrum[-1]
+    return irfft(surrogate_spectra, n)
+
+def make_surrogates(signal, n_surrogates, method='circular_shift', seed=None):
+    """
+    Surrogates of a signal generated with `method` (one of SURROGATE_METHODS), shape (n_surrogates, N).
+    """
+    if method == 'circular_shift':
+        return circular_shift_surrogates(signal, n_surrogates, seed=seed)
+    if method == 'phase_randomization':
+        return phase_randomized_surrogates(signal, n_surrogates, seed=seed)
+    raise ValueError(f"Unknown surrogate method '{method}', must be one of {SURROGATE_METHODS}.")
+
+def surrogate_test(signal_a, signal_b, n_surrogates=1000, method='circular_shift', windowed=True, window_size=None, step_size=None, max_lag=None, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False, seed=None, n_jobs=1):
+    """
+    Within-dyad surrogate test: null distributions of the mean correlation and the (mean) peak correlation r_max
+    of signal_a with surrogates of signal_b, and the p-values of the observed pair.
+
+    Surrogates are generated and correlated in chunks of many surrogates at a time (batched rfft, batched
+    multi-pair correlation kernels of `cross_correlation`), there are no loops per surrogate.
+
+    Parameters:
+        signal_a (array-like): First signal of the dyad (preprocessed, same length as signal_b).
+        signal_b (array-like): Second signal of the dyad, the surrogates are made from this signal.
+        n_surrogates (int): Number of surrogates.
+        method (str): Surrogate generator, one of SURROGATE_METHODS.
+        windowed (bool): Windowed (window_size, step_size, max_lag, use_lag_filter / lag_filter_min / lag_filter_max,
+            average_windows) or standard (max_lag) cross-correlation, see `windowed_cross_correlation_stats` /
+            `standard_cross_correlation_stats`.
+        absolute (bool): Calculate abs of correlation values.
+        seed (int or np.random.Generator): Seed or generator for reproducible surrogates.
+        n_jobs (int): Number of threads of the correlation kernels (-1: one per CPU core).
+
+    Returns:
+        dict: A dictionary containing:
+            - 'method' (str), 'n_surrogates' (int): Surrogate settings.
+            - 'mean_correlation' (float), 'r_max' (float): Observed mean correlation and (mean) peak correlation.
+            - 'null_mean_correlation' (np.ndarray): Mean correlation of each surrogate, shape (n_surrogates,).
+            - 'null_r_max' (np.ndarray): (Mean) peak correlation of each surrogate, shape (n_surrogates,).
+            - 'p_value_mean_correlation' (float): Two-sided p-value of the observed mean correlation (|null| ≥ |observed|).
+            - 'p_value_r_max' (float): One-sided p-value of the observed peak correlation (null ≥ observed).
+    """
+    signal_a = np.asarray(signal_a, dtype=float)
+    signal_b = np.asarray(signal_b, dtype=float)
+    if len(signal_a) != len(signal_b):
+        raise ValueError("signal_a and signal_b must have the same length.")
+    if method not in SURROGATE_METHODS:
+        raise ValueError(f"Unknown surrogate method '{method}', must be one of {SURROGATE_METHODS}.")
+
+    rng = np.random.default_rng(seed)
+    n = len(signal_a)
+
+    def correlate(signals_b):
+        # signal_a is broadcast against all rows (no copies)
+        signals_a = np.broadcast_to(signal_a, signals_b.shape)
+        if windowed:
+            stats = windowed_cross_correlation_stats(
+                signals_a, signals_b, window_size=window_size, step_size=step_size, max_lag=max_lag,
+                use_lag_filter=use_lag_filter, lag_filter_min=lag_filter_min, lag_filter_max=lag_filter_max, absolute=absolute, average_windows=average_windows, n_jobs=n_jobs,
+            )
+            return stats['mean_correlation'], stats['mean_r_max']
+        stats = standard_cross_correlation_stats(signals_a, signals_b, max_lag=max_lag, absolute=absolute, n_jobs=n_jobs)
+        return stats['mean_correlation'], stats['r_max']
+
+    observed_mean_correlation, observed_r_max = (v[0] for v in correlate(signal_b[np.newaxis, :]))
+
+    # surrogates per chunk: the surrogate matrix and its spectrum fit in BATCH_MAX_BYTES
+    surrogates_per_chunk = max(1, BATCH_MAX_BYTES // (8 * 3 * n))
+    null_mean_correlation = np.empty(n_surrogates)
+    null_r_max = np.empty(n_surrogates)
+    for first in range(0, n_surrogates, surrogates_per_chunk):
+        last = min(first + surrogates_per_chunk, n_surrogates)
+        surrogates = make_surrogates(signal_b, last - first, method, seed=rng)
+        null_mean_correlation[first:last], null_r_max[first:last] = correlate(surrogates)
+
+    return {
+        'method': method,
+        'n_surrogates': n_surrogates,
+        'mean_correlation': float(observed_mean_correlation),
+        'r_max': float(observed_r_max),
+        'null_mean_correlation': null_mean_correlation,
+        'null_r_max': null_r_max,
+        'p_value_mean_correlation': float((np.count_nonzero(np.abs(null_mean_correlation) >= abs(observed_mean_correlation)) + 1) / (n_surrogates + 1)),
+        'p_value_r_max': float((np.count_nonzero(null_r_max >= observed_r_max) + 1) / (n_surrogates + 1)),
+    }
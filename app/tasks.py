@@ -0,0 +1,138 @@
+import queue
+import threading
+
+# interval (ms) at which the Tk main loop polls running background tasks for progress and results
+POLL_INTERVAL_MS = 50
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a task's work function (see `BackgroundTask.check_cancelled`) to stop a cancelled task early. Long
+    computations that take the task's cancel_event raise it themselves (e.g. `windowed_cross_correlation`).
+    """
+
+
+class BackgroundTask:
+    """
+    Runs work(task) on a daemon thread and hands its result back to the Tk main loop.
+
+    Tk widgets and tk.Vars must only be touched from the main loop, so the worker thread never calls back directly:
+    progress and the result are put on a queue, which the main loop polls with widget.after(). on_progress, on_done,
+    on_error and on_cancelled are therefore always called on the main loop. A cancelled task never calls on_done /
+    on_error, its result (if the work function runs to the end) is dropped; on_cancelled is called once its worker
+    thread has finished.
+
+    Parameters:
+        widget: Any Tk widget, used for after().
+        work (callable): work(task) -> result, runs on the worker thread. Long running work should call
+            task.report_progress(done, total) and task.check_cancelled() between steps.
+        on_done (callable): on_done(result), called with the result of work.
+        on_error (callable): on_error(exception), called if work raised (default: print the error).
+        on_progress (callable): on_progress(done, total), called for progress reports.
+        on_cancelled (callable): on_cancelled(), called when a cancelled task has stopped.
+    """
+
+    def __init__(self, widget, work, on_done, on_error=None, on_progress=None, on_cancelled=None):
+        self._widget = widget
+        self._work = work
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._on_cancelled = on_cancelled
+        self._messages = queue.Queue()
+        self.finished = False   # set once the result / error / cancellation has been delivered
+        self.cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._widget.after(POLL_INTERVAL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        """Request cancellation; the work function stops at its next check_cancelled(), its result is dropped."""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if the task was cancelled (called by the work function, on the worker thread)."""
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, done, total):
+        """Post progress to the main loop (called by the work function, on the worker thread)."""
+        self._messages.put(('progress', (done, total)))
+
+    def _run(self):
+        try:
+            self._messages.put(('done', self._work(self)))
+        except TaskCancelled:
+            self._messages.put(('cancelled', None))
+        except Exception as e:
+            self._messages.put(('error', e))
+
+    def _poll(self):
+        # a cancelled task delivers nothing; without on_cancelled there is nothing left to wait for
+        if self.cancelled and self._on_cancelled is None:
+            self.finished = True
+            return
+        # deliver all pending messages, then poll again until the task has finished
+        while True:
+            try:
+                kind, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                if self._on_progress is not None and not self.cancelled:
+                    self._on_progress(*value)
+                continue
+            self.finished = True
+            if kind == 'cancelled' or self.cancelled:
+                if self._on_cancelled is not None:
+                    self._on_cancelled()
+                return
+            if kind == 'done':
+                self._on_done(value)
+            elif self._on_error is not None:
+                self._on_error(value)
+            else:
+                print(f"! Background task failed: {type(value).__name__}: {value}")
+            return
+        self._widget.after(POLL_INTERVAL_MS, self._poll)
+
+
+class LatestTaskRunner:
+    """
+    Runs one BackgroundTask at a time, newest first: submitting a task cancels the one in flight, so only the
+    result of the most recent submission is delivered (e.g. correlation results for the latest parameters).
+    Tasks can be submitted with a key (e.g. the parameters they compute for), see `is_running`.
+
+    Parameters:
+        widget: Any Tk widget, used for after().
+    """
+
+    def __init__(self, widget):
+        self._widget = widget
+        self._task = None
+        self._key = None
+
+    def submit(self, work, on_done, on_error=None, on_progress=None, key=None):
+        """Cancel the task in flight (if any) and start work in a new task (see `BackgroundTask`)."""
+        self.cancel()
+        self._task = BackgroundTask(self._widget, work, on_done, on_error, on_progress).start()
+        self._key = key
+        return self._task
+
+    def is_running(self, key):
+        """True if the task in flight was submitted with key and has not delivered its result yet."""
+        return self._task is not None and not self._task.finished and self._key == key
+
+    def cancel(self):
+        """Cancel the task in flight (if any)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._key = None
@@ -0,0 +1,149 @@
+"""
+Loop implementations of the analyses as they were before vectorization, used as references by the equivalence tests.
+"""
+import numpy as np
+
+
+def scale_sigmoid(x):
+    return 2 * (1 / (1 + np.exp(-4*x))) - 1
+
+
+def windowed_cross_correlation(x, y, window_size, step_size, max_lag, use_lag_filter=False, lag_filter_min=None, lag_filter_max=None, absolute=False, average_windows=False):
+    """List of per-window result dicts, one window and one lag at a time."""
+    n = len(x)
+    results = []
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    _min_lag = -max_lag
+    _max_lag = max_lag
+    if use_lag_filter and not (lag_filter_min is None or lag_filter_max is None):
+        _min_lag = min(lag_filter_min, lag_filter_max)
+        _max_lag = max(lag_filter_min, lag_filter_max)
+    lag_range = range(_min_lag, _max_lag + 1)
+
+    for start in range(0, n - window_size + 1, step_size):
+        x_window = x[start:start + window_size]
+        y_window = y[start:start + window_size]
+        x_window = (x_window - np.mean(x_window)) / np.std(x_window)
+        y_window = (y_window - np.mean(y_window)) / np.std(y_window)
+
+        correlations = []
+        for lag in lag_range:
+            if lag < 0:
+                corr = np.mean(x_window[-lag:] * y_window[:lag])
+            elif lag > 0:
+                corr = np.mean(x_window[:-lag] * y_window[lag:])
+            else:
+                corr = np.mean(x_window * y_window)
+            if absolute:
+                corr = np.abs(corr)
+            correlations.append(corr)
+
+        correlations_sigmoid = scale_sigmoid(np.array(correlations))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlations_z_transformed = np.array([.5 * np.log((1 + r) / (1 - r)) for r in correlations])
+        correlations_z_transformed[np.isinf(correlations_z_transformed)] = 0
+        correlations_z_transformed[np.isnan(correlations_z_transformed)] = 0
+
+        if average_windows:
+            avg = np.mean(np.array(correlations))
+            correlations = [avg for _ in correlations]
+            avg_sigmoid = np.mean(np.array(correlations_sigmoid))
+            correlations_sigmoid = [avg_sigmoid for _ in correlations_sigmoid]
+
+        results.append({
+            'start_idx': start,
+            'center_idx': start + window_size // 2,
+            'correlations': correlations,
+            'r_max': np.max(correlations),
+            'tau_max': np.argmax(correlations) + _min_lag if not average_windows else 0,
+            'correlations_sigmoid': correlations_sigmoid,
+            'r_max_sigmoid': np.max(correlations_sigmoid),
+            'tau_max_sigmoid': np.argmax(correlations_sigmoid) + _min_lag if not average_windows else 0,
+            'avg_z_transformed_corr': np.mean(correlations_z_transformed),
+            'var_z_transformed_corr': np.var(correlations_z_transformed),
+        })
+
+    return results
+
+
+def standard_cross_correlation(x, y, max_lag, absolute=False):
+    """Correlation of the whole normalized series, one mean per lag."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    x = (x - np.mean(x)) / np.std(x)
+    y = (y - np.mean(y)) / np.std(y)
+
+    correlations = []
+    lags = []
+    for lag in range(-max_lag, max_lag + 1):
+        if lag < 0:
+            corr = np.mean(x[-lag:] * y[:lag])
+        elif lag > 0:
+            corr = np.mean(x[:-lag] * y[lag:])
+        else:
+            corr = np.mean(x * y)
+        if absolute:
+            corr = np.abs(corr)
+        correlations.append(corr)
+        lags.append(lag)
+
+    return {'corr': np.array(correlations), 'lags': np.array(lags)}
+
+
+def detrended_fluctuation_analysis(data, window_sizes, order=1):
+    """DFA with one polyfit / polyval per segment."""
+    data = np.asarray(data)
+    window_sizes = np.asarray(window_sizes, dtype=int)
+    F = np.zeros(len(window_sizes))
+    N = len(data)
+
+    for h, w in enumerate(window_sizes):
+        n = int(np.floor(N / w))
+        Nfloor = n * w
+        D = data[:Nfloor]
+        y = np.cumsum(D - np.mean(D))
+
+        bin_edges = np.arange(0, Nfloor, w)
+        vec = np.arange(1, w + 1)
+        y_hat = np.zeros_like(y)
+        for j in range(n):
+            segment = y[bin_edges[j]:bin_edges[j] + w]
+            coeff = np.polyfit(vec, segment, order)
+            y_hat[bin_edges[j]:bin_edges[j] + w] = np.polyval(coeff, vec)
+
+        F[h] = np.sqrt(np.mean((y - y_hat) ** 2))
+
+    A = np.polyfit(np.log(window_sizes), np.log(F), 1)
+    return A, F
+
+
+def make_window_sizes(data, order=1):
+    N = len(data)
+    if N < 100:
+        raise ValueError(f"Data length must be at least 100 samples for reliable DFA (got {N}).")
+    max_window = int(0.1 * N)
+    return np.logspace(np.log10(10), np.log10(max_window), num=10).astype(int)
+
+
+def dfa(data, order=1):
+    return detrended_fluctuation_analysis(data, make_window_sizes(data, order), order)
+
+
+def dfa_wxcorr(wxcorr_data, max_lag, order=1):
+    """DFA of each lag line of a list of per-window dicts, one lag at a time."""
+    if not wxcorr_data:
+        return []
+
+    correlations_per_lag = {lag: [] for lag in range(-max_lag, max_lag + 1)}
+    for window in wxcorr_data:
+        for i, correlation in enumerate(window['correlations']):
+            correlations_per_lag[i - max_lag].append(correlation)
+
+    dfa_per_lag = []
+    for lag, correlations in correlations_per_lag.items():
+        A, F = dfa(correlations, order)
+        dfa_per_lag.append({'lag': lag, 'A': A, 'F': F})
+    return dfa_per_lag
@@ -0,0 +1,364 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+import batch_processing
+import cross_correlation
+from cross_correlation import windowed_cross_correlation, standard_cross_correlation, summarize_wxcorr
+from signal_processing import align_signals
+
+PARAMS = {
+    'checkbox_windowed_xcorr':    True,
+    'window_size':                50,
+    'step_size':                  25,
+    'max_lag':                    10,
+    'max_lag_sxc':                40,
+    'standardised_signals':       True,
+    'checkbox_absolute_corr':     False,
+    'checkbox_absolute_corr_sxc': False,
+    'checkbox_average_windows':   False,
+    'use_lag_filter':             False,
+    'lag_filter_min':             -10,
+    'lag_filter_max':             10,
+    'sigmoid_correlations':       False,
+}
+
+
+def _signals(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal(rng.integers(400, 600)).cumsum() for _ in range(n)]
+
+
+def _expected(signal_a, signal_b, params):
+    _, _, a, b = align_signals(signal_a, signal_b)
+    if params['checkbox_windowed_xcorr']:
+        return summarize_wxcorr(windowed_cross_correlation(a, b, params['window_size'], params['step_size'], params['max_lag']))['mean_correlation']
+    return np.mean(standard_cross_correlation(a, b, params['max_lag_sxc'])['corr'])
+
+
+def test_pair_average_correlations_stacks_only_chunks_within_budget(monkeypatch):
+    budget = 200_000
+    monkeypatch.setattr(cross_correlation, 'BATCH_MAX_BYTES', budget)
+    stacked_bytes = []
+
+    def stack_signals(signals, width=None):
+        stacked, lengths = cross_correlation.stack_signals(signals, width)
+        stacked_bytes.append(stacked.nbytes)
+        return stacked, lengths
+
+    monkeypatch.setattr(batch_processing, 'stack_signals', stack_signals)
+
+    signals_a, signals_b = _signals(12, seed=1), _signals(12, seed=2)
+    pair_a, pair_b = np.triu_indices(12, k=1)
+    for windowed in (True, False):
+        params = {**PARAMS, 'checkbox_windowed_xcorr': windowed}
+        stacked_bytes.clear()
+        averages = batch_processing._pair_average_correlations(signals_a, signals_b, pair_a, pair_b, params)
+
+        # many chunks, each (x and y of the chunk) within the budget
+        assert len(stacked_bytes) > 2 * 4
+        assert 2 * max(stacked_bytes) <= budget
+        expected = [_expected(signals_a[i], signals_b[j], params) for i, j in zip(pair_a, pair_b)]
+        np.testing.assert_allclose(averages, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_summary_params_only_hold_settings_of_the_dyad_analysis():
+    params = {
+        **PARAMS, 'selected_sheet': 'IBI Series', 'checkbox_eb': True, 'checkbox_fr': False,
+        'workbook_data': {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': 'IBI_ms', 'workbook_a': object()},
+    }
+    settings = batch_processing._summary_params(params)
+
+    # random pair and machine settings never invalidate finished dyads
+    other = {
+        **params, 'random_pair_count': 7, 'exhaustive': True, 'n_permutations': 9,
+        'max_lag_sxc': 99, 'n_workers': 4, 'output_dir': '/elsewhere',
+    }
+    assert batch_processing._summary_params(other) == settings
+    assert batch_processing._summary_params({**params, 'max_lag': 20}) != settings
+    assert batch_processing._summary_params({**params, 'surrogate_count': 10}) != settings
+
+    # the sigmoid scaling only matters for the png plots
+    assert batch_processing._summary_params({**params, 'sigmoid_correlations': True}) != settings
+    without_plots = {**params, 'export_plots': False}
+    assert batch_processing._summary_params({**without_plots, 'sigmoid_correlations': True}) == batch_processing._summary_params(without_plots)
+
+
+def _dying_dyad_job(job, output_dir, params):
+    # a worker process killed while processing the dyad (e.g. for running out of memory)
+    if os.path.basename(job[2]) == 'dyad_crash':
+        os._exit(1)
+    return {'dyad_dir': job[2], 'error': None, 'values': {}, 'inputs': [], 'outputs': []}
+
+
+def test_batch_process_survives_a_dying_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_processing, '_run_dyad_job', _dying_dyad_job)
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    dyads = ['dyad_0', 'dyad_1', 'dyad_crash', 'dyad_2', 'dyad_3', 'dyad_4']
+    for dyad in dyads:
+        (input_dir / dyad).mkdir(parents=True)
+        for name in ('a.xlsx', 'b.xlsx'):
+            (input_dir / dyad / name).write_text('')
+    output_dir.mkdir()
+
+    params = {
+        **PARAMS, 'batch_input_folder': str(input_dir), 'output_dir': str(output_dir), 'selected_sheet': 'IBI Series',
+        'checkbox_eb': True, 'checkbox_fr': False,
+        'workbook_data': {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': 'IBI_ms'},
+        'export_plots': False, 'resume': False, 'n_workers': 3,
+    }
+    summary = batch_processing.batch_process(params)
+
+    assert [os.path.basename(dyad_dir) for dyad_dir, _ in summary['failed']] == ['dyad_crash']
+    assert 'BrokenProcessPool' in summary['failed'][0][1]
+    assert sorted(os.path.basename(dyad_dir) for dyad_dir in summary['succeeded']) == [dyad for dyad in dyads if dyad != 'dyad_crash']
+
+
+def _slowly_dying_dyad_job(job, output_dir, params):
+    # every call leaves a marker file; the worker processing dyad_0_crash dies after the other dyads are done
+    name = os.path.basename(job[2])
+    open(os.path.join(output_dir, f'{name}.{os.getpid()}.{time.monotonic_ns()}.call'), 'w').close()
+    if name == 'dyad_0_crash':
+        time.sleep(1)
+        os._exit(1)
+    return {'dyad_dir': job[2], 'error': None, 'values': {}, 'inputs': [], 'outputs': []}
+
+
+def test_batch_process_keeps_dyads_finished_before_a_worker_died(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_processing, '_run_dyad_job', _slowly_dying_dyad_job)
+    collect_dyads = batch_processing._collect_dyads
+    # the dying dyad is submitted first, the others finish while its worker is still alive
+    monkeypatch.setattr(batch_processing, '_collect_dyads', lambda folder: (sorted(collect_dyads(folder)[0], key=lambda job: job[2]), []))
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    dyads = ['dyad_0_crash'] + [f'dyad_{i}' for i in range(1, 7)]
+    for dyad in dyads:
+        (input_dir / dyad).mkdir(parents=True)
+        for name in ('a.xlsx', 'b.xlsx'):
+            (input_dir / dyad / name).write_text('')
+    output_dir.mkdir()
+
+    params = {
+        **PARAMS, 'batch_input_folder': str(input_dir), 'output_dir': str(output_dir), 'selected_sheet': 'IBI Series',
+        'checkbox_eb': True, 'checkbox_fr': False,
+        'workbook_data': {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': 'IBI_ms'},
+        'export_plots': False, 'resume': False, 'n_workers': 3,
+    }
+    summary = batch_processing.batch_process(params)
+
+    calls = [file_name.split('.')[0] for file_name in os.listdir(output_dir) if file_name.endswith('.call')]
+    assert sorted(calls) == sorted(dyads + ['dyad_0_crash'])   # the dying dyad is run again alone to identify it
+    assert sorted(os.path.basename(dyad_dir) for dyad_dir in summary['succeeded']) == dyads[1:]
+    assert [os.path.basename(dyad_dir) for dyad_dir, _ in summary['failed']] == ['dyad_0_crash']
+
+
+def _write_signal(path, values):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = 'IBI Series'
+    sheet.append(['IBI_ms'])
+    for value in values:
+        sheet.append([float(value)])
+    wb.save(path)
+
+
+def test_lag_filter_is_applied_on_every_path(tmp_path):
+    rng = np.random.default_rng(3)
+    signal_a = 800 + 50 * rng.standard_normal(600)
+    signal_b = np.roll(signal_a, 4) + 20 * rng.standard_normal(600)
+    paths = [str(tmp_path / 'a.xlsx'), str(tmp_path / 'b.xlsx')]
+    for path, signal in zip(paths, (signal_a, signal_b)):
+        _write_signal(path, signal)
+    params = {
+        **PARAMS, 'selected_sheet': 'IBI Series', 'checkbox_eb': False, 'checkbox_fr': True,
+        'use_lag_filter': True, 'lag_filter_min': 2, 'lag_filter_max': 6, 'surrogate_count': 5,
+        'workbook_data': {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': 'IBI_ms'},
+    }
+
+    # batch dyad
+    corr_data = batch_processing._process_dyad(*paths, str(tmp_path), params, export=False)
+    assert list(corr_data.lags) == [2, 3, 4, 5, 6]
+    expected = summarize_wxcorr(corr_data)['mean_correlation']
+
+    # parameter sweep, random pairs and within-dyad surrogates
+    signal_table = batch_processing._build_signal_table(paths, params)
+    table_a, table_b = signal_table[(paths[0], 'IBI_ms')], signal_table[(paths[1], 'IBI_ms')]
+    aligned = align_signals(table_a, table_b)
+    assert np.isclose(batch_processing._sweep_summary(*aligned, params)['mean_correlation'], expected)
+    assert np.isclose(batch_processing._pair_average_correlations([table_a], [table_b], [0], [0], params)[0], expected)
+    assert np.isclose(batch_processing._dyad_surrogate_test(aligned[2], aligned[3], params, windowed=True)['mean_correlation'], expected)
+
+
+def _write_dyads(input_dir, dyads, seed=0):
+    rng = np.random.default_rng(seed)
+    for dyad in dyads:
+        (input_dir / dyad).mkdir(parents=True)
+        signal = 800 + 50 * rng.standard_normal(400)
+        _write_signal(input_dir / dyad / 'a.xlsx', signal)
+        _write_signal(input_dir / dyad / 'b.xlsx', np.roll(signal, 3) + 20 * rng.standard_normal(400))
+
+
+def _batch_params(input_dir, output_dir, **overrides):
+    return {
+        **PARAMS, 'batch_input_folder': str(input_dir), 'output_dir': str(output_dir), 'selected_sheet': 'IBI Series',
+        'checkbox_eb': False, 'checkbox_fr': True,
+        'workbook_data': {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': 'IBI_ms'},
+        **overrides,
+    }
+
+
+def test_resume_processes_dyads_again_when_the_plot_changes(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    _write_dyads(input_dir, ['dyad_0', 'dyad_1'])
+    output_dir.mkdir()
+    params = _batch_params(input_dir, output_dir)
+    plot_path = output_dir / 'wx_dyad_0_wxcorr.png'
+
+    batch_processing.batch_process(params)
+    first_plot = plot_path.read_bytes()
+    assert len(batch_processing.batch_process(params)['up_to_date']) == 2
+
+    summary = batch_processing.batch_process({**params, 'sigmoid_correlations': True})
+    assert summary['up_to_date'] == [] and len(summary['succeeded']) == 2
+    assert plot_path.read_bytes() != first_plot
+
+
+def test_parameter_sweep_matches_individual_batch_runs(tmp_path):
+    input_dir = tmp_path / 'in'
+    _write_dyads(input_dir, ['dyad_0', 'dyad_1', 'dyad_2'])
+    # two sets share a geometry (computed with the strided engine), 'auto' picks cumsum for all of them in batch_process
+    parameter_sets = [
+        {'window_size': 50, 'step_size': 5, 'max_lag': 10},
+        {'window_size': 80, 'step_size': 40, 'max_lag': 20},
+        {'window_size': 50, 'step_size': 5, 'max_lag': 20, 'checkbox_absolute_corr': True},
+    ]
+    (tmp_path / 'sweep').mkdir()
+    params = _batch_params(input_dir, tmp_path / 'sweep', export_plots=False, resume=False)
+    rows = batch_processing.parameter_sweep(params, parameter_sets)
+
+    assert sorted((row['dyad'], row['parameter_set']) for row in rows) == [(f'dyad_{i}', j) for i in range(3) for j in range(3)]
+    for j, parameter_set in enumerate(parameter_sets):
+        output_dir = tmp_path / f'batch_{j}'
+        output_dir.mkdir()
+        results = batch_processing.batch_process({**params, **parameter_set, 'output_dir': str(output_dir)})['results']
+        sweep_rows = sorted((row for row in rows if row['parameter_set'] == j), key=lambda row: row['dyad'])
+        for result, row in zip(sorted(results, key=lambda result: result['dyad']), sweep_rows):
+            assert result['dyad'] == row['dyad']
+            assert result['n_windows'] == row['n_windows']
+            for name in ('mean_correlation', 'mean_r_max', 'mean_tau_max'):
+                assert np.isclose(result[name], row[name], rtol=1e-9, atol=1e-12), (j, name)
+
+
+def test_process_pool_results_equal_the_sequential_run(tmp_path):
+    input_dir = tmp_path / 'in'
+    _write_dyads(input_dir, [f'dyad_{i}' for i in range(5)], seed=4)
+    summaries = []
+    for n_workers in (1, 3):
+        output_dir = tmp_path / f'out_{n_workers}'
+        output_dir.mkdir()
+        summaries.append(batch_processing.batch_process(_batch_params(input_dir, output_dir, export_plots=False, resume=False, n_workers=n_workers)))
+        assert sorted(os.listdir(output_dir)) == sorted(os.listdir(tmp_path / 'out_1'))
+
+    sequential, pool = ([row for row in sorted(summary['results'], key=lambda row: row['dyad'])] for summary in summaries)
+    assert len(sequential) == 5 and pool == sequential
+    assert summaries[1]['failed'] == [] and len(summaries[1]['succeeded']) == 5
+
+
+def test_random_pair_analysis_loads_and_preprocesses_each_file_once(monkeypatch, tmp_path):
+    input_dir = tmp_path / 'in'
+    _write_dyads(input_dir, [f'dyad_{i}' for i in range(4)], seed=5)
+    reads, preprocessed = [], []
+    read_xlsx, preprocess_signal = batch_processing.xlsx.read_xlsx, batch_processing.preprocess_signal
+    monkeypatch.setattr(batch_processing.xlsx, 'read_xlsx', lambda path: reads.append(path) or read_xlsx(path))
+    monkeypatch.setattr(batch_processing, 'preprocess_signal', lambda *args: preprocessed.append(args) or preprocess_signal(*args))
+
+    params = _batch_params(input_dir, tmp_path)
+    _, _, average_correlations_rp, average_correlations_real, _ = batch_processing.random_pair_analysis(params, str(input_dir), random_pair_count=200)
+
+    assert len(reads) == len(set(reads)) == 8
+    assert len(preprocessed) == 8
+    assert len(average_correlations_rp) == 200 and len(average_correlations_real) == 4
+
+    # real dyads correlate like in batch_process
+    results = batch_processing.batch_process({**params, 'export_plots': False, 'resume': False})['results']
+    np.testing.assert_allclose(sorted(average_correlations_real), sorted(row['mean_correlation'] for row in results), rtol=1e-9)
+
+
+def test_exhaustive_random_pair_analysis_uses_every_non_dyad_pair(tmp_path):
+    input_dir = tmp_path / 'in'
+    _write_dyads(input_dir, [f'dyad_{i}' for i in range(4)], seed=6)
+    params = _batch_params(input_dir, tmp_path)
+    _, _, average_correlations_rp, average_correlations_real, permutation = batch_processing.random_pair_analysis(
+        params, str(input_dir), exhaustive=True, n_permutations=500)
+
+    # 8 files: 28 pairs, minus the 4 real dyads
+    assert len(average_correlations_rp) == 24 and len(set(average_correlations_rp)) == 24
+    assert len(average_correlations_real) == 4
+    assert permutation['n_permutations'] == 500 and 0 < permutation['p_value'] <= 1
+    assert np.isclose(permutation['mean_difference'], np.mean(average_correlations_rp) - np.mean(average_correlations_real))
+
+
+def test_dyad_shards_are_stable_and_cover_every_dyad_once():
+    dyads = [f'dyad_{i}' for i in range(40)]
+    shards = [batch_processing.dyad_shard(os.path.join('/mnt', 'study', dyad), 3) for dyad in dyads]
+    assert shards == [batch_processing.dyad_shard(os.path.join('other', dyad) + os.sep, 3) for dyad in dyads]
+    assert set(shards) == {1, 2, 3}
+
+
+def test_merged_shard_summaries_equal_the_unsharded_run(tmp_path):
+    input_dir = tmp_path / 'in'
+    _write_dyads(input_dir, [f'dyad_{i}' for i in range(6)], seed=7)
+    params = _batch_params(input_dir, tmp_path / 'all', export_plots=False, resume=False)
+    (tmp_path / 'all').mkdir()
+    unsharded = batch_processing.batch_process(params)
+
+    summary_paths = []
+    for shard_index in (1, 2, 3):
+        shard_dir = tmp_path / f'shard_{shard_index}'
+        shard_dir.mkdir()
+        batch_processing.batch_process({**params, 'output_dir': str(shard_dir), 'shard': (shard_index, 3)})
+        summary_paths.append(str(shard_dir / f'wx_batch_summary_shard-{shard_index}-of-3.json'))
+
+    merged = batch_processing.merge_batch_summaries(summary_paths, str(tmp_path / 'merged'))
+    assert merged['shards'] == [1, 2, 3] and merged['missing_shards'] == []
+    assert len(merged['succeeded']) == 6
+    assert [row['dyad'] for row in merged['results']] == sorted(row['dyad'] for row in unsharded['results'])
+    for row, expected in zip(merged['results'], sorted(unsharded['results'], key=lambda row: row['dyad'])):
+        assert np.isclose(row['mean_correlation'], expected['mean_correlation'], rtol=1e-12)
+    assert (tmp_path / 'merged' / 'wx_batch_summary.xlsx').exists()
+
+    assert batch_processing.merge_batch_summaries(summary_paths[:2], str(tmp_path / 'partial'))['missing_shards'] == [3]
+    with pytest.raises(ValueError):
+        batch_processing.merge_batch_summaries(summary_paths[:1] * 2, str(tmp_path / 'twice'))
+
+    other_dir = tmp_path / 'other'
+    other_dir.mkdir()
+    batch_processing.batch_process({**params, 'output_dir': str(other_dir), 'shard': (3, 3), 'window_size': 60})
+    with pytest.raises(ValueError):
+        batch_processing.merge_batch_summaries(summary_paths[:2] + [str(other_dir / 'wx_batch_summary_shard-3-of-3.json')], str(tmp_path / 'mixed'))
+
+
+def test_resume_only_processes_dyads_whose_inputs_outputs_or_settings_changed(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    _write_dyads(input_dir, ['dyad_0', 'dyad_1', 'dyad_2'], seed=8)
+    output_dir.mkdir()
+    params = _batch_params(input_dir, output_dir, export_plots=False)
+    first = batch_processing.batch_process(params)
+    up_to_date = lambda summary: sorted(os.path.basename(path) for path in summary['up_to_date'])
+
+    # touched but unchanged input (new modification time, same content): still up to date
+    os.utime(input_dir / 'dyad_0' / 'a.xlsx', ns=(1, 1))
+    second = batch_processing.batch_process(params)
+    assert up_to_date(second) == ['dyad_0', 'dyad_1', 'dyad_2']
+    assert sorted(second['results'], key=lambda row: row['dyad']) == sorted(first['results'], key=lambda row: row['dyad'])
+
+    # changed input of dyad_1, deleted output of dyad_2
+    _write_signal(input_dir / 'dyad_1' / 'b.xlsx', 800 + 50 * np.random.default_rng(9).standard_normal(300))
+    [output_name] = [name for name in os.listdir(output_dir) if 'dyad_2' in name]
+    os.remove(output_dir / output_name)
+    assert up_to_date(batch_processing.batch_process(params)) == ['dyad_0']
+
+    # other settings: everything again
+    assert batch_processing.batch_process({**params, 'step_size': 40})['up_to_date'] == []
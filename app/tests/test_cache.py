@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+
+from cache import LRUCache, fingerprint, sizeof
+from cross_correlation import windowed_cross_correlation
+
+
+def test_least_recently_used_entries_are_evicted_beyond_the_entry_limit():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1   # 'b' is now the least recently used entry
+    cache.put('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get('b', 'missing') == 'missing'
+
+
+def test_memory_budget_counts_arrays_and_result_containers():
+    cache = LRUCache(max_bytes=10_000)
+    cache.put('a', np.zeros(500))                      # 4000 bytes
+    cache.put('b', {'x': np.zeros(500), 'y': None})    # 4000 bytes
+    assert cache.nbytes == 8000
+    cache.put('c', [np.zeros(250), np.zeros(250)])     # 4000 bytes, evicts 'a'
+    assert 'a' not in cache and cache.nbytes == 8000
+    # replacing an entry updates the total, values larger than the whole budget are not cached
+    cache.put('b', np.zeros(10))
+    assert cache.nbytes == 4080
+    cache.put('d', np.zeros(2000))
+    assert 'd' not in cache and len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+    x = np.random.default_rng(0).standard_normal(1000)
+    result = windowed_cross_correlation(x, x, 100, 50, 10)
+    assert sizeof({'wxcorr': result}) == result.nbytes > 0
+
+
+def test_fingerprint_depends_on_content_dtype_and_shape():
+    a = np.arange(12, dtype=float)
+    assert fingerprint(a) == fingerprint(a.copy())
+    assert fingerprint(a) != fingerprint(a.astype(np.float32))
+    assert fingerprint(a) != fingerprint(a.reshape(3, 4))
+    changed = a.copy()
+    changed[5] += 1e-12
+    assert fingerprint(a) != fingerprint(changed)
+    # pairs: the order and the split between the arrays count
+    b = np.ones(12)
+    assert fingerprint(a, b) != fingerprint(b, a)
+    assert fingerprint(a[:6], a[6:]) != fingerprint(a[:5], a[5:])
+    # non-contiguous views hash their values
+    assert fingerprint(a[::2]) == fingerprint(a[::2].copy())
+
+
+def test_concurrent_puts_keep_the_budget():
+    cache = LRUCache(max_bytes=64_000, max_entries=50)
+
+    def fill(offset):
+        for i in range(500):
+            cache.put((offset, i), np.zeros(100))
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=fill, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) <= 50 and cache.nbytes == 800 * len(cache) <= 64_000
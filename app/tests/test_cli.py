@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import cli
+
+
+def _write_signal(path, values):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = 'IBI Series'
+    sheet.append(['IBI_ms'])
+    for value in values:
+        sheet.append([float(value)])
+    wb.save(path)
+
+
+def _write_params(path, input_dir, output_dir, extra):
+    path.write_text(
+        f'batch_input_folder = "{input_dir}"\n'
+        f'output_dir = "{output_dir}"\n'
+        'selected_sheet = "IBI Series"\n'
+        'checkbox_eb = false\n'
+        'checkbox_fr = true\n'
+        'export_plots = false\n'
+        f'{extra}\n'
+        '[workbook_data]\n'
+        'selected_column_a = "IBI_ms"\n'
+        'selected_column_b = "IBI_ms"\n'
+    )
+
+
+@pytest.fixture
+def dyads(tmp_path):
+    rng = np.random.default_rng(0)
+    input_dir = tmp_path / 'in'
+    for dyad in ('dyad_0', 'dyad_1'):
+        (input_dir / dyad).mkdir(parents=True)
+        signal = 800 + 50 * rng.standard_normal(400)
+        _write_signal(input_dir / dyad / 'a.xlsx', signal)
+        _write_signal(input_dir / dyad / 'b.xlsx', np.roll(signal, 3) + 20 * rng.standard_normal(400))
+    return input_dir
+
+
+def test_sweep_command_writes_one_row_per_dyad_and_grid_point(tmp_path, dyads):
+    output_dir = tmp_path / 'out'
+    params_path = tmp_path / 'params.toml'
+    _write_params(params_path, dyads, output_dir, '[sweep]\nwindow_size = [50, 80]\nmax_lag = [10, 20]\n')
+
+    assert cli.main(['sweep', str(params_path)]) == 0
+
+    [file_name] = os.listdir(output_dir)
+    assert file_name.startswith('wx_sweep_')
+    sheet = load_workbook(output_dir / file_name).active
+    columns = {sheet.cell(1, column).value: column for column in range(1, sheet.max_column + 1)}
+    n_rows = sum(1 for row in range(2, sheet.max_row + 1) if sheet.cell(row, columns['dyad']).value is not None)
+    assert n_rows == 2 * 4
+
+
+def test_sweep_command_checks_every_parameter_set(tmp_path, dyads):
+    params_path = tmp_path / 'params.toml'
+    _write_params(params_path, dyads, tmp_path / 'out', '[[parameter_sets]]\nwindow_size = 50\n\n[[parameter_sets]]\nwindow_size = 20\n')
+    with pytest.raises(SystemExit):
+        cli.main(['sweep', str(params_path)])
+
+
+def test_load_params_fills_in_the_defaults(tmp_path):
+    params_path = tmp_path / 'params.json'
+    params_path.write_text('{"batch_input_folder": "in", "window_size": 90, "workbook_data": {"selected_column_a": "IBI_ms"}}')
+    params = cli.load_params(str(params_path))
+
+    assert params['window_size'] == 90 and params['step_size'] == cli.DEFAULT_PARAMS['step_size']
+    assert params['workbook_data'] == {'has_headers': True, 'selected_column_a': 'IBI_ms', 'selected_column_b': None}
+    with pytest.raises(ValueError):
+        cli.load_params(str(tmp_path / 'params.yaml'))
+
+
+def test_missing_parameters_are_reported(tmp_path, capsys):
+    params_path = tmp_path / 'params.toml'
+    params_path.write_text('batch_input_folder = "in"\n[workbook_data]\nselected_column_a = "IBI_ms"\n')
+    with pytest.raises(SystemExit):
+        cli.main(['batch', str(params_path)])
+    message = capsys.readouterr().err
+    assert 'output_dir' in message and 'selected_sheet' in message and 'workbook_data.selected_column_b' in message
+
+
+def test_batch_command_equals_batch_process(tmp_path, dyads):
+    import batch_processing
+
+    params_path = tmp_path / 'params.toml'
+    _write_params(params_path, dyads, tmp_path / 'out', 'window_size = 60\nmax_lag = 10\n')
+    assert cli.main(['batch', str(params_path)]) == 0
+
+    with open(tmp_path / 'out' / 'wx_batch_summary.json', encoding='utf-8') as f:
+        summary = json.load(f)
+    params = {**cli.load_params(str(params_path)), 'output_dir': str(tmp_path / 'direct'), 'resume': False}
+    (tmp_path / 'direct').mkdir()
+    expected = batch_processing.batch_process(params)
+    assert len(summary['succeeded']) == 2 and summary['failed'] == []
+    for row, expected_row in zip(sorted(summary['results'], key=lambda row: row['dyad']), sorted(expected['results'], key=lambda row: row['dyad'])):
+        assert row['dyad'] == expected_row['dyad']
+        assert np.isclose(row['mean_correlation'], expected_row['mean_correlation'], rtol=1e-12)
+
+
+def test_random_pair_command_exports_the_analysis(tmp_path, dyads):
+    output_file = tmp_path / 'random_pairs.xlsx'
+    params_path = tmp_path / 'params.toml'
+    _write_params(params_path, dyads, tmp_path / 'out',
+                  f'random_pair_input_folder = "{dyads}"\nrandom_pair_output_file = "{output_file}"\n'
+                  'exhaustive = true\nn_permutations = 200\nwindow_size = 60\nmax_lag = 10\n')
+    assert cli.main(['random-pair', str(params_path)]) == 0
+    assert output_file.exists()
@@ -0,0 +1,297 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import cross_correlation
+
+from cross_correlation import windowed_cross_correlation, multiscale_windowed_cross_correlation, standard_cross_correlation
+from cross_correlation import iter_windowed_cross_correlation, summarize_wxcorr, stack_signals
+from cross_correlation import windowed_cross_correlation_stats, standard_cross_correlation_stats
+from tasks import TaskCancelled
+
+import baseline
+
+
+def _dyad(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.standard_normal(n))
+    return x, np.roll(x, 7) + 3 * rng.standard_normal(n)
+
+
+# (window_size, step_size, max_lag, options)
+WXCORR_SETTINGS = [
+    (100, 50, 10, {}),
+    (64, 7, 20, {'absolute': True}),
+    (150, 75, 30, {'use_lag_filter': True, 'lag_filter_min': 12, 'lag_filter_max': -4}),
+    (80, 20, 15, {'average_windows': True}),
+]
+
+
+@pytest.mark.parametrize('window_size, step_size, max_lag, options', WXCORR_SETTINGS)
+def test_strided_engine_matches_the_loop_implementation(window_size, step_size, max_lag, options):
+    x, y = _dyad(1500)
+    expected = baseline.windowed_cross_correlation(x, y, window_size, step_size, max_lag, **options)
+    result = windowed_cross_correlation(x, y, window_size, step_size, max_lag, method='strided', use_cache=False, **options)
+
+    assert len(result) == len(expected)
+    np.testing.assert_array_equal(result.start_idx, [window['start_idx'] for window in expected])
+    np.testing.assert_array_equal(result.center_idx, [window['center_idx'] for window in expected])
+    np.testing.assert_allclose(result.correlations, [window['correlations'] for window in expected], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(result.tau_max, [window['tau_max'] for window in expected])
+    for field in ('r_max', 'avg_z_transformed_corr', 'var_z_transformed_corr'):
+        np.testing.assert_allclose(getattr(result, field), [window[field] for window in expected], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('window_size, step_size, max_lag, options', WXCORR_SETTINGS)
+def test_cumsum_engine_matches_the_loop_implementation(window_size, step_size, max_lag, options):
+    x, y = _dyad(1500)
+    expected = baseline.windowed_cross_correlation(x, y, window_size, step_size, max_lag, **options)
+    result = windowed_cross_correlation(x, y, window_size, step_size, max_lag, method='cumsum', **options)
+
+    np.testing.assert_allclose(result.correlations, [window['correlations'] for window in expected], rtol=0, atol=1e-10)
+    np.testing.assert_array_equal(result.tau_max, [window['tau_max'] for window in expected])
+
+
+def test_cumsum_engine_stays_accurate_on_long_signals_with_a_large_offset():
+    # re-anchored prefix sums: the error does not grow with the recording length or the signal level
+    x, y = _dyad(200000, seed=3)
+    x, y = x + 1e6, 50 * y - 3e5
+    strided = windowed_cross_correlation(x, y, 500, 5, 25, method='strided', use_cache=False).correlations
+    cumsum = windowed_cross_correlation(x, y, 500, 5, 25, method='cumsum').correlations
+    np.testing.assert_allclose(cumsum, strided, rtol=0, atol=1e-10)
+
+    # 'auto' picks the cumsum engine for highly overlapping windows
+    np.testing.assert_array_equal(windowed_cross_correlation(x, y, 500, 5, 25).correlations, cumsum)
+
+
+@pytest.mark.parametrize('n, max_lag, absolute', [(1000, 5, False), (997, 40, True), (4099, 1500, False), (300, 299, False)])
+def test_fft_standard_cross_correlation_matches_the_loop_implementation(n, max_lag, absolute):
+    x, y = _dyad(n, seed=4)
+    expected = baseline.standard_cross_correlation(x, y, max_lag, absolute=absolute)
+
+    for method in ('direct', 'fft', 'auto'):
+        result = standard_cross_correlation(x, y, max_lag, absolute=absolute, method=method)
+        np.testing.assert_array_equal(result['lags'], expected['lags'])
+        np.testing.assert_allclose(result['corr'], expected['corr'], rtol=0, atol=1e-12, err_msg=method)
+
+
+@pytest.mark.parametrize('average_windows', [False, True])
+def test_wxcorr_result_windows_are_the_dicts_of_the_loop_implementation(average_windows):
+    x, y = _dyad(800)
+    expected = baseline.windowed_cross_correlation(x, y, 100, 30, 12, average_windows=average_windows)
+    result = windowed_cross_correlation(x, y, 100, 30, 12, average_windows=average_windows)
+
+    assert len(result) == len(expected)
+    windows = list(result)
+    assert windows[-1].keys() == expected[-1].keys()
+    for window, expected_window, index in zip(windows, expected, range(len(expected))):
+        for key, value in expected_window.items():
+            np.testing.assert_allclose(window[key], value, rtol=0, atol=1e-12, err_msg=key)
+            np.testing.assert_array_equal(result[index][key], window[key])
+
+
+def test_wxcorr_result_of_a_signal_shorter_than_a_window_is_empty():
+    x, y = _dyad(50)
+    result = windowed_cross_correlation(x, y, 100, 30, 12, use_lag_filter=True, lag_filter_min=-3, lag_filter_max=5)
+    assert len(result) == 0 and list(result) == []
+    assert result.correlations.shape == (0, 9)
+    np.testing.assert_array_equal(result.lags, np.arange(-3, 6))
+    assert baseline.windowed_cross_correlation(x, y, 100, 30, 12) == []
+
+
+def test_wxcorr_result_derives_views_on_first_access_only():
+    x, y = _dyad(2000)
+    result = windowed_cross_correlation(x, y, 100, 10, 20, average_windows=True)
+    stored = result.nbytes
+    derived = ('_correlations_sigmoid', '_r_max_sigmoid', '_avg_z_transformed_corr', '_var_z_transformed_corr')
+    assert all(getattr(result, slot) is None for slot in derived)
+
+    # averaged windows are a broadcast view of the per-window averages, no copy of the matrix
+    assert not result.correlations.flags.writeable
+    assert result.nbytes == stored
+
+    sigmoid = result.correlations_sigmoid
+    assert result._avg_z_transformed_corr is None and result._r_max_sigmoid is None
+    assert sigmoid is result.correlations_sigmoid
+    np.testing.assert_allclose(sigmoid[:, 0], np.mean(baseline.scale_sigmoid(result.raw_correlations), axis=1))
+
+    result.var_z_transformed_corr
+    assert result._avg_z_transformed_corr is not None and result.nbytes > stored
+
+
+@pytest.mark.parametrize('method', ['strided', 'cumsum'])
+def test_streamed_blocks_hold_exactly_the_one_shot_windows(tmp_path, method):
+    x, y = _dyad(30000, seed=5)
+    # memory-mapped recordings are read chunk by chunk
+    x_file, y_file = np.memmap(tmp_path / 'x', dtype=float, mode='w+', shape=x.shape), np.memmap(tmp_path / 'y', dtype=float, mode='w+', shape=y.shape)
+    x_file[:], y_file[:] = x, y
+    expected = windowed_cross_correlation(x, y, 300, 7, 25, method=method, use_cache=False)
+
+    blocks = list(iter_windowed_cross_correlation(x_file, y_file, 300, 7, 25, method=method, chunk_size=5000))
+    assert len(blocks) > 2
+    np.testing.assert_array_equal(np.concatenate([block.start_idx for block in blocks]), expected.start_idx)
+    np.testing.assert_array_equal(np.concatenate([block.center_idx for block in blocks]), expected.center_idx)
+    np.testing.assert_array_equal(np.concatenate([block.correlations for block in blocks]), expected.correlations)
+
+    summary = summarize_wxcorr(iter(blocks))
+    expected_summary = summarize_wxcorr(expected)
+    assert summary['n_windows'] == len(expected)
+    for key in ('mean_correlation', 'mean_r_max', 'mean_tau_max'):
+        assert np.isclose(summary[key], expected_summary[key], rtol=1e-12), key
+    assert np.isclose(expected_summary['mean_correlation'], np.mean(expected.correlations), rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['strided', 'cumsum'])
+def test_threaded_blocks_equal_the_single_threaded_result(method):
+    x, y = _dyad(60000, seed=6)
+    expected = windowed_cross_correlation(x, y, 250, 5, 20, method=method, use_cache=False).correlations
+    for n_jobs in (2, 3, -1):
+        result = windowed_cross_correlation(x, y, 250, 5, 20, method=method, n_jobs=n_jobs, use_cache=False)
+        np.testing.assert_array_equal(result.correlations, expected, err_msg=str(n_jobs))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = windowed_cross_correlation(x, y, 250, 5, 20, method=method, executor=executor, use_cache=False)
+    np.testing.assert_array_equal(result.correlations, expected)
+
+
+def test_normalized_windows_are_cached_per_signal_content_and_geometry(monkeypatch):
+    cross_correlation.clear_window_cache()
+    normalize_calls = []
+    normalize_windows = cross_correlation._normalize_windows
+    monkeypatch.setattr(cross_correlation, '_normalize_windows', lambda windows: normalize_calls.append(1) or normalize_windows(windows))
+    x, y = _dyad(3000)
+
+    first = windowed_cross_correlation(x, y, 100, 50, 10, method='strided')
+    assert len(normalize_calls) == 2
+    # lag changes reuse the windows of both signals
+    for options in ({'max_lag': 20}, {'max_lag': 10, 'absolute': True}, {'max_lag': 10, 'use_lag_filter': True, 'lag_filter_min': 0, 'lag_filter_max': 5}):
+        windowed_cross_correlation(x, y, 100, 50, method='strided', **options)
+    assert len(normalize_calls) == 2
+    # a new geometry or changed signal values (same array object) are computed again
+    windowed_cross_correlation(x, y, 100, 25, 10, method='strided')
+    assert len(normalize_calls) == 4
+    x[:10] += 1
+    changed = windowed_cross_correlation(x, y, 100, 50, 10, method='strided')
+    assert len(normalize_calls) == 5
+    assert not np.array_equal(changed.correlations[0], first.correlations[0])
+
+    windows = cross_correlation._normalized_windows(y, 100, 50)
+    assert not windows.flags.writeable
+    cross_correlation.clear_window_cache()
+    assert cross_correlation._normalized_windows(y, 100, 50) is not windows
+
+
+def _pairs(n_pairs, seed=0):
+    rng = np.random.default_rng(seed)
+    signals_x, signals_y = [], []
+    for n in rng.integers(150, 700, n_pairs):
+        x = np.cumsum(rng.standard_normal(n))
+        signals_x.append(x)
+        signals_y.append(np.roll(x, int(rng.integers(-5, 6))) + rng.standard_normal(n))
+    return signals_x, signals_y
+
+
+@pytest.mark.parametrize('window_size, step_size, max_lag, options', WXCORR_SETTINGS)
+def test_batched_pair_stats_match_one_loop_run_per_pair(monkeypatch, window_size, step_size, max_lag, options):
+    # small budget: several chunks of pairs
+    monkeypatch.setattr(cross_correlation, 'BATCH_MAX_BYTES', 300_000)
+    signals_x, signals_y = _pairs(25)
+    signals_x.append(signals_x[0][:window_size - 1])   # shorter than one window
+    signals_y.append(signals_y[0][:window_size - 1])
+    x, lengths = stack_signals(signals_x)
+    y, _ = stack_signals(signals_y)
+
+    for n_jobs in (1, 3):
+        stats = windowed_cross_correlation_stats(x, y, window_size, step_size, max_lag, lengths=lengths, n_jobs=n_jobs, **options)
+        for i, (signal_x, signal_y) in enumerate(zip(signals_x, signals_y)):
+            windows = baseline.windowed_cross_correlation(signal_x, signal_y, window_size, step_size, max_lag, **options)
+            assert stats['n_windows'][i] == len(windows)
+            if not windows:
+                assert np.isnan(stats['mean_correlation'][i]) and np.isnan(stats['r_max'][i]).all()
+                continue
+            assert np.isclose(stats['mean_correlation'][i], np.mean([window['correlations'] for window in windows]), rtol=0, atol=1e-12)
+            np.testing.assert_allclose(stats['r_max'][i, :len(windows)], [window['r_max'] for window in windows], rtol=0, atol=1e-12)
+            np.testing.assert_array_equal(stats['tau_max'][i, :len(windows)], [window['tau_max'] for window in windows])
+            assert np.isclose(stats['mean_tau_max'][i], np.mean([window['tau_max'] for window in windows]))
+
+
+@pytest.mark.parametrize('absolute', [False, True])
+def test_batched_standard_pair_stats_match_one_loop_run_per_pair(absolute):
+    signals_x, signals_y = _pairs(30, seed=1)
+    x, lengths = stack_signals(signals_x)
+    y, _ = stack_signals(signals_y)
+
+    stats = standard_cross_correlation_stats(x, y, 60, lengths=lengths, absolute=absolute, n_jobs=2)
+    for i, (signal_x, signal_y) in enumerate(zip(signals_x, signals_y)):
+        expected = baseline.standard_cross_correlation(signal_x, signal_y, 60, absolute=absolute)
+        assert np.isclose(stats['mean_correlation'][i], np.mean(expected['corr']), rtol=0, atol=1e-12)
+        assert np.isclose(stats['r_max'][i], np.max(expected['corr']), rtol=0, atol=1e-12)
+        assert stats['tau_max'][i] == expected['lags'][np.argmax(expected['corr'])]
+
+
+@pytest.mark.parametrize('constant', [0., 1., 7.3, 1234.5])
+def test_constant_windows_are_nan_in_both_engines(constant):
+    rng = np.random.default_rng(0)
+    x = 3 * rng.standard_normal(20000) + 5
+    y = rng.standard_normal(20000)
+    x[600:900] = constant
+
+    # windows 12-16 (window 100, step 50) lie in the constant segment, windows 11 and 17 overlap its edges
+    for method in ('strided', 'cumsum'):
+        correlations = windowed_cross_correlation(x, y, 100, 50, 10, method=method, use_cache=False).correlations
+        assert np.isnan(correlations[12:17]).all(), method
+        assert not np.isnan(np.delete(correlations, np.s_[12:17], axis=0)).any(), method
+
+
+def test_multiscale_rows_are_single_size_runs():
+    rng = np.random.default_rng(1)
+    x = np.cumsum(rng.standard_normal(5000))
+    y = np.roll(x, 7) + rng.standard_normal(5000)
+    window_sizes, step_size = [60, 150, 1000, 6000], 5
+    scalogram = multiscale_windowed_cross_correlation(x, y, window_sizes, step_size, 30)
+
+    for i, window_size in enumerate(window_sizes):
+        valid = np.flatnonzero(~np.isnan(scalogram['r_max'][i]))
+        if window_size > len(x):
+            assert len(valid) == 0
+            continue
+        # windows centered on the grid, starting at the first one that fits
+        first_start = scalogram['center_idx'][valid[0]] - window_size // 2
+        wxcorr = windowed_cross_correlation(x[first_start:], y[first_start:], window_size, step_size, 30)
+        np.testing.assert_array_equal(scalogram['correlations'][i, valid], wxcorr.correlations)
+        np.testing.assert_array_equal(scalogram['tau_max'][i, valid], wxcorr.tau_max)
+        assert np.isnan(np.delete(scalogram['correlations'][i], valid, axis=0)).all()
+
+
+class _CancelAfter:
+    """threading.Event stand-in that reports being set from the n-th check on."""
+
+    def __init__(self, n):
+        self.n = n
+        self.checks = 0
+
+    def is_set(self):
+        self.checks += 1
+        return self.checks > self.n
+
+
+@pytest.mark.parametrize('method, n_jobs', [('strided', 1), ('cumsum', 1), ('cumsum', 2)])
+def test_cancel_event_stops_within_one_block(method, n_jobs):
+    rng = np.random.default_rng(2)
+    x = np.cumsum(rng.standard_normal(100000))
+    y = np.roll(x, 3) + rng.standard_normal(100000)
+    args = (x, y, 200, 10, 20)
+
+    # an event that is never set does not change the result
+    expected = windowed_cross_correlation(*args, method=method, use_cache=False).correlations
+    never_set = _CancelAfter(np.inf)
+    result = windowed_cross_correlation(*args, method=method, n_jobs=n_jobs, use_cache=False, cancel_event=never_set)
+    np.testing.assert_array_equal(result.correlations, expected)
+    n_steps = never_set.checks - 1
+    assert n_steps > 20
+
+    # cancelled during the run: raised at the next re-anchoring block
+    cancel_event = _CancelAfter(3)
+    with pytest.raises(TaskCancelled):
+        windowed_cross_correlation(*args, method=method, n_jobs=n_jobs, use_cache=False, cancel_event=cancel_event)
+    assert cancel_event.checks < n_steps // 2
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import baseline
+from cross_correlation import windowed_cross_correlation
+from dfa import DFAPlan, get_dfa_plan, dfa, dfa_batch, dfa_wxcorr, dfa_wxcorr_window_averages, _detrended_fluctuation_analysis
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal(n)) + 0.01 * np.arange(n)
+
+
+# n = 100: all ten window sizes are 10, the log-log fit is rank deficient (polyfit warns)
+@pytest.mark.filterwarnings('ignore:Polyfit may be poorly conditioned')
+@pytest.mark.parametrize('n, order', [(100, 1), (537, 1), (5000, 1), (1200, 2), (999, 3)])
+def test_vectorized_dfa_matches_polyfit_detrending(n, order):
+    data = _series(n, seed=n)
+    expected_A, expected_F = baseline.dfa(data, order)
+    A, F = dfa(data, order)
+    np.testing.assert_allclose(F, expected_F, rtol=1e-9)
+    np.testing.assert_allclose(A, expected_A, rtol=1e-9)
+
+
+def test_vectorized_dfa_matches_polyfit_detrending_for_given_window_sizes():
+    data = _series(2000, seed=1)
+    window_sizes = [4, 7, 16, 100, 333, 2000]
+    expected_A, expected_F = baseline.detrended_fluctuation_analysis(data, window_sizes)
+    A, F = _detrended_fluctuation_analysis(data, window_sizes)
+    np.testing.assert_allclose(F, expected_F, rtol=1e-9)
+    np.testing.assert_allclose(A, expected_A, rtol=1e-9)
+
+    with pytest.raises(ValueError):
+        _detrended_fluctuation_analysis(data, [2, 10], order=1)
+    with pytest.raises(ValueError):
+        _detrended_fluctuation_analysis(data[:50], [10, 100])
+
+
+def test_batched_dfa_per_lag_matches_one_dfa_per_lag():
+    x, y = _series(3000, seed=2), _series(3000, seed=3)
+    wxcorr = windowed_cross_correlation(x, y, 100, 10, 15)
+    expected = baseline.dfa_wxcorr(list(wxcorr), 15)
+    result = dfa_wxcorr(wxcorr, 15)
+
+    assert [row['lag'] for row in result] == [row['lag'] for row in expected] == list(range(-15, 16))
+    for row, expected_row in zip(result, expected):
+        np.testing.assert_allclose(row['F'], expected_row['F'], rtol=1e-9)
+        np.testing.assert_allclose(row['A'], expected_row['A'], rtol=1e-9)
+
+    window_averages = np.mean([window['correlations'] for window in wxcorr], axis=1)
+    assert np.isclose(dfa_wxcorr_window_averages(wxcorr, 15), baseline.dfa(window_averages)[0][0], rtol=1e-9)
+
+
+def test_batched_dfa_per_lag_reads_the_lags_of_filtered_results():
+    x, y = _series(3000, seed=2), _series(3000, seed=3)
+    filtered = windowed_cross_correlation(x, y, 100, 10, 15, use_lag_filter=True, lag_filter_min=3, lag_filter_max=8)
+    full = {row['lag']: row for row in dfa_wxcorr(windowed_cross_correlation(x, y, 100, 10, 15), 15)}
+
+    result = dfa_wxcorr(filtered, 15)
+    assert [row['lag'] for row in result] == list(range(3, 9))
+    for row in result:
+        np.testing.assert_allclose(row['A'], full[row['lag']]['A'], rtol=1e-9)
+    assert dfa_wxcorr(windowed_cross_correlation(x[:50], y[:50], 100, 10, 15), 15) == []
+
+
+def test_dfa_plan_is_cached_and_applies_to_many_series():
+    plan = get_dfa_plan(800, 1)
+    assert get_dfa_plan(800, 1) is plan and get_dfa_plan(800, 2) is not plan
+    assert not plan.window_sizes.flags.writeable
+
+    series = np.stack([_series(800, seed=seed) for seed in range(6)])
+    series[2, 100] = np.nan
+    A, F = plan.apply(series)
+    assert A.shape == (6, 2) and F.shape == (6, len(plan.window_sizes))
+    # a series with undefined fluctuations does not affect the others
+    assert np.isnan(A[2]).all()
+    for i in (0, 1, 3, 4, 5):
+        expected_A, expected_F = baseline.dfa(series[i])
+        np.testing.assert_allclose(F[i], expected_F, rtol=1e-9)
+        np.testing.assert_allclose(A[i], expected_A, rtol=1e-9)
+        np.testing.assert_allclose(plan.apply(series[i])[0], A[i], rtol=1e-12)
+    np.testing.assert_allclose(dfa_batch(series)[0], A, rtol=1e-12)
+
+    with pytest.raises(ValueError):
+        plan.apply(series[:, :-1])
+    with pytest.raises(ValueError):
+        dfa_batch(series[0])
+
+
+def test_dfa_plan_with_explicit_window_sizes_validates_them():
+    data = _series(600, seed=4)
+    plan = DFAPlan(600, order=2, window_sizes=[8, 20, 60])
+    expected_A, expected_F = baseline.detrended_fluctuation_analysis(data, [8, 20, 60], order=2)
+    A, F = plan.apply(data)
+    np.testing.assert_allclose(F, expected_F, rtol=1e-9)
+    np.testing.assert_allclose(A, expected_A, rtol=1e-9)
+
+    for window_sizes in ([3, 20], [8, 601], [[8, 20]]):
+        with pytest.raises(ValueError):
+            DFAPlan(600, order=2, window_sizes=window_sizes)
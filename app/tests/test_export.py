@@ -0,0 +1,41 @@
+import numpy as np
+from openpyxl import load_workbook
+
+import cross_correlation
+from cross_correlation import windowed_cross_correlation, iter_windowed_cross_correlation
+from export import export_wxcorr_data
+
+
+def _export_params(wxcorr, signal_a, signal_b):
+    return {
+        'wxcorr': wxcorr,
+        'selected_dyad_dir': 'data/dyad_0', 'input_file_a': 'a.xlsx', 'input_file_b': 'b.xlsx',
+        'checkbox_fr': True, 'is_standardised': False,
+        'signal_a': signal_a, 'signal_b': signal_b, 'signal_a_std': None, 'signal_b_std': None,
+        'window_size': 200, 'step_size': 25, 'max_lag': 10,
+        'checkbox_absolute_corr': False, 'checkbox_average_windows': False,
+        'checkbox_lag_filter': False, 'lag_filter_min': -10, 'lag_filter_max': 10,
+        'dfa_alpha_per_lag_wxcorr': None,
+    }
+
+
+def _cells(path):
+    return [row for row in load_workbook(path).active.iter_rows(values_only=True)]
+
+
+def test_wxcorr_export_of_streamed_blocks_equals_the_one_shot_export(monkeypatch, tmp_path):
+    # short re-anchoring blocks, so a short recording is streamed in several chunks
+    monkeypatch.setattr(cross_correlation, 'CUMSUM_ANCHOR_INTERVAL', 512)
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.standard_normal(1500))
+    y = np.roll(x, 4) + rng.standard_normal(1500)
+
+    export_wxcorr_data(tmp_path / 'one_shot.xlsx', _export_params(windowed_cross_correlation(x, y, 200, 25, 10), x, y))
+    blocks = list(iter_windowed_cross_correlation(x, y, 200, 25, 10, chunk_size=500))
+    assert len(blocks) > 2
+    export_wxcorr_data(tmp_path / 'blocks.xlsx', _export_params(iter(blocks), x, y))
+
+    cells = _cells(tmp_path / 'blocks.xlsx')
+    assert cells == _cells(tmp_path / 'one_shot.xlsx')
+    # one correlation and one meta column per window
+    assert sum(1 for title in cells[0] if title and title.startswith('w_')) == 2 * len(range(0, 1500 - 200 + 1, 25))
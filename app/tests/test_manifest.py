@@ -0,0 +1,23 @@
+import os
+
+from manifest import BatchManifest
+
+
+def test_entry_after_a_truncated_line_is_kept(tmp_path):
+    path = os.path.join(tmp_path, 'manifest.jsonl')
+    manifest = BatchManifest(path)
+    manifest.record('dyad_1', error=None)
+    manifest.record('dyad_2', error=None)
+
+    # a run dies while appending the entry of dyad_2
+    with open(path, 'r+', encoding='utf-8') as f:
+        f.truncate(os.path.getsize(path) - 10)
+
+    resumed = BatchManifest(path)
+    assert resumed.get('dyad_1') is not None
+    assert resumed.get('dyad_2') is None
+    resumed.record('dyad_2', error=None)
+    resumed.record('dyad_3', error=None)
+
+    reloaded = BatchManifest(path)
+    assert [reloaded.get(dyad) is not None for dyad in ('dyad_1', 'dyad_2', 'dyad_3')] == [True, True, True]
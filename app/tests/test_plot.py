@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+from cross_correlation import windowed_cross_correlation, standard_cross_correlation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from plot import plot_windowed_cross_correlation, plot_standard_cross_correlation, save_figure_to_png, WxcorrPlotView
+
+
+def _signals():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.standard_normal(1000))
+    return x, np.roll(x, 5) + rng.standard_normal(1000)
+
+
+def test_batch_figures_render_off_the_main_thread_without_pyplot(tmp_path):
+    x, y = _signals()
+    figures, paths = [], [tmp_path / 'wxcorr.png', tmp_path / 'sxcorr.png']
+
+    def render():
+        figures.append(plot_windowed_cross_correlation(windowed_cross_correlation(x, y, 100, 50, 10), 100, 10, 50, x, y))
+        figures.append(plot_standard_cross_correlation(standard_cross_correlation(x, y, 40), x, y))
+        for fig, path in zip(figures, paths):
+            save_figure_to_png(fig, str(path))
+
+    thread = threading.Thread(target=render)
+    thread.start()
+    thread.join()
+
+    # not registered with pyplot (no figure manager / GUI window), rendered with Agg
+    assert all(fig.canvas.manager is None for fig in figures)
+    for path in paths:
+        with Image.open(path) as image:
+            assert image.format == 'PNG' and image.size[0] > 100
+
+
+def test_wxcorr_view_lays_out_again_after_a_resize():
+    x, y = _signals()
+    view = WxcorrPlotView()
+    FigureCanvasAgg(view.fig)
+    view.update(windowed_cross_correlation(x, y, 100, 50, 10), max_lag=10, step_size=50)
+    view.prepare_layout()
+    positions = [ax.get_position().bounds for ax in view.fig.axes]
+
+    # same size and text: the layout is kept
+    view.prepare_layout()
+    assert [ax.get_position().bounds for ax in view.fig.axes] == positions
+
+    # fixed margins take a different fraction of a resized figure
+    width, height = view.fig.get_size_inches()
+    view.fig.set_size_inches(1.5 * width, 1.2 * height)
+    view.prepare_layout()
+    assert [ax.get_position().bounds for ax in view.fig.axes] != positions
+    view.fig.canvas.draw()
+
+
+def test_wxcorr_view_updated_in_place_shows_the_same_data_as_a_new_view():
+    x, y = _signals()
+    first, second = windowed_cross_correlation(x, y, 100, 50, 10), windowed_cross_correlation(x, y, 80, 20, 25, absolute=True)
+    view = WxcorrPlotView()
+    view.update(first, max_lag=10, step_size=50)
+    artists = (view.fig, view.im, view.line_r_max, view.line_tau_max, view.hist_r_max, view.hist_tau_max)
+    view.update(second, max_lag=25, step_size=20, show_sigmoid_correlations=True)
+    fresh = WxcorrPlotView()
+    fresh.update(second, max_lag=25, step_size=20, show_sigmoid_correlations=True)
+
+    assert (view.fig, view.im, view.line_r_max, view.line_tau_max, view.hist_r_max, view.hist_tau_max) == artists
+    np.testing.assert_array_equal(view.im.get_array(), fresh.im.get_array())
+    assert view.im.get_extent() == fresh.im.get_extent()
+    for line, fresh_line in ((view.line_r_max, fresh.line_r_max), (view.line_tau_max, fresh.line_tau_max)):
+        np.testing.assert_array_equal(line.get_xydata(), fresh_line.get_xydata())
+    for hist, fresh_hist in ((view.hist_r_max, fresh.hist_r_max), (view.hist_tau_max, fresh.hist_tau_max)):
+        np.testing.assert_array_equal(hist.get_data().values, fresh_hist.get_data().values)
+        np.testing.assert_array_equal(hist.get_data().edges, fresh_hist.get_data().edges)
+    for ax, fresh_ax in zip(view.fig.axes, fresh.fig.axes):
+        assert ax.get_xlim() == fresh_ax.get_xlim() and ax.get_ylim() == fresh_ax.get_ylim()
+        assert ax.get_title() == fresh_ax.get_title()
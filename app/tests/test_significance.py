@@ -0,0 +1,48 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import significance
+from significance import permutation_test
+
+
+def _exact_p_value(sample_a, sample_b):
+    """Two-sided p-value over all label assignments (loop over every split of the pooled values)."""
+    pooled = np.concatenate((sample_a, sample_b))
+    observed = abs(np.mean(sample_a) - np.mean(sample_b))
+    differences = []
+    for indices in combinations(range(len(pooled)), len(sample_a)):
+        is_a = np.zeros(len(pooled), dtype=bool)
+        is_a[list(indices)] = True
+        differences.append(abs(np.mean(pooled[is_a]) - np.mean(pooled[~is_a])))
+    return np.mean(np.array(differences) >= observed - 1e-12)
+
+
+def test_permutation_p_value_approaches_the_exact_p_value():
+    rng = np.random.default_rng(0)
+    sample_a, sample_b = rng.normal(0.3, 1, 6), rng.normal(0, 1, 7)
+    result = permutation_test(sample_a, sample_b, n_permutations=40000, seed=1)
+    assert np.isclose(result['mean_difference'], np.mean(sample_a) - np.mean(sample_b))
+    assert abs(result['p_value'] - _exact_p_value(sample_a, sample_b)) < 0.01
+
+
+def test_permutation_batches_do_not_change_the_result(monkeypatch):
+    rng = np.random.default_rng(2)
+    sample_a, sample_b = rng.normal(0, 1, 40), rng.normal(0.5, 1, 25)
+    expected = permutation_test(sample_a, sample_b, n_permutations=3000, seed=7)
+    # batches of 10 permutations
+    monkeypatch.setattr(significance, 'PERMUTATION_BATCH_MAX_BYTES', 8 * 65 * 10)
+    assert permutation_test(sample_a, sample_b, n_permutations=3000, seed=7) == expected
+
+
+def test_permutation_p_value_bounds():
+    # equal samples: every permutation is at least as extreme
+    assert permutation_test([1., 2., 3.], [1., 2., 3.], n_permutations=500, seed=0)['p_value'] == 1
+    # separated samples: no permutation but the observed split (1 of 3432) is as extreme
+    result = permutation_test(np.arange(7.), np.arange(7.) + 100, n_permutations=999, seed=0)
+    assert result['p_value'] < 0.01 and result['n_permutations'] == 999
+    with pytest.raises(ValueError):
+        permutation_test([], [1.])
+    with pytest.raises(ValueError):
+        permutation_test([1.], [2.], n_permutations=0)
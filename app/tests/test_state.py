@@ -0,0 +1,66 @@
+import pytest
+
+# state builds tk.Vars with customtkinter; the debounce itself only needs after() / after_cancel() and the update counter
+pytest.importorskip('customtkinter')
+import state
+
+
+class _Root:
+    """Stands in for the root window: after() returns an id, fire() runs the callbacks that were not cancelled."""
+
+    def __init__(self):
+        self.scheduled = {}
+
+    def after(self, ms, callback):
+        after_id = f'after#{len(self.scheduled)}'
+        self.scheduled[after_id] = callback
+        return after_id
+
+    def after_cancel(self, after_id):
+        del self.scheduled[after_id]
+
+    def fire(self):
+        callbacks, self.scheduled = list(self.scheduled.values()), {}
+        for callback in callbacks:
+            callback()
+
+
+class _Counter:
+    def __init__(self):
+        self.value = 0
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+@pytest.fixture
+def root(monkeypatch):
+    root = _Root()
+    monkeypatch.setattr(state, '_root', root)
+    monkeypatch.setattr(state, '_pending_update', None)
+    monkeypatch.setattr(state, '_params_changed_hooks', [])
+    monkeypatch.setattr(state, 'val_UPDATE_COUNT', _Counter())
+    return root
+
+
+def test_a_burst_of_changes_triggers_one_update(root):
+    hook_calls = []
+    state.register_params_changed_hook(lambda: hook_calls.append(True))
+    for _ in range(5):
+        state.PARAMS_CHANGED()
+
+    assert state.val_UPDATE_COUNT.get() == 0 and len(root.scheduled) == 1
+    assert len(hook_calls) == 5
+    root.fire()
+    assert state.val_UPDATE_COUNT.get() == 1
+
+
+def test_immediate_changes_run_the_pending_update_at_once(root):
+    state.PARAMS_CHANGED()
+    state.PARAMS_CHANGED(immediate=True)
+    assert state.val_UPDATE_COUNT.get() == 1 and root.scheduled == {}
+    root.fire()
+    assert state.val_UPDATE_COUNT.get() == 1
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import baseline
+import surrogates
+from surrogates import circular_shift_surrogates, make_surrogates, phase_randomized_surrogates, surrogate_test
+
+
+def _dyad(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.standard_normal(n))
+    return x, np.roll(x, 5) + 2 * rng.standard_normal(n)
+
+
+def test_circular_shifts_keep_the_values_and_respect_the_minimum_shift():
+    signal = np.random.default_rng(0).standard_normal(200)
+    shifted = circular_shift_surrogates(signal, 50, min_shift=30, seed=1)
+    for row in shifted:
+        shift = next(s for s in range(200) if np.array_equal(np.roll(signal, s), row))
+        assert 30 <= shift <= 170
+    np.testing.assert_array_equal(shifted, circular_shift_surrogates(signal, 50, min_shift=30, seed=1))
+    with pytest.raises(ValueError):
+        circular_shift_surrogates(signal, 5, min_shift=101)
+
+
+@pytest.mark.parametrize('n', [256, 255])
+def test_phase_randomization_keeps_the_amplitude_spectrum(n):
+    signal = np.cumsum(np.random.default_rng(2).standard_normal(n))
+    randomized = phase_randomized_surrogates(signal, 20, seed=3)
+    assert randomized.shape == (20, n)
+    np.testing.assert_allclose(np.abs(np.fft.rfft(randomized, axis=1)), np.broadcast_to(np.abs(np.fft.rfft(signal)), (20, n // 2 + 1)), rtol=1e-9, atol=1e-9)
+    assert not np.allclose(randomized[0], signal)
+
+
+def test_unknown_surrogate_method_raises():
+    with pytest.raises(ValueError):
+        make_surrogates(np.arange(10.), 2, method='shuffle')
+    with pytest.raises(ValueError):
+        surrogate_test(np.arange(10.), np.arange(10.), method='shuffle')
+
+
+@pytest.mark.parametrize('method', surrogates.SURROGATE_METHODS)
+def test_windowed_surrogate_test_matches_one_loop_run_per_surrogate(method):
+    x, y = _dyad(600)
+    settings = {'window_size': 80, 'step_size': 20, 'max_lag': 10}
+    result = surrogate_test(x, y, n_surrogates=15, method=method, seed=4, **settings)
+
+    def loop_stats(signal_b):
+        windows = baseline.windowed_cross_correlation(x, signal_b, **settings)
+        return np.mean([window['correlations'] for window in windows]), np.mean([window['r_max'] for window in windows])
+
+    assert np.allclose((result['mean_correlation'], result['r_max']), loop_stats(y), rtol=0, atol=1e-12)
+    # the surrogates fit in one chunk: the same draws as one make_surrogates call
+    expected = np.array([loop_stats(row) for row in make_surrogates(y, 15, method, seed=np.random.default_rng(4))])
+    np.testing.assert_allclose(result['null_mean_correlation'], expected[:, 0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(result['null_r_max'], expected[:, 1], rtol=0, atol=1e-12)
+    assert result['p_value_r_max'] == (np.count_nonzero(expected[:, 1] >= result['r_max']) + 1) / 16
+
+
+def test_standard_surrogate_test_in_chunks_matches_one_loop_run_per_surrogate(monkeypatch):
+    x, y = _dyad(500, seed=5)
+    # small budget: chunks of 4 surrogates (the last one shorter)
+    monkeypatch.setattr(surrogates, 'BATCH_MAX_BYTES', 8 * 3 * 500 * 4)
+    result = surrogate_test(x, y, n_surrogates=10, windowed=False, max_lag=20, seed=6)
+
+    rng = np.random.default_rng(6)
+    rows = np.concatenate([make_surrogates(y, k, seed=rng) for k in (4, 4, 2)])
+    for i, row in enumerate(rows):
+        expected = baseline.standard_cross_correlation(x, row, 20)
+        assert np.isclose(result['null_mean_correlation'][i], np.mean(expected['corr']), rtol=0, atol=1e-12)
+        assert np.isclose(result['null_r_max'][i], np.max(expected['corr']), rtol=0, atol=1e-12)
+    # the real alignment stands out against shifted copies
+    assert result['p_value_r_max'] == 1 / 11
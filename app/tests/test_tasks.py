@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from tasks import BackgroundTask, LatestTaskRunner, TaskCancelled
+
+
+class _MainLoop:
+    """Stands in for a Tk widget: after() queues callbacks, run() calls them on the test thread like the Tk main loop."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.callbacks:
+            assert time.monotonic() < deadline, "tasks did not finish"
+            callbacks, self.callbacks = self.callbacks, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.001)
+
+
+def test_results_and_progress_are_delivered_on_the_main_loop():
+    loop = _MainLoop()
+    calls = []
+
+    def work(task):
+        for i in range(3):
+            task.report_progress(i + 1, 3)
+        return 'result'
+
+    on_main_loop = lambda: threading.current_thread() is loop.thread
+    task = BackgroundTask(loop, work,
+                          on_done=lambda result: calls.append(('done', result, on_main_loop())),
+                          on_progress=lambda done, total: calls.append(('progress', done, on_main_loop()))).start()
+    loop.run()
+
+    assert calls == [('progress', 1, True), ('progress', 2, True), ('progress', 3, True), ('done', 'result', True)]
+    assert task.finished
+
+
+def test_errors_go_to_on_error():
+    loop = _MainLoop()
+    errors = []
+    BackgroundTask(loop, lambda task: 1 / 0, on_done=pytest.fail, on_error=errors.append).start()
+    loop.run()
+    assert len(errors) == 1 and isinstance(errors[0], ZeroDivisionError)
+
+
+def test_a_cancelled_task_drops_its_result():
+    loop = _MainLoop()
+    started, release = threading.Event(), threading.Event()
+    cancelled = []
+
+    def work(task):
+        started.set()
+        release.wait()
+        return 'stale'
+
+    task = BackgroundTask(loop, work, on_done=pytest.fail, on_cancelled=lambda: cancelled.append(True)).start()
+    started.wait()
+    task.cancel()
+    release.set()
+    loop.run()
+    assert cancelled == [True] and task.finished
+    with pytest.raises(TaskCancelled):
+        task.check_cancelled()
+
+    # check_cancelled stops the work function at its next step
+    steps = []
+
+    def stepped_work(task):
+        for i in range(1000):
+            task.check_cancelled()
+            steps.append(i)
+            if i == 2:
+                task.cancel()
+        return 'stale'
+
+    BackgroundTask(loop, stepped_work, on_done=pytest.fail, on_cancelled=lambda: cancelled.append(True)).start()
+    loop.run()
+    assert steps == [0, 1, 2] and cancelled == [True, True]
+
+
+def test_latest_task_runner_only_delivers_the_newest_submission():
+    loop = _MainLoop()
+    runner = LatestTaskRunner(loop)
+    release = threading.Event()
+    results = []
+
+    def work_for(value):
+        def work(task):
+            release.wait()
+            task.check_cancelled()
+            return value
+        return work
+
+    first = runner.submit(work_for('old'), on_done=results.append, key='old')
+    assert runner.is_running('old') and not runner.is_running('new')
+    runner.submit(work_for('new'), on_done=results.append, key='new')
+    assert first.cancelled and runner.is_running('new') and not runner.is_running('old')
+
+    release.set()
+    loop.run()
+    assert results == ['new'] and not runner.is_running('new')
+
+    runner.submit(work_for('dropped'), on_done=results.append, key='dropped')
+    runner.cancel()
+    assert not runner.is_running('dropped')
+    loop.run()
+    assert results == ['new']
@@ -1,5 +1,51 @@
 from openpyxl import Workbook, load_workbook
 
+# vectors are written to columns starting here (columns 1-2 hold single values)
+VECTORS_FIRST_COLUMN = 4
+
+def create_sheet(sheet_title: str="xcorr data"):
+    """
+    Create a new write-only workbook with a single sheet. Rows are appended in order (see `write_rows`) and streamed
+    to a temporary file, so the cells are not kept in memory.
+    Args:
+        sheet_title (str): Title of the sheet.
+    Returns:
+        tuple: (Workbook, WriteOnlyWorksheet)
+    """
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet(sheet_title)
+    return wb, sheet
+
+def write_rows(sheet, single_values: dict, vectors: list):
+    """
+    Write single valued data to the first two columns of a sheet (column 1 -> names, column 2 -> values) and vectors
+    with titles to columns (one vector per column, starting in column VECTORS_FIRST_COLUMN), row by row.
+    Args:
+        sheet (WriteOnlyWorksheet): openpyxl worksheet from `create_sheet`
+        single_values (dict): A dictionary where keys are names and values are single data values.
+        vectors (list): (name, values) pairs, one per column. values must support len() and indexing.
+    Returns:
+        None
+    """
+    single_items = list(single_values.items())
+    n_rows = max(len(single_items), 1 + max((len(values) for _, values in vectors), default=-1))
+    # (column, values) of the vectors that reach the current row; rows end at the last of them, so short vectors
+    # (e.g. one column per window next to the full-length signals) cost nothing once they have ended
+    active = [(column_index, values) for column_index, (_, values) in enumerate(vectors, start=VECTORS_FIRST_COLUMN - 1)]
+    for row_index in range(n_rows):
+        if row_index > 0:
+            active = [(column_index, values) for column_index, values in active if row_index <= len(values)]
+        row = [None] * max(2 if row_index < len(single_items) else 0, active[-1][0] + 1 if active else 0)
+        if row_index < len(single_items):
+            row[0], row[1] = single_items[row_index][0], str(single_items[row_index][1])
+        if row_index == 0:
+            for column_index, (name, _) in enumerate(vectors, start=VECTORS_FIRST_COLUMN - 1):
+                row[column_index] = name
+        else:
+            for column_index, values in active:
+                row[column_index] = str(values[row_index - 1])
+        sheet.append(row)
+
 def write_xlsx(vectors: dict, single_values: dict, output_path: str, sheet_title: str="xcorr data"):
     """
     Write data to an Excel file.
@@ -12,26 +58,11 @@ def write_xlsx(vectors: dict, single_values: dict, output_path: str, sheet_title
     """
 
     # Create a new workbook
-    wb = Workbook()
-    sheet = wb.active
-    sheet.title = sheet_title
+    wb, sheet = create_sheet(sheet_title)
 
-    # Write the single valued data to columns 
-    # (column 1 -> names, column 2 -> values)
-    row_index = 1
-    for name, value in single_values.items():
-        sheet.cell(row=row_index, column=1, value=name)  
-        sheet.cell(row=row_index, column=2, value=str(value))  
-        row_index += 1
-    
-    # Write the time series data to columns
-    # (one vector with title per column, starting in column 4)
-    column_index = 4
-    for name in vectors.keys():
-        sheet.cell(row=1, column=column_index, value=name)
-        for row_index, value in enumerate(vectors[name]):  
-            sheet.cell(row=row_index+2, column=column_index, value=str(value))
-        column_index += 1
+    # Write the single valued data (column 1 -> names, column 2 -> values)
+    # and the time series data (one vector with title per column, starting in column 4)
+    write_rows(sheet, single_values, list(vectors.items()))
 
     # Save the workbook
     wb.save(output_path)